@@ -4,307 +4,588 @@ import json
 from datetime import datetime, timedelta
 import uuid
 from functools import partial
-import calendar
 from tkinter.font import Font
-import math
-import os
+import bisect
+from collections import OrderedDict
 
 from a_manager import AdventureManager 
+from task_core import Task, Person, PriorityEngine, SearchIndex, TaskStore
+#The tasks themselves (model, scoring, storage, recurrence, reminders, schedule data)
+#live in task_core.TaskStore; TaskManager is the Tk window on top of it.
 #Functions used from AdventureManager:
 # - adventure_manager.leaderboard
-# - adventure_manager.queue_adventure
+# - adventure_manager.queue_adventures
 # - adventure_manager.show_adventurer_window
 
 
 window_geometry = "1680x800"
 default_main_sashpos = 700
 default_second_sashpos = 1260
-impact_high_dollars = 100000
 invalid_input_color = "#FFCCCC"
 valid_input_color = "#FFFFFF"
 today_schedule_color = "#FFFDE7"
 past_schedule_color = "#D8D8D8"
 past_schedule_text_color = "#8A8A8A"
+task_list_overscan = 20 #rows kept in the task Treeview above and below what's on screen
+search_debounce_ms = 150 #typing in the search box waits this long for the next key before filtering
+search_cache_size = 32 #filtered task lists remembered per (filter, search text, data version)
+detail_nav_delay_ms = 60 #arrowing through the task list waits this long before showing details
+#scoring and storage settings (impact_high_dollars, storage_backend, ...) are at the top of task_core.py
+
+
+class SearchResultCache:
+    """Least-recently-used memo of filtered task lists. Keys are (filter, search text,
+    data version), so any edit or rescoring makes the old entries unreachable and they
+    simply age out. Backspacing to an earlier query is a lookup, and a query that
+    extends a cached one only has to check that one's results."""
+    def __init__(self, size=search_cache_size):
+        self.size = size
+        self.results = OrderedDict()
+
+    def get(self, key):
+        tasks = self.results.get(key)
+        if tasks is not None:
+            self.results.move_to_end(key)
+        return tasks
+
+    def narrowest(self, current_filter, query, version):
+        #the results of the longest cached query that query extends, or None
+        for end in range(len(query) - 1, 0, -1):
+            tasks = self.get((current_filter, query[:end], version))
+            if tasks is not None:
+                return tasks
+        return None
 
-class Task:
-    def __init__(self, short_desc, long_desc, safety, impact, hype, due_date, 
-                 area="", entity="", maintenance_plan="", procedure_doc="", 
-                 requestor="", project="", is_win=False, id=None, prerequisites=None,
-                 contingents=None, delegate=None, status=None, completion_date=None,
-                 snooze_until=None, impact_is_percentage=False,
-                 recurrence_type="none", recurrence_settings=None, first_active_date=None,
-                 delegate_reminder_days=1):
-        if id is None:
-            self.id = str(uuid.uuid4())
+    def put(self, key, tasks):
+        self.results[key] = tasks
+        self.results.move_to_end(key)
+        while len(self.results) > self.size:
+            self.results.popitem(last=False)
+
+
+class TaskListView:
+    """View-model for the main task Treeview. Rows are keyed by task id (the Treeview
+    iid is the task id), and update() works out the inserts, deletes, moves and value
+    changes between what's shown and the new row list, so Tk only hears about rows
+    that actually changed. Selection and scroll position are left alone."""
+    def __init__(self, tree):
+        self.tree = tree
+        self.order = []   # task ids, top to bottom, as currently shown
+        self.rows = {}    # task id -> (values, tags) as currently shown
+
+    def update(self, rows):
+        """rows: [(task_id, values, tags)] in display order."""
+        new_order = [row[0] for row in rows]
+        new_ids = set(new_order)
+        gone = [iid for iid in self.order if iid not in new_ids]
+        if gone:
+            self.tree.delete(*gone)
+            for iid in gone:
+                del self.rows[iid]
+        # Rows that keep their relative order (the longest increasing run of old
+        # positions) stay put; the rest are detached and re-placed top-down, which
+        # leaves everything above each insert point already final.
+        old_position = {iid: i for i, iid in enumerate(iid for iid in self.order if iid in new_ids)}
+        kept = [iid for iid in new_order if iid in old_position]
+        stay = self._longest_increasing([old_position[iid] for iid in kept])
+        staying = {kept[i] for i in stay}
+        moving = [iid for iid in kept if iid not in staying]
+        if moving:
+            self.tree.detach(*moving)
+        for index, (iid, values, tags) in enumerate(rows):
+            shown = self.rows.get(iid)
+            if shown is None:
+                self.tree.insert("", index, iid=iid, values=values, tags=tags)
+            else:
+                if iid not in staying:
+                    self.tree.move(iid, "", index)
+                if shown != (values, tags):
+                    self.tree.item(iid, values=values, tags=tags)
+            self.rows[iid] = (values, tags)
+        self.order = new_order
+
+    def clear(self):
+        self.update([])
+
+
+class VirtualTaskListView(TaskListView):
+    """Windowed version for the main task pane. set_rows() takes the whole sorted row
+    list, but the Treeview only ever holds the rows on screen plus task_list_overscan
+    above and below; scrolling slides that window along the list (reusing update()'s
+    diff, so a one-row scroll is one insert and one delete). The scrollbar is driven
+    from the full list, and the Treeview's own scrolling - wheel, arrow keys, see() -
+    re-windows once it reaches the edge of what's materialized."""
+    def __init__(self, tree, scrollbar):
+        super().__init__(tree)
+        self.scrollbar = scrollbar
+        self.all_rows = []
+        self.index_of = {}  # task id -> position in all_rows
+        self.offset = 0     # all_rows index of the Treeview's first row
+        self.selected_id = None
+        tree.configure(yscrollcommand=self._on_tree_scroll)
+        scrollbar.configure(command=self.yview)
+        tree.bind("<Configure>", lambda e: self._render(self.top()), add="+")
+        tree.bind("<<TreeviewSelect>>", self._remember_selection, add="+")
+
+    def set_rows(self, rows, top=None):
+        """rows: the full sorted list of (task_id, values, tags). top: index to scroll to,
+        or None to stay where we are."""
+        top = self.top() if top is None else top
+        self.all_rows = rows
+        self.index_of = {row[0]: i for i, row in enumerate(rows)}
+        self._render(top)
+
+    def top(self):
+        """all_rows index of the first row on screen."""
+        if not self.order:
+            return self.offset
+        return self.offset + int(round(self.tree.yview()[0] * len(self.order)))
+
+    def visible_rows(self):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        return max(1, self.tree.winfo_height() // row_height)
+
+    def see(self, task_id):
+        index = self.index_of.get(task_id)
+        if index is None:
+            return
+        if task_id not in self.rows:
+            self._render(index - self.visible_rows() // 2)
+        self.tree.see(task_id)
+
+    def yview(self, *args):
+        #scrollbar command: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if args[0] == "moveto":
+            self._render(int(float(args[1]) * len(self.all_rows)))
+        elif args[0] == "scroll":
+            step = self.visible_rows() if args[2] == "pages" else 1
+            self._render(self.top() + int(args[1]) * step)
+
+    def _render(self, top):
+        visible = self.visible_rows()
+        total = len(self.all_rows)
+        top = max(0, min(top, total - visible))
+        start = max(0, top - task_list_overscan)
+        end = min(total, top + visible + task_list_overscan)
+        self.offset = start
+        self.update(self.all_rows[start:end])
+        if self.selected_id in self.rows and self.tree.selection() != (self.selected_id,):
+            self.tree.selection_set(self.selected_id)
+        self.tree.yview_moveto((top - start) / max(1, end - start))
+        self._set_scrollbar(top, min(total, top + visible))
+
+    def _on_tree_scroll(self, first, last):
+        first, last = float(first), float(last)
+        window = len(self.order)
+        top = self.offset + int(round(first * window))
+        bottom = self.offset + int(round(last * window))
+        at_window_edge = (first <= 0 and self.offset > 0) or (last >= 1 and self.offset + window < len(self.all_rows))
+        if at_window_edge:
+            self._render(top)
         else:
-            self.id = id
-        self.short_desc = short_desc
-        self.long_desc = long_desc
-        self.safety = safety
-        self.impact = impact
-        self.hype = hype
-        self.due_date = due_date
-        self.area = area
-        self.entity = entity
-        self.maintenance_plan = maintenance_plan
-        self.procedure_doc = procedure_doc
-        self.requestor = requestor
-        self.project = project
-        self.is_win = is_win
-        if prerequisites is None:
-            self.prerequisites = []
+            self._set_scrollbar(top, bottom)
+
+    def _set_scrollbar(self, top, bottom):
+        total = len(self.all_rows)
+        if total == 0:
+            self.scrollbar.set(0, 1)
         else:
-            self.prerequisites = prerequisites
-        if contingents is None:
-            self.contingents = []
+            self.scrollbar.set(top / total, bottom / total)
+
+    def _remember_selection(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self.selected_id = selection[0]
+
+    @staticmethod
+    def _longest_increasing(sequence):
+        """Indices of one longest strictly increasing subsequence (patience sorting)."""
+        tails, tail_index, previous = [], [], [-1] * len(sequence)
+        for i, value in enumerate(sequence):
+            k = bisect.bisect_left(tails, value)
+            if k == len(tails):
+                tails.append(value)
+                tail_index.append(i)
+            else:
+                tails[k] = value
+                tail_index[k] = i
+            previous[i] = tail_index[k - 1] if k else -1
+        result = []
+        i = tail_index[-1] if tail_index else -1
+        while i != -1:
+            result.append(i)
+            i = previous[i]
+        return result[::-1]
+
+
+class ScheduleRow:
+    """One checkbox line in a schedule day. Rows are never destroyed: a day keeps the
+    ones it has made and rebinds them to whatever items it shows next (see
+    ScheduleDayView), and ticking a box only restyles that row."""
+    def __init__(self, day):
+        self.day = day
+        self.item = None
+        self.shown = None # what the widgets currently show
+        self.packed = False
+        self.var = tk.BooleanVar()
+        self.frame = tk.Frame(day.rows_frame)
+        self.check = tk.Checkbutton(self.frame, variable=self.var, anchor="w", justify="left",
+                                    wraplength=260, command=self._on_toggle)
+        self.check.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.delete_label = tk.Label(self.frame, text="\u2715", fg="#AA3333", cursor="hand2", font=("Segoe UI", 8))
+        self.delete_label.bind("<Button-1>", lambda e: self._on_delete())
+
+    def show(self, item, label_text, bg_color, text_color, interactive):
+        self.item = item
+        checked = item.get("checked", False)
+        state = (label_text, checked, bg_color, text_color, interactive)
+        if state != self.shown:
+            fonts = self.day.fonts
+            self.var.set(checked)
+            self.frame.configure(bg=bg_color)
+            self.check.configure(text=label_text, bg=bg_color, activebackground=bg_color, fg=text_color,
+                                 disabledforeground=text_color, font=fonts["strike"] if checked else fonts["normal"],
+                                 state=tk.NORMAL if interactive else tk.DISABLED)
+            if interactive:
+                self.delete_label.configure(bg=bg_color)
+                self.delete_label.pack(side=tk.RIGHT, padx=(4, 0))
+            else:
+                self.delete_label.pack_forget()
+            self.shown = state
+        if not self.packed:
+            self.frame.pack(fill=tk.X, padx=8, pady=1)
+            self.packed = True
+
+    def hide(self):
+        if self.packed:
+            self.frame.pack_forget()
+            self.packed = False
+
+    def _on_toggle(self):
+        checked = self.var.get()
+        self.item["checked"] = checked
+        self.day.manager.save_daily_schedule()
+        self.check.configure(font=self.day.fonts["strike"] if checked else self.day.fonts["normal"])
+        self.shown = self.shown[:1] + (checked,) + self.shown[2:]
+
+    def _on_delete(self):
+        self.day.manager.remove_schedule_item(self.day.date_str, self.item["id"])
+
+
+class ScheduleDayView:
+    """One day's box in the Weekly Schedule pane. The pane keeps one of these per display
+    slot for as long as the app runs; show() rebinds it to a date and its items and only
+    touches the widgets whose content changed, reusing (or hiding) its ScheduleRows."""
+    def __init__(self, manager, parent, fonts):
+        self.manager = manager
+        self.fonts = fonts # Font objects shared by every row in the pane
+        self.date_str = None
+        self.is_past = False
+        self.shown = None
+        self.rows = []
+        self.frame = tk.Frame(parent, highlightbackground="#CCCCCC", highlightthickness=1)
+        self.frame.pack(fill=tk.X, padx=4, pady=4)
+        self.header = tk.Label(self.frame, anchor="w")
+        self.header.pack(fill=tk.X, padx=6, pady=(6, 2))
+        self.header.bind("<Button-1>", lambda e: self._on_header_click())
+        self.rows_frame = tk.Frame(self.frame)
+        self.rows_frame.pack(fill=tk.X)
+        self.empty_label = tk.Label(self.rows_frame, text="No items yet", fg="#999999",
+                                    font=("Segoe UI", 9, "italic"))
+        self.quickadd_frame = tk.Frame(self.frame)
+        self.quickadd_var = tk.StringVar()
+        quickadd_entry = ttk.Entry(self.quickadd_frame, textvariable=self.quickadd_var)
+        quickadd_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        quickadd_entry.bind("<Return>", lambda e: self.manager.add_quickadd_item(self.date_str, self.quickadd_var))
+        ttk.Button(self.quickadd_frame, text="+", width=3,
+                   command=lambda: self.manager.add_quickadd_item(self.date_str, self.quickadd_var)).pack(side=tk.LEFT, padx=(4, 0))
+
+    def show(self, day_date, today, is_next_week, items, task_index, expanded):
+        global today_schedule_color, past_schedule_color, past_schedule_text_color
+        date_str = day_date.strftime("%Y-%m-%d")
+        is_today = (day_date == today)
+        is_past = (day_date < today)
+        rows = []
+        for item in items:
+            if item.get("kind") == "task":
+                task = task_index.get(item.get("task_id"))
+                rows.append(task.short_desc if task else "(deleted task)")
+            else:
+                rows.append(item.get("desc", ""))
+        #checkboxes restyle themselves, so checked state only matters here for a past day's count
+        done_count = sum(1 for i in items if i.get("checked", False)) if is_past else None
+        state = (date_str, is_today, is_past, is_next_week, expanded, done_count,
+                 tuple((item["id"], text) for item, text in zip(items, rows)))
+        if state == self.shown:
+            return
+        self.shown = state
+        if date_str != self.date_str:
+            self.quickadd_var.set("")
+        self.date_str = date_str
+        self.is_past = is_past
+
+        if is_today:
+            bg_color = today_schedule_color
+            text_color = "black"
+        elif is_past:
+            bg_color = past_schedule_color
+            text_color = past_schedule_text_color
         else:
-            self.contingents = contingents
-        self.delegate = delegate
-        if status is None:
-            self.status = "active"
+            bg_color = self.manager.default_day_bg
+            text_color = "black"
+        self.frame.configure(bg=bg_color)
+        self.rows_frame.configure(bg=bg_color)
+
+        header_text = day_date.strftime("%A, %b %d")
+        if is_next_week:
+            header_text += "  (Next Week)"
+        if is_past:
+            summary = f"  \u2014 {done_count}/{len(items)} done" if items else "  \u2014 nothing recorded"
+            arrow = "\u25be" if expanded else "\u25b8"
+            self.header.configure(text=f"{arrow} {header_text}{summary}", bg=bg_color, fg=text_color,
+                                  font=("Segoe UI", 9), cursor="hand2")
+            self.header.pack_configure(pady=4)
         else:
-            self.status = status
-        self.completion_date = completion_date
-        self.snooze_until = snooze_until
-        self.impact_is_percentage = impact_is_percentage
-        self.recurrence_type = recurrence_type
-        if recurrence_settings is None:
-            self.recurrence_settings = {}
+            self.header.configure(text=header_text, bg=bg_color, fg=text_color,
+                                  font=("Segoe UI", 10, "bold"), cursor="")
+            self.header.pack_configure(pady=(6, 2))
+
+        listed = items if (expanded or not is_past) else []
+        for i, (item, text) in enumerate(zip(listed, rows)):
+            if i == len(self.rows):
+                self.rows.append(ScheduleRow(self))
+            self.rows[i].show(item, text, bg_color, text_color, interactive=not is_past)
+        for row in self.rows[len(listed):]:
+            row.hide()
+        self.rows_frame.pack_configure(pady=(0, 4) if listed and is_past else 0)
+
+        if is_past or items:
+            self.empty_label.pack_forget()
         else:
-            self.recurrence_settings = recurrence_settings
-        self.first_active_date = first_active_date
-        self.delegate_reminder_days = delegate_reminder_days
-
-    def calculate_priority(self, tasks, for_adventure = False):
-        if self.status != "active" and not for_adventure:
-            return -1
-        for prereq_id in self.prerequisites:
-            prereq = next((t for t in tasks if t.id == prereq_id), None)
-            if prereq and prereq.status != "completed":
-                return -1
-        now = datetime.now()
-        urgency = math.ceil((self.due_date - now).total_seconds()/(24*60*60))
-        impact_value = self.impact
-        if not self.impact_is_percentage:
-            impact_value = impact_value * 100/impact_high_dollars
-        safety_term = 0.3 * self.safety / 100
-        hype_term = 0.2 * self.hype / 100
-        impact_term = 0.1 * impact_value / 100
-        raw_urgency_contrib = max(0, 0.4 * ((urgency / (0-60)) +1 ))
-        raw_base = safety_term + hype_term + impact_term + raw_urgency_contrib
-
-        # Collect eligible tasks for normalization: active, not snoozed, not delegated, not WIN, no unmet prereqs
-        eligible_tasks = []
-        for t in tasks:
-            if t.status != "active" or t.is_snoozed() or t.delegate or t.is_win:
-                continue
-            unmet = any(
-                next((tt for tt in tasks if tt.id == pid), None).status != "completed"
-                for pid in t.prerequisites
-                if next((tt for tt in tasks if tt.id == pid), None)
-            )
-            if not unmet:
-                eligible_tasks.append(t)
-
-        if eligible_tasks:
-            # Precompute the max raw_base among eligible tasks
-            max_raw_base = 0
-            for t in eligible_tasks:
-                t_urgency = math.ceil((t.due_date - now).total_seconds() / 86400)
-                t_impact_value = t.impact if t.impact_is_percentage else t.impact * 100 / impact_high_dollars
-                t_safety_term = 0.3 * t.safety / 100
-                t_hype_term = 0.2 * t.hype / 100
-                t_impact_term = 0.1 * t_impact_value / 100
-                t_raw_urgency = max(0, 0.4 * ((t_urgency / (0-60)) +1 ))
-                t_raw_base = t_safety_term + t_hype_term + t_impact_term + t_raw_urgency
-                if t_raw_base > max_raw_base:
-                    max_raw_base = t_raw_base
-
-            # If this task is eligible, normalize
-            if self in eligible_tasks:
-                if max_raw_base > 0:
-                    normalized_base = raw_base / max_raw_base
-                else:
-                    normalized_base = 0
-                priority = normalized_base * 100
-            else:
-                # Not eligible, use original calculation
-                priority = raw_base * 100
+            self.empty_label.configure(bg=bg_color)
+            self.empty_label.pack(anchor="w", padx=12, pady=(0, 4))
+        if is_past:
+            self.quickadd_frame.pack_forget()
         else:
-            # No eligible tasks, use original
-            priority = raw_base * 100
-
-        if priority > 100:
-            priority = 100
-        if self.is_win:
-            priority += 101
-        for cont_id in self.contingents:
-            cont = next((t for t in tasks if t.id == cont_id), None)
-            if cont and cont.status == "active":
-                cont_priority = cont.calculate_priority(tasks)
-                if cont_priority > priority:
-                    priority = cont_priority
-        return priority
-
-    def _get_reminder_timing(self, last_reminder_date=None):
-        """
-        Helper method to calculate delegate reminder timing.
-        Returns a tuple: (is_due: bool, days_to_next: int).
-        is_due is True if a reminder is due today.
-        days_to_next is the number of days until the next reminder (0 if due today).
-        
-        last_reminder_date: date of the most recent completed reminder, or None if none exists.
-        """
-        if not self.delegate or self.delegate_reminder_days == 0:
-            return False, None
-        current_time = datetime.now()
-        reference = (self.first_active_date or self.due_date)
-        days_since_start = (current_time - reference).days
-        if days_since_start < 0:  # Handle future start dates
-            return False, -days_since_start
-        if last_reminder_date is None: # no reminder ever sent
-            days_since_last = days_since_start
+            self.quickadd_frame.configure(bg=bg_color)
+            self.quickadd_frame.pack(fill=tk.X, padx=6, pady=(2, 6))
+
+    def _on_header_click(self):
+        if not self.is_past:
+            return
+        expanded_days = self.manager._expanded_past_days
+        if self.date_str in expanded_days:
+            expanded_days.discard(self.date_str)
         else:
-            days_since_last = (current_time.date() - last_reminder_date).days
-        is_due = days_since_last >= self.delegate_reminder_days
-        days_to_next = max(0, self.delegate_reminder_days - days_since_last)
-        #print(f"is due: {is_due}, days: {days_to_next}")
-        return is_due, days_to_next
-
-    def get_time_to_delegate_reminder(self):
-        #print(f"time to reminder: {self.delegate_reminder_days}")
-        if self.delegate and self.delegate_reminder_days != 0 and self.status == "active" and not self.is_snoozed():
-            _, days_to_next = self._get_reminder_timing()  # no last_reminder_date; conservative display estimate
-            if days_to_next is not None:
-                return f"{days_to_next} days"
-        return "N/A"
-
-    def needs_reminder(self, tasks, last_reminder_date=None):
-        #print(f"needs reminder: {self.delegate}, {self.status}, {self.is_snoozed()}")
-        if self.delegate and self.status == "active" and not self.is_snoozed():
-            priority = self.calculate_priority(tasks)
-            if priority < 0:
-                return False
-            is_due, _ = self._get_reminder_timing(last_reminder_date=last_reminder_date)
-            return is_due
-        return False
-
-    def is_snoozed(self):
-        return self.snooze_until and self.snooze_until > datetime.now()
-
-    def get_state(self, tasks):
-        if self.status == "completed":
-            return "Complete"
-        if self.status == "abandoned":
-            return "Abandoned"
-        if self.is_snoozed():
-            return "Snoozed"
-        if self.calculate_priority(tasks) < 0 and self.status == "active":
-            return "Contingent"
-        return "Actionable"
-
-    def get_snooze_duration(self):
-        if self.is_snoozed():
-            delta = self.snooze_until - datetime.now()
-            return f"{delta.days + 1} days"
-        return "N/A"
-
-    def get_next_revival_time(self, reference_time=None):
-        if self.recurrence_type == "none":
-            return None
-        if reference_time is None:
-            reference_time = self.first_active_date if self.first_active_date else self.due_date
-        if not reference_time:
-            return None
-
-        if self.recurrence_type == "weekly":
-            days_of_week = self.recurrence_settings.get("days", [])
-            if not days_of_week:
-                return None
-            day_map = {"Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6}
-            target_days = [day_map[day] for day in days_of_week]
-            current_weekday = reference_time.weekday()
-            days_ahead = []
-            for target in target_days:
-                delta = (target - current_weekday) % 7
-                if delta == 0:
-                    delta = 7
-                days_ahead.append(delta)
-                
-            min_days = min(days_ahead)
-            #print("days ahead map:",days_ahead)
-            #print("next recurrence mapped to...", reference_time + timedelta(days=min_days))
-            return reference_time + timedelta(days=min_days)
-
-        elif self.recurrence_type == "monthly":
-            target_day = self.recurrence_settings.get("day", 1)
-            next_month = reference_time.replace(day=1) + timedelta(days=32)
-            next_month = next_month.replace(day=1)
-            last_day_of_month = calendar.monthrange(next_month.year, next_month.month)[1]
-            actual_day = min(target_day, last_day_of_month)
-            return next_month.replace(day=actual_day)
-
-        elif self.recurrence_type == "annually":
-            target_month = self.recurrence_settings.get("month", 1)
-            target_day = self.recurrence_settings.get("day", 1)
-            next_year = reference_time.replace(year=reference_time.year + 1)
-            last_day_of_month = calendar.monthrange(next_year.year, target_month)[1]
-            actual_day = min(target_day, last_day_of_month)
-            return next_year.replace(month=target_month, day=actual_day)
-
-        elif self.recurrence_type == "every_n":
-            n = self.recurrence_settings.get("n", 1)
-            unit = self.recurrence_settings.get("unit", "days")
-            target = self.recurrence_settings.get("target")
-            if unit == "days":
-                return reference_time + timedelta(days=n)
-            elif unit == "weeks":
-                day_map = {"Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6}
-                target_day = day_map[target]
-                next_date = reference_time + timedelta(weeks=n)
-                days_ahead = (target_day - next_date.weekday()) % 7
-                if days_ahead == 0:
-                    days_ahead = 7
-                return next_date + timedelta(days=days_ahead)
-            elif unit == "months":
-                next_date = reference_time + timedelta(days=32 * n)
-                next_date = next_date.replace(day=1)
-                last_day_of_month = calendar.monthrange(next_date.year, next_date.month)[1]
-                actual_day = min(target, last_day_of_month)
-                return next_date.replace(day=actual_day)
-            elif unit == "years":
-                next_date = reference_time.replace(year=reference_time.year + n)
-                last_day_of_month = calendar.monthrange(next_date.year, target)[1]
-                actual_day = min(self.recurrence_settings.get("day", 1), last_day_of_month)
-                return next_date.replace(month=target, day=actual_day)
-        return None
+            expanded_days.add(self.date_str)
+        self.manager.refresh_schedule_pane()
+
+
+class RelatedTaskPicker:
+    """The task list in the prerequisite/contingent popup. It draws only the rows on
+    screen, using a fixed pool of canvas items that are moved and relabelled as the
+    list scrolls. Ticks live in two plain sets of task ids instead of a BooleanVar
+    and an embedded Checkbutton per task. Search narrows incrementally: the results
+    of every query typed are kept, so a longer query only rechecks the matches of the
+    one it extends, and backspacing is a lookup."""
+    HEADERS = ["Description", "Due Date", "Prereq", "Cont"]
+    COL_WIDTHS = [200, 100, 60, 60] # Short Desc, Due Date, Prereq, Cont
+    X_OFFSET = 5
+    TOP = 40 # rows start below the headers
+    TEXT_GAP = 5
+    BOX = 12 # checkbox size
+
+    def __init__(self, canvas, tasks, docs, prerequisites, contingents, font):
+        self.canvas = canvas
+        self.font = font
+        self.tasks = tasks # the tasks that can be picked, in list order
+        self.docs = docs # task id -> lowercased searchable text
+        self.prerequisites = {t.id for t in tasks if t.id in prerequisites}
+        self.contingents = {t.id for t in tasks if t.id in contingents}
+        self.results = {"": tasks} # query -> matching tasks
+        self.visible = tasks
+        self.selected_id = None
+        self.slots = []
+        self.short_descs = {} # task id -> description truncated to its column
+        self.row_height = font.metrics("linespace") + self.TEXT_GAP * 2
+        self.col_positions = [self.X_OFFSET]
+        for width in self.COL_WIDTHS[:-1]:
+            self.col_positions.append(self.col_positions[-1] + width)
+        self.width = sum(self.COL_WIDTHS) + self.X_OFFSET
+        self._tooltip = None
+        self._tooltip_job = None
+        for x, header in zip(self.col_positions, self.HEADERS):
+            canvas.create_text(x, 10, text=header, anchor=tk.NW, font=font)
+        self._set_scrollregion()
+
+    def search(self, query):
+        query = query.lower()
+        results = self.results.get(query)
+        if results is None:
+            end = len(query) - 1
+            while query[:end] not in self.results:
+                end -= 1
+            docs = self.docs
+            results = [t for t in self.results[query[:end]] if query in docs[t.id]]
+            self.results[query] = results
+        self.visible = results
+        self._set_scrollregion()
+        self.canvas.yview_moveto(0)
+        self.draw()
+
+    def _set_scrollregion(self):
+        height = max(200, len(self.visible) * self.row_height + self.TOP)
+        self.canvas.config(scrollregion=(0, 0, self.width, height))
+
+    def draw(self, *args):
+        """Points the slot pool at the rows currently in view."""
+        canvas = self.canvas
+        first = max(0, int((canvas.canvasy(0) - self.TOP) // self.row_height))
+        count = canvas.winfo_height() // self.row_height + 2
+        while len(self.slots) < count:
+            self.slots.append(self._new_slot(len(self.slots)))
+        for i, slot in enumerate(self.slots):
+            row = first + i
+            if i < count and row < len(self.visible):
+                self._fill(slot, row, self.visible[row])
+            elif slot["shown"] is not None:
+                canvas.itemconfig(slot["tag"], state="hidden")
+                slot["task"] = slot["shown"] = None
+
+    def _new_slot(self, i):
+        canvas = self.canvas
+        tag = f"slot{i}"
+        slot = {"tag": tag, "task": None, "shown": None}
+        slot["rect"] = canvas.create_rectangle(0, 0, 0, 0, fill="white", tags=(tag, tag + "_row"))
+        slot["desc"] = canvas.create_text(0, 0, anchor=tk.NW, font=self.font, tags=(tag, tag + "_row", tag + "_desc"))
+        slot["date"] = canvas.create_text(0, 0, anchor=tk.NW, font=self.font, tags=(tag, tag + "_row"))
+        for kind in ("prerequisites", "contingents"):
+            slot[kind] = (canvas.create_rectangle(0, 0, 0, 0, fill="white", tags=(tag, tag + "_" + kind)),
+                          canvas.create_text(0, 0, text="✓", font=self.font, tags=(tag, tag + "_" + kind)))
+            canvas.tag_bind(tag + "_" + kind, "<Button-1>", lambda e, s=slot, k=kind: self._toggle(s, k))
+        canvas.tag_bind(tag + "_row", "<Button-1>", lambda e, s=slot: self._select(s))
+        canvas.tag_bind(tag + "_desc", "<Enter>", lambda e, s=slot: self._schedule_tooltip(s))
+        canvas.tag_bind(tag + "_desc", "<Leave>", lambda e: self._hide_tooltip())
+        return slot
+
+    def _fill(self, slot, row, task):
+        state = (row, task.id, task.id == self.selected_id,
+                 task.id in self.prerequisites, task.id in self.contingents)
+        slot["task"] = task
+        if state == slot["shown"]:
+            return
+        canvas = self.canvas
+        y = self.TOP + row * self.row_height
+        canvas.coords(slot["rect"], self.X_OFFSET, y, self.width, y + self.row_height)
+        canvas.itemconfig(slot["rect"], fill="lightblue" if state[2] else "white", state="normal")
+        canvas.coords(slot["desc"], self.col_positions[0] + 3, y + self.TEXT_GAP)
+        canvas.itemconfig(slot["desc"], text=self._short_desc(task), state="normal")
+        canvas.coords(slot["date"], self.col_positions[1], y + self.TEXT_GAP)
+        canvas.itemconfig(slot["date"], text=task.due_date.strftime("%Y-%m-%d"), state="normal")
+        for col, kind, checked in ((2, "prerequisites", state[3]), (3, "contingents", state[4])):
+            box, mark = slot[kind]
+            x = self.col_positions[col] + self.COL_WIDTHS[col] // 2
+            y_mid = y + self.row_height // 2
+            half = self.BOX // 2
+            canvas.coords(box, x - half, y_mid - half, x + half, y_mid + half)
+            canvas.itemconfig(box, state="normal")
+            canvas.coords(mark, x, y_mid)
+            canvas.itemconfig(mark, state="normal" if checked else "hidden")
+        slot["shown"] = state
+
+    def _short_desc(self, task):
+        text = self.short_descs.get(task.id)
+        if text is None:
+            text = self.short_descs[task.id] = self.truncate_text(task.short_desc, self.COL_WIDTHS[0] - 3, self.font)
+        return text
+
+    @staticmethod
+    def truncate_text(text, max_width, font):
+        if font.measure(text) <= max_width:
+            return text
+        truncated = ""
+        for word in text.split(" "):
+            test_line = truncated + " " + word if truncated else word
+            test_line_with_ellipsis = test_line + "..."
+            if font.measure(test_line_with_ellipsis) <= max_width:
+                truncated = test_line
+            else:
+                # If adding the word exceeds width, stop and add ellipsis
+                return truncated + "..." if truncated else ""
+        return truncated + "..." if truncated else ""
 
-class Person:
-    def __init__(self, name, job_title, department, area="", is_contractor=False, id=None):
-        if id is None:
-            self.id = str(uuid.uuid4())
+    def _toggle(self, slot, kind):
+        task = slot["task"]
+        if task is None:
+            return
+        ticked = getattr(self, kind)
+        if task.id in ticked:
+            ticked.discard(task.id)
         else:
-            self.id = id
-        self.name = name
-        self.job_title = job_title
-        self.department = department
-        self.area = area
-        self.is_contractor = is_contractor
-
-class TaskManager:
+            ticked.add(task.id)
+        self._fill(slot, slot["shown"][0], task)
+
+    def _select(self, slot):
+        if slot["task"] is None:
+            return
+        self.selected_id = slot["task"].id
+        self.draw()
+
+    def _schedule_tooltip(self, slot):
+        self._hide_tooltip()
+        if slot["task"] is not None:
+            self._tooltip_job = self.canvas.after(500, lambda: self._show_tooltip(slot))
+
+    def _show_tooltip(self, slot):
+        self._tooltip_job = None
+        if slot["task"] is None:
+            return
+        x, y = self.canvas.coords(slot["desc"])
+        x = self.canvas.winfo_rootx() + x + 10
+        y = self.canvas.winfo_rooty() + int(y - self.canvas.canvasy(0)) - 10
+        self._tooltip = tk.Toplevel(self.canvas)
+        self._tooltip.wm_overrideredirect(True)
+        self._tooltip.wm_geometry(f"+{int(x)}+{y}")
+        label = tk.Label(self._tooltip, text=slot["task"].short_desc, justify='left',
+                         background="#ffffff", relief='solid', borderwidth=1,
+                         wraplength=200)
+        label.pack(ipadx=1)
+
+    def _hide_tooltip(self):
+        if self._tooltip_job is not None:
+            self.canvas.after_cancel(self._tooltip_job)
+            self._tooltip_job = None
+        if self._tooltip is not None:
+            self._tooltip.destroy()
+            self._tooltip = None
+
+
+class TaskManager(TaskStore):
+    filter_columns = {
+        "actionable": ("Short Desc", "Priority", "Due Date", "Recurring"),
+        "all": ("Short Desc", "Priority", "Due Date", "State"),
+        "snoozed": ("Short Desc", "Priority", "Due Date", "Snooze/Reminder", "Delegated", "Recurring"),
+        "contingent": ("Short Desc", "Due Date", "State"),
+        "completed_abandoned": ("Short Desc", "Due Date", "Completed/Abandoned Date", "State", "W.I.N."),
+    }
     def __init__(self):
         global window_geometry, default_main_sashpos, default_second_sashpos
-        self.tasks = []
-        self.people = []
-        self.daily_schedule = {}
+        super().__init__()
         self.current_filter = "actionable"
         self.sort_column = "Priority"
         self.sort_direction = "desc"
         self.current_task_id = None
+        self._search_index_job = None
+        self.search_results = SearchResultCache()
+        self._search_job = None
+        self._wakeups = {}             # kind -> (instant, root.after job) for set_wakeup
         self.adventure_manager = AdventureManager(self)
-        self.load_data()
-        self.load_daily_schedule()
+        self.load()
         self.root = tk.Tk()
+        self.persistence.root = self.root #saves are coalesced and written off the Tk thread
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.schedule_search_indexing()
+        self.schedule_snooze_wakeup()
         self.root.title("Task Prioritizer")
         self.root.geometry(window_geometry)
         self.search_query = tk.StringVar()
@@ -313,6 +594,7 @@ class TaskManager:
         # the GUI (and adventure manager hooks) are fully wired up, then refresh.
         self.process_daily_schedule_registrations()
         self.update_task_list()
+        self.schedule_midnight_rollover()
 
         def _set_sash_positions():
             self.main_frame.sashpos(0, default_main_sashpos)
@@ -347,51 +629,6 @@ class TaskManager:
         self.estyle.configure("cdstyle.TEntry",background="black",foreground="black",fieldbackground="white")
         
 
-    def load_data(self):
-        try:
-            with open("task_data.json", "r") as f:
-                data = json.load(f)
-                self.people = [Person(**p) for p in data.get("people", [])]
-                person_map = {p.id: p for p in self.people}
-                for task_data in data.get("tasks", []):
-                    if isinstance(task_data["due_date"], str):
-                        task_data["due_date"] = datetime.fromisoformat(task_data["due_date"])
-                    if task_data.get("completion_date") and isinstance(task_data["completion_date"], str):
-                        task_data["completion_date"] = datetime.fromisoformat(task_data["completion_date"])
-                    if task_data.get("snooze_until") and isinstance(task_data["snooze_until"], str):
-                        task_data["snooze_until"] = datetime.fromisoformat(task_data["snooze_until"])
-                    if task_data.get("first_active_date") and isinstance(task_data["first_active_date"], str):
-                        task_data["first_active_date"] = datetime.fromisoformat(task_data["first_active_date"])
-                    task_data.pop("last_revival_time", None)
-                    task_data["safety"] = task_data.get("safety", 50)
-                    task_data["hype"] = task_data.get("hype", 50)
-                    task_data["impact"] = task_data.get("impact", 0)
-                    task_data["impact_is_percentage"] = task_data.get("impact_is_percentage", True)
-                    task_data["delegate_reminder_days"] = task_data.get("delegate_reminder_days", 1)
-                    delegate_id = task_data.get("delegate")
-                    if delegate_id:
-                        task_data["delegate"] = person_map.get(delegate_id)
-                    else:
-                        task_data["delegate"] = None
-                    self.tasks.append(Task(**task_data))
-        except FileNotFoundError:
-            pass
-
-    def save_data(self):
-        tasks_data = []
-        for t in self.tasks:
-            task_dict = vars(t).copy()
-            if task_dict["delegate"]:
-                task_dict["delegate"] = task_dict["delegate"].id
-            tasks_data.append(task_dict)
-        data = {
-            "tasks": tasks_data,
-            "people": [vars(p) for p in self.people],
-            "leaderboard": self.adventure_manager.leaderboard
-        }
-        with open("task_data.json", "w") as f:
-            json.dump(data, f, default=str)
-
     def setup_gui(self):
         global default_main_sashpos
         self.main_frame = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
@@ -405,7 +642,7 @@ class TaskManager:
         ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
         search_entry = ttk.Entry(search_frame, textvariable=self.search_query)
         search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        self.search_query.trace("w", lambda name, index, mode, sv=self.search_query: self.update_task_list())
+        self.search_query.trace("w", lambda name, index, mode: self.on_search_changed())
 
         filter_frame = ttk.Frame(self.list_frame)
         filter_frame.pack(fill=tk.X, side=tk.TOP)
@@ -439,9 +676,17 @@ class TaskManager:
         self.tree.column("Recurring", width=30)
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.setup_scrollbar()
+        self.task_view = VirtualTaskListView(self.tree, self.y_scrollbar)
+        self.shown_columns = None
+        self.listed_filter = None
 
         for col in self.all_columns:
             self.tree.heading(col, command=lambda c=col: self.sort_by_column(c))
+        self.tree.bind("<ButtonRelease-1>", self.show_task_details)
+        self.tree.bind("<KeyRelease-Up>", self.queue_task_details)
+        self.tree.bind("<KeyRelease-Down>", self.queue_task_details)
+        self.tree.bind("<KeyRelease-Left>", self.queue_task_details)
+        self.tree.bind("<KeyRelease-Right>", self.queue_task_details)
 
         button_frame = ttk.Frame(self.list_frame)
         button_frame.pack(fill=tk.X, side=tk.TOP)
@@ -466,6 +711,7 @@ class TaskManager:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         self.detail_widgets = {}
+        self.build_task_details()
 
         schedule_container = ttk.Frame(self.main_frame)
         self.main_frame.add(schedule_container, weight=1)
@@ -510,127 +756,145 @@ class TaskManager:
         self.current_filter = filter_type
         self.update_task_list()
 
+    def set_wakeup(self, key, wakeup, callback):
+        #one root.after per kind of timed event (rescoring, reminders, snoozes), aimed at
+        #the earliest pending instant and only moved when that instant changes
+        if not hasattr(self, "root"):
+            return
+        at, job = self._wakeups.get(key, (None, None))
+        if wakeup == at:
+            return
+        if job is not None:
+            self.root.after_cancel(job)
+        if wakeup is None:
+            self._wakeups.pop(key, None)
+            return
+        delay_ms = int((wakeup - datetime.now()).total_seconds() * 1000) + 50
+        delay_ms = min(max(0, delay_ms), 3600 * 1000) #re-check hourly in case the clock jumps
+        self._wakeups[key] = (wakeup, self.root.after(delay_ms, partial(self._fire_wakeup, key, callback)))
+
+    def _fire_wakeup(self, key, callback):
+        self._wakeups.pop(key, None)
+        callback()
+
+    def schedule_priority_wakeup(self):
+        #scores only move on their own when a due date crosses a day boundary or a snooze
+        #runs out, so one timer aimed at the earliest of those instants is all we need
+        self.set_wakeup("priorities", self.priority_cache.next_wakeup(), self._on_priority_wakeup)
+
+    def _on_priority_wakeup(self):
+        #nothing was edited, so there's nothing to save: just show the new scores
+        misses = self.priority_cache.misses
+        priorities = self.refresh_priorities()
+        if self.priority_cache.misses != misses:
+            self.render_task_list(priorities)
+
+    def schedule_snooze_wakeup(self):
+        self.set_wakeup("snoozes", self.snoozes.next_expiry(), self._on_snooze_wakeup)
+
+    def _on_snooze_wakeup(self):
+        #only the tasks that just woke up get looked at again: they're rescored (which is
+        #what moves them into the actionable set), their reminder timing is redone, and
+        #the list is redrawn from the cached scores
+        woken = self.wake_snoozed()
+        if woken:
+            self.render_task_list(self.refresh_priorities())
+            if hasattr(self, "schedule_inner") and any(item.get("task_id") in woken
+                                                        for items in self.daily_schedule.values() for item in items):
+                self.refresh_schedule_pane()
+        self.schedule_snooze_wakeup()
+
+    def schedule_reminder_wakeup(self):
+        #reminders come due on their own schedule, whether or not anything redraws the list
+        self.set_wakeup("reminders", self.reminders.next_wakeup(), self._on_reminder_wakeup)
+
+    def _on_reminder_wakeup(self):
+        if self.generate_reminders():
+            self.update_task_list()
+
+    def on_search_changed(self):
+        #wait for a pause in typing; each key cancels the filter the previous one queued
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(search_debounce_ms, self._run_search)
+
+    def _run_search(self):
+        self._search_job = None
+        self.render_task_list()
+
+    def queue_adventures(self, completions):
+        try:
+            self.adventure_manager.queue_adventures(completions)
+        except Exception as e:
+            print("a_manager error:", e)
+
+    def leaderboard_entries(self):
+        return self.adventure_manager.leaderboard
+
+    def schedule_search_indexing(self):
+        #index queued tasks a slice at a time so a big history never stalls the UI;
+        #until then the search scans whatever isn't indexed yet
+        if not hasattr(self, "root") or self._search_index_job is not None or not self.search_index.pending:
+            return
+        self._search_index_job = self.root.after(1, self._index_search_slice)
+
+    def _index_search_slice(self):
+        self._search_index_job = None
+        if self.search_index.index_pending(limit=300):
+            self.schedule_search_indexing()
+
     def update_task_list(self):
-        current_time = datetime.now()
-        #if the task is delegated, and it's time for a reminder, create a reminder task.
-        for task in [t for t in self.tasks if t.delegate and t.status == "active"]:
-            # Find last completed reminder date upfront
-            last_completed_reminder = next(
-                (
-                    t for t in sorted(
-                        (t for t in self.tasks
-                         if t.contingents
-                         and t.contingents[0] == task.id
-                         and "[remind delegate]" in t.short_desc
-                         and t.status in ["completed", "abandoned"]),
-                        key=lambda t: t.completion_date, reverse=True
-                    )
-                ), None
-            )
-            last_reminder_date = last_completed_reminder.completion_date.date() if last_completed_reminder else None
-
-            if task.needs_reminder(self.tasks):
-                #For each task, if it needs a reminder...
-                #Find out if there's already a reminder task for this.
-                reminder_task = next(
-                    (
-                        t for t in self.tasks
-                        if t.contingents
-                        and t.contingents[0] == task.id
-                        and "[remind delegate]" in t.short_desc
-                        and t.status == "active"
-                        and not t.is_snoozed()
-                    ),
-                    None
-                )
-                if not reminder_task:
-                    print("reminder task not found")
-                    #if there's no reminder, find out if the last completed reminder is recent:
-                    try:
-                        last_completed_reminder = max(
-                            (
-                                t for t in self.tasks
-                                if t.contingents
-                                and t.contingents[0] == task.id
-                                and "[remind delegate]" in t.short_desc
-                                and t.status in ["completed", "abandoned"]
-                            ), key=lambda t: t.completion_date, default=None
-                        )
-                        print(f"last_completed: {last_completed_reminder}")
-                    except Exception as e:
-                        last_completed_reminder = None
-                        print("Failed to get last reminder:",e)
-                    make_reminder = True
-                    if last_completed_reminder:
-                        make_reminder = False
-                        today = datetime.now().date()
-                        time_since_last_reminder = (today - last_completed_reminder.completion_date.date()).days
-                        print(f"last reminder was found: {time_since_last_reminder}")
-                        #print("time since:",time_since_last_reminder)
-                        #print("reminder days:",task.delegate_reminder_days)
-                        if time_since_last_reminder > task.delegate_reminder_days:
-                            make_reminder = True
-                            #if the last completed reminder isn't too recent, create a new reminder
-                    if make_reminder:
-                        due_date = (current_time + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-                        reminder_task = Task(
-                            short_desc=f"[remind delegate] {task.short_desc}",
-                            long_desc="Delegated to "+task.delegate.name+": "+task.long_desc,
-                            safety=task.safety,
-                            impact=task.impact,
-                            hype=task.hype,
-                            due_date=due_date,
-                            area=task.area,
-                            entity=task.entity,
-                            maintenance_plan=task.maintenance_plan,
-                            procedure_doc=task.procedure_doc,
-                            requestor=task.requestor,
-                            project=task.project,
-                            is_win=task.is_win,
-                            prerequisites=None,
-                            contingents=[task.id],
-                            delegate=None,
-                            status="active",
-                            impact_is_percentage=task.impact_is_percentage,
-                            recurrence_type="none",
-                            first_active_date=current_time,
-                            delegate_reminder_days=0  # Reminder tasks don't need their own reminders
-                        )
-                        self.tasks.append(reminder_task)
-                        print("creating reminder task...",reminder_task.short_desc)
+        priorities = self.refresh_priorities()
+        #if a delegated task is due a reminder, create a reminder task.
+        if self.generate_reminders(priorities):
+            priorities = self.refresh_priorities()
         self.save_data()
+        self.render_task_list(priorities)
 
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        if hasattr(self, "schedule_inner"):
+            self.refresh_schedule_pane()
 
-        ## Set up the headers based on the current filter mode
-        search_text = self.search_query.get().lower().strip()
+    def filtered_tasks(self, priorities):
+        """The tasks the current filter lists, before searching and sorting."""
         if self.current_filter == "actionable":
-            tasks = [t for t in self.tasks if t.status == "active" and t.calculate_priority(self.tasks) >= 0 and not t.is_snoozed() and not t.delegate]
-            active_columns = ("Short Desc", "Priority", "Due Date", "Recurring")
+            tasks = self.top_actionable()
         elif self.current_filter == "all":
-            tasks = self.tasks
-            active_columns = ("Short Desc", "Priority", "Due Date", "State")
+            tasks = self.all_tasks()
         elif self.current_filter == "snoozed":
-            tasks = [t for t in self.tasks if t.is_snoozed() or (t.status == "active" and t.delegate)]
-            active_columns = ("Short Desc", "Priority", "Due Date", "Snooze/Reminder", "Delegated", "Recurring")
+            snoozed = self.snoozes.snoozed(datetime.now())
+            tasks = [t for t in self.tasks if t.id in snoozed or (t.status == "active" and t.delegate)]
         elif self.current_filter == "contingent":
-            tasks = [t for t in self.tasks if t.calculate_priority(self.tasks) < 0 and t.status == "active"]
-            active_columns = ("Short Desc", "Due Date", "State")
+            tasks = [t for t in self.tasks if priorities[t.id] < 0 and t.status == "active"]
         elif self.current_filter == "completed_abandoned":
-            tasks = [t for t in self.tasks if t.status in ["completed", "abandoned"]]
-            active_columns = ("Short Desc", "Due Date", "Completed/Abandoned Date", "State", "W.I.N.")
-
-        if search_text:
-            tasks = [t for t in tasks if any(search_text in str(getattr(t, field)).lower() 
-                                           for field in ["short_desc", "long_desc", "safety", "impact", "hype", 
-                                                         "area", "entity", "maintenance_plan", "procedure_doc", 
-                                                         "requestor", "project", "is_win", 
-                                                         "due_date"] 
-                                           if getattr(t, field) is not None)]
-
-        # Configure only the active columns
-        for col in self.all_columns:
+            tasks = [t for t in self.all_tasks() if t.status in ["completed", "abandoned"]]
+        return tasks
+
+    def render_task_list(self, priorities=None):
+        """Fill the task list from the current filter, search text and sort. This only
+        reads: no reminders are generated and nothing is saved, so the search box can
+        call it on its own."""
+        if self._search_job is not None: #this render already uses the latest search text
+            self.root.after_cancel(self._search_job)
+            self._search_job = None
+        if priorities is None:
+            priorities = self.refresh_priorities()
+        search_text = self.search_query.get().lower().strip()
+        key = (self.current_filter, search_text, self.data_version())
+        active_columns = self.filter_columns[self.current_filter]
+        tasks = self.search_results.get(key)
+        if tasks is None:
+            narrower = self.search_results.narrowest(*key) if search_text else None
+            if narrower is None:
+                tasks = self.filtered_tasks(priorities)
+            else:
+                tasks = narrower
+            if search_text:
+                tasks = self.search_index.filter(tasks, search_text)
+            self.search_results.put(key, tasks)
+        tasks = list(tasks) #sorted in place below; the cached list keeps its order
+
+        # Configure only the active columns (only when the filter changed the set)
+        for col in (self.all_columns if active_columns != self.shown_columns else ()):
             if col in active_columns:
                 self.tree.heading(col, text=col)
                 if col == "Short Desc":
@@ -650,17 +914,19 @@ class TaskManager:
                 self.tree.column(col, width=width, stretch=False)
             else:
                 self.tree.column(col, width=0, stretch=False)  # Hide unused columns
+        self.shown_columns = active_columns
 
         if self.sort_column == "Short Desc":
             tasks.sort(key=lambda t: t.short_desc.lower() if t.short_desc else "", reverse=(self.sort_direction == "desc"))
         elif self.sort_column == "Priority":
-            tasks.sort(key=lambda t: t.calculate_priority(self.tasks) if t.status == "active" else -1, reverse=(self.sort_direction == "desc"))
+            if not (self.current_filter == "actionable" and self.sort_direction == "desc"): #top_actionable is already best-first
+                tasks.sort(key=lambda t: priorities.get(t.id, -1) if t.status == "active" else -1, reverse=(self.sort_direction == "desc"))
         elif self.sort_column == "Due Date":
             tasks.sort(key=lambda t: t.due_date, reverse=(self.sort_direction == "desc"))
         elif self.sort_column == "Completed/Abandoned Date":
             tasks.sort(key=lambda t: t.completion_date if t.completion_date else datetime.min, reverse=(self.sort_direction == "desc"))
         elif self.sort_column == "State":
-            tasks.sort(key=lambda t: t.get_state(self.tasks), reverse=(self.sort_direction == "desc"))
+            tasks.sort(key=lambda t: t.get_state(self.tasks, priorities), reverse=(self.sort_direction == "desc"))
         elif self.sort_column == "Snooze/Reminder":
             tasks.sort(key=lambda t: int(t.get_snooze_duration().split()[0]) if t.is_snoozed() else -1, reverse=(self.sort_direction == "desc"))
         elif self.sort_column == "W.I.N.":
@@ -670,12 +936,13 @@ class TaskManager:
         
 
         #("Short Desc", "Priority", "Due Date", "Completed/Abandoned Date", "State", "Snooze/Reminder", "W.I.N.", "Delegated", "Recurring")
+        rows = []
         for task in tasks:
-            priority = f"{task.calculate_priority(self.tasks):.2f}" if task.calculate_priority(self.tasks) >= 0 else "N/A"
+            priority = f"{priorities[task.id]:.2f}" if priorities.get(task.id, -1) >= 0 else "N/A"
             due_date = task.due_date.strftime("%Y-%m-%d")
             if self.current_filter == "all":
                 #print(task.get_state(self.tasks))
-                values = (task.short_desc, priority, due_date,"", task.get_state(self.tasks), "", "", "")
+                values = (task.short_desc, priority, due_date,"", task.get_state(self.tasks, priorities), "", "", "")
             elif self.current_filter == "snoozed":
                 delegated = "✓" if task.delegate else ""
                 snooze_time = task.get_time_to_delegate_reminder() if task.delegate else task.get_snooze_duration()
@@ -683,96 +950,65 @@ class TaskManager:
             elif self.current_filter == "completed_abandoned":
                 completed_date = task.completion_date.strftime("%Y-%m-%d") if task.completion_date else "N/A"
                 win_status = "✓" if task.is_win else ""
-                values = (task.short_desc, "", due_date, completed_date, task.get_state(self.tasks), "", win_status, "")
+                values = (task.short_desc, "", due_date, completed_date, task.get_state(self.tasks, priorities), "", win_status, "")
             elif self.current_filter == "contingent":
                 #print(task.get_state(self.tasks))
-                values = (task.short_desc, "", due_date,"", task.get_state(self.tasks), "", "", "")
+                values = (task.short_desc, "", due_date,"", task.get_state(self.tasks, priorities), "", "", "")
             else:
                 this_recurrence = "" if task.recurrence_type.lower() == "none" else "🕑"
                 values = (task.short_desc, priority, due_date, "", "", "", "", "", this_recurrence)
-            item = self.tree.insert("", "end", values=values)
-            self.tree.item(item, tags=(task.id, "reminder" if "[remind delegate]" in task.short_desc else ""))
+            rows.append((task.id, values, (task.id, "reminder" if "[remind delegate]" in task.short_desc else "")))
+        #a different filter starts at the top; anything else keeps the scroll position
+        self.task_view.set_rows(rows, top=0 if self.current_filter != self.listed_filter else None)
+        self.listed_filter = self.current_filter
         if self.current_filter == "actionable":
             self.tree.tag_configure("reminder", font=("Segoe UI", 9, "bold"))
         else:
             self.tree.tag_configure("reminder", font=("Segoe UI", 9))
             
-        # Re-select the current task if it's in the filtered list
-        if self.current_task_id:
-            task_ids = [task.id for task in tasks]  # IDs of tasks in the current filter
-            if self.current_task_id in task_ids:
-                for item in self.tree.get_children():
-                    if self.tree.item(item, "tags")[0] == self.current_task_id:
-                        self.tree.selection_set(item)
-                        self.tree.focus(item)
-                        self.tree.see(item)  # Ensure the item is visible
-                        break
-
-        
-        # Reconfigure scrollbar and force geometry update
-        self.setup_scrollbar()
-        self.tree.update_idletasks()
-        self.tree_frame.update()
-
-        # Ensure scrollbar visibility based on content
-        #if len(tasks) > 10:  # Arbitrary threshold; adjust based on Treeview height
-        #    self.y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        #else:
-        #    self.y_scrollbar.pack_forget()  # Hide if not needed
-
-        self.tree.bind("<ButtonRelease-1>", self.show_task_details)
-        self.tree.bind("<KeyRelease-Up>", self.show_task_details)
-        self.tree.bind("<KeyRelease-Down>", self.show_task_details)
-        self.tree.bind("<KeyRelease-Left>", self.show_task_details)
-        self.tree.bind("<KeyRelease-Right>", self.show_task_details)
-
-        if hasattr(self, "schedule_inner"):
-            self.refresh_schedule_pane()
+        # Re-select the current task if it's in the filtered list. Rows are keyed by task
+        # id, so this is a lookup, and a row that's already selected keeps the scroll put.
+        if self.current_task_id in self.task_view.index_of:
+            if self.tree.selection() != (self.current_task_id,):
+                self.task_view.see(self.current_task_id)  # Ensure the item is visible (and materialized)
+                self.tree.selection_set(self.current_task_id)
+                self.tree.focus(self.current_task_id)
+                self.task_view.selected_id = self.current_task_id
 
     def add_task(self):
         self.show_task_details(None, new_task=True)
 
-    def show_task_details(self, event=None, task_id=None, new_task=False):
-        for widget in self.detail_frame.winfo_children():
-            widget.destroy()
-
-        if new_task:
-            self.current_task_id = None
-            task = Task("", "", 50, 0, 50, datetime.now() + timedelta(days=7), impact_is_percentage=True)
-        else:
-            if not task_id:
-                selected = self.tree.selection()
-                if not selected:
-                    self.current_task_id = None
-                    return
-                task_id = self.tree.item(selected[0], "tags")[0]
-            task = next((t for t in self.tasks if t.id == task_id), None)
-            if not task:
-                self.current_task_id = None
-                return
-            self.current_task_id = task_id
-
-        if new_task:
-            ttk.Label(self.detail_frame, text="Create New Task").pack(fill=tk.X)
-        else:
-            ttk.Label(self.detail_frame, text="Task Details").pack(fill=tk.X)
+    def build_task_details(self):
+        """Builds the Task Details form once, hidden until a task is shown. show_task_details
+        then rebinds it to a task by setting its variables instead of recreating every
+        widget for each row clicked or arrowed onto, and the button row is only laid out
+        again when the task needs a different set of buttons."""
+        self._detail_task = None
+        self._detail_new = False
+        self._detail_buttons_shown = None
+        self._detail_nav_job = None
+        body = ttk.Frame(self.detail_frame)
+        self.detail_body = body
+
+        self.detail_title = ttk.Label(body, text="Task Details")
+        self.detail_title.pack(fill=tk.X)
         fields = [
-            ("Short Description", "short_desc", tk.StringVar(value=task.short_desc)),
-            ("Area", "area", tk.StringVar(value=task.area)),
-            ("Entity", "entity", tk.StringVar(value=task.entity)),
-            ("Maint Plan or Work Order", "maintenance_plan", tk.StringVar(value=task.maintenance_plan)),
-            ("Procedure Doc", "procedure_doc", tk.StringVar(value=task.procedure_doc)),
-            ("Requestor", "requestor", tk.StringVar(value=task.requestor)),
-            ("Project", "project", tk.StringVar(value=task.project)),
-            ("Safety (1-100%)", "safety", tk.IntVar(value=task.safety)),
-            ("Hype (1-100%)", "hype", tk.IntVar(value=task.hype)),
-            ("Impact ($ or %)", "impact", tk.StringVar(value=task.impact)),
-            ("Impact is % if checked", "impact_is_percentage", tk.BooleanVar(value=task.impact_is_percentage)),
-            ("Task is W.I.N.", "is_win", tk.BooleanVar(value=task.is_win)),
+            ("Short Description", "short_desc", tk.StringVar()),
+            ("Area", "area", tk.StringVar()),
+            ("Entity", "entity", tk.StringVar()),
+            ("Maint Plan or Work Order", "maintenance_plan", tk.StringVar()),
+            ("Procedure Doc", "procedure_doc", tk.StringVar()),
+            ("Requestor", "requestor", tk.StringVar()),
+            ("Project", "project", tk.StringVar()),
+            ("Safety (1-100%)", "safety", tk.IntVar()),
+            ("Hype (1-100%)", "hype", tk.IntVar()),
+            ("Impact ($ or %)", "impact", tk.StringVar()),
+            ("Impact is % if checked", "impact_is_percentage", tk.BooleanVar()),
+            ("Task is W.I.N.", "is_win", tk.BooleanVar()),
         ]
 
         for label, attr, var in fields:
-            frame = ttk.Frame(self.detail_frame)
+            frame = ttk.Frame(body)
             frame.pack(fill=tk.X, padx=5, pady=2)
             ttk.Label(frame, text=label, width=25).pack(side=tk.LEFT)
             if isinstance(var, tk.BooleanVar):
@@ -782,13 +1018,10 @@ class TaskManager:
             self.detail_widgets[attr] = var
 
         # Long Description with resizable grip
-        ttk.Label(self.detail_frame, text="Long Description").pack(fill=tk.X, padx=5, pady=2)
-        desc_frame = ttk.Frame(self.detail_frame)
+        ttk.Label(body, text="Long Description").pack(fill=tk.X, padx=5, pady=2)
+        desc_frame = ttk.Frame(body)
         desc_frame.pack(fill=tk.BOTH, expand=True)
-                                         
-                                           
         long_desc_text = tk.Text(desc_frame, height=9, width=40, wrap="word", font=("Arial", 10))
-        long_desc_text.insert("1.0", task.long_desc)
         long_desc_scroll = ttk.Scrollbar(desc_frame, orient="vertical", command=long_desc_text.yview)
         long_desc_text.configure(yscrollcommand=long_desc_scroll.set)
         long_desc_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -796,7 +1029,7 @@ class TaskManager:
         self.detail_widgets["long_desc"] = long_desc_text
 
         # Add resizable grip
-        grip = ttk.Separator(self.detail_frame, orient="horizontal", cursor="sb_v_double_arrow")
+        grip = ttk.Separator(body, orient="horizontal", cursor="sb_v_double_arrow")
         grip.pack(fill=tk.X, pady=2)
 
         def start_drag(e):
@@ -812,8 +1045,8 @@ class TaskManager:
         grip.bind("<Button-1>", start_drag)
         grip.bind("<B1-Motion>", do_drag)
 
-        due_date_var = tk.StringVar(value=task.due_date.strftime("%Y-%m-%d"))
-        frame = ttk.Frame(self.detail_frame)
+        due_date_var = tk.StringVar()
+        frame = ttk.Frame(body)
         frame.pack(fill=tk.X, padx=5, pady=2)
         ttk.Label(frame, text="Due Date (YYYY-MM-DD)", width=25).pack(side=tk.LEFT)
         due_date_entry = ttk.Entry(frame, style="ddstyle.TEntry", textvariable=due_date_var)
@@ -823,39 +1056,35 @@ class TaskManager:
         self.detail_widgets["due_date"] = due_date_var
 
         delegate_var = tk.StringVar()
-        frame = ttk.Frame(self.detail_frame)
+        frame = ttk.Frame(body)
         frame.pack(fill=tk.X, padx=5, pady=2)
         ttk.Label(frame, text="Delegate", width=25).pack(side=tk.LEFT)
-        delegate_combo = ttk.Combobox(frame, textvariable=delegate_var, 
-                                    values=[""] + sorted([p.name for p in self.people]))
+        delegate_combo = ttk.Combobox(frame, textvariable=delegate_var)
         delegate_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        if task.delegate:
-            delegate_var.set(task.delegate.name)
         self.detail_widgets["delegate"] = delegate_var
         self.detail_widgets["delegate_combo"] = delegate_combo
 
-        delegate_reminder_frame = ttk.Frame(self.detail_frame)
+        delegate_reminder_frame = ttk.Frame(body)
         delegate_reminder_frame.pack(fill=tk.X, padx=5, pady=2)
         delegate_reminder_label = ttk.Label(delegate_reminder_frame, text="Delegate Reminder (days, 0=never)", width=35)
-        delegate_reminder_var = tk.IntVar(value=task.delegate_reminder_days)
+        delegate_reminder_var = tk.IntVar()
         delegate_reminder_entry = ttk.Entry(delegate_reminder_frame, textvariable=delegate_reminder_var)
         self.detail_widgets["delegate_reminder_days"] = delegate_reminder_var
 
         def update_delegate_reminder_visibility(*args):
-            if delegate_var.get():
+            if delegate_var.get() and not delegate_reminder_label.winfo_manager():
                 delegate_reminder_label.pack(side=tk.LEFT)
                 delegate_reminder_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
-            else:
+            elif not delegate_var.get():
                 delegate_reminder_label.pack_forget()
                 delegate_reminder_entry.pack_forget()
 
         delegate_var.trace("w", update_delegate_reminder_visibility)
-        update_delegate_reminder_visibility()
 
-        recurrence_frame = ttk.LabelFrame(self.detail_frame, text="Recurrence Settings")
+        recurrence_frame = ttk.LabelFrame(body, text="Recurrence Settings")
         recurrence_frame.pack(fill=tk.X, padx=5, pady=5)
 
-        recurrence_type_var = tk.StringVar(value=task.recurrence_type)
+        recurrence_type_var = tk.StringVar()
         frame = ttk.Frame(recurrence_frame)
         frame.pack(fill=tk.X, padx=5, pady=2)
         ttk.Label(frame, text="Recurrence Type", width=30).pack(side=tk.LEFT)
@@ -864,7 +1093,7 @@ class TaskManager:
         recurrence_type_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
         self.detail_widgets["recurrence_type"] = recurrence_type_var
 
-        first_active_date_var = tk.StringVar(value=task.first_active_date.strftime("%Y-%m-%d") if task.first_active_date else datetime.now().strftime("%Y-%m-%d"))
+        first_active_date_var = tk.StringVar()
         frame = ttk.Frame(recurrence_frame)
         frame.pack(fill=tk.X, padx=5, pady=2)
         ttk.Label(frame, text="First Active Date (YYYY-MM-DD)", width=30).pack(side=tk.LEFT)
@@ -877,99 +1106,72 @@ class TaskManager:
         settings_frame = ttk.Frame(recurrence_frame)
         settings_frame.pack(fill=tk.X, padx=5, pady=2)
 
-        self.detail_widgets["recurrence_settings"] = {}
+        #one sub-form per recurrence type, all built now; only the selected one is packed
+        settings = self.detail_widgets["recurrence_settings"] = {}
+        recurrence_forms = {}
+        form = recurrence_forms["weekly"] = ttk.Frame(settings_frame)
+        ttk.Label(form, text="Days of Week").pack(fill=tk.X)
+        day_frame = ttk.Frame(form)
+        day_frame.pack(fill=tk.X)
+        for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]:
+            var = tk.BooleanVar()
+            ttk.Checkbutton(day_frame, text=day, variable=var).pack(side=tk.LEFT)
+            settings[f"weekly_{day}"] = var
+
+        def setting_row(parent, label, key, var, label_width=30, values=None):
+            frame = ttk.Frame(parent)
+            frame.pack(fill=tk.X)
+            ttk.Label(frame, text=label, width=label_width).pack(side=tk.LEFT)
+            if values is None:
+                ttk.Entry(frame, textvariable=var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+            else:
+                ttk.Combobox(frame, textvariable=var, values=values).pack(side=tk.LEFT, fill=tk.X, expand=True)
+            if key:
+                settings[key] = var
+            return var
+
+        form = recurrence_forms["monthly"] = ttk.Frame(settings_frame)
+        setting_row(form, "Day of Month", "monthly_day", tk.IntVar())
+        form = recurrence_forms["annually"] = ttk.Frame(settings_frame)
+        setting_row(form, "Month", "annually_month", tk.IntVar())
+        setting_row(form, "Day", "annually_day", tk.IntVar())
+        form = recurrence_forms["every_n"] = ttk.Frame(settings_frame)
+        setting_row(form, "Every N", "every_n_n", tk.IntVar())
+        unit_var = setting_row(form, "Unit", "every_n_unit", tk.StringVar(), values=["days", "weeks", "months", "years"])
+        target_frame = ttk.Frame(form)
+        target_frame.pack(fill=tk.X)
+        #every_n_target is a different variable for each unit; the shown one is put in settings
+        target_forms = {unit: ttk.Frame(target_frame) for unit in ("weeks", "months", "years")}
+        self._every_n_targets = {
+            "weeks": setting_row(target_forms["weeks"], "Day of Week", None, tk.StringVar(), 20,
+                                 values=["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]),
+            "months": setting_row(target_forms["months"], "Day of Month", None, tk.IntVar(), 20),
+            "years": setting_row(target_forms["years"], "Month", None, tk.IntVar(), 20),
+        }
+        setting_row(target_forms["years"], "Day", "every_n_day", tk.IntVar(), 20)
+
+        def update_target_field(*args):
+            unit = unit_var.get()
+            for name, target_form in target_forms.items():
+                if name == unit and not target_form.winfo_manager():
+                    target_form.pack(fill=tk.X)
+                elif name != unit and target_form.winfo_manager():
+                    target_form.pack_forget()
+            if unit in self._every_n_targets:
+                settings["every_n_target"] = self._every_n_targets[unit]
+            else:
+                settings.pop("every_n_target", None)
+
         def update_recurrence_settings(*args):
-            for widget in settings_frame.winfo_children():
-                widget.destroy()
-            self.detail_widgets["recurrence_settings"].clear()
             r_type = recurrence_type_var.get()
-            
-            if r_type == "weekly":
-                ttk.Label(settings_frame, text="Days of Week").pack(fill=tk.X)
-                days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-                current_days = task.recurrence_settings.get("days", [])
-                day_frame = ttk.Frame(settings_frame)
-                day_frame.pack(fill=tk.X)
-                for day in days:
-                    var = tk.BooleanVar(value=day in current_days)
-                    ttk.Checkbutton(day_frame, text=day, variable=var).pack(side=tk.LEFT)
-                    self.detail_widgets["recurrence_settings"][f"weekly_{day}"] = var
-
-            elif r_type == "monthly":
-                frame = ttk.Frame(settings_frame)
-                frame.pack(fill=tk.X)
-                ttk.Label(frame, text="Day of Month", width=30).pack(side=tk.LEFT)
-                day_var = tk.IntVar(value=task.recurrence_settings.get("day", 1))
-                ttk.Entry(frame, textvariable=day_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
-                self.detail_widgets["recurrence_settings"]["monthly_day"] = day_var
-
-            elif r_type == "annually":
-                frame = ttk.Frame(settings_frame)
-                frame.pack(fill=tk.X)
-                ttk.Label(frame, text="Month", width=30).pack(side=tk.LEFT)
-                month_var = tk.IntVar(value=task.recurrence_settings.get("month", 1))
-                ttk.Entry(frame, textvariable=month_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
-                self.detail_widgets["recurrence_settings"]["annually_month"] = month_var
-                frame = ttk.Frame(settings_frame)
-                frame.pack(fill=tk.X)
-                ttk.Label(frame, text="Day", width=30).pack(side=tk.LEFT)
-                day_var = tk.IntVar(value=task.recurrence_settings.get("day", 1))
-                ttk.Entry(frame, textvariable=day_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
-                self.detail_widgets["recurrence_settings"]["annually_day"] = day_var
-
-            elif r_type == "every_n":
-                frame = ttk.Frame(settings_frame)
-                frame.pack(fill=tk.X)
-                ttk.Label(frame, text="Every N", width=30).pack(side=tk.LEFT)
-                n_var = tk.IntVar(value=task.recurrence_settings.get("n", 1))
-                ttk.Entry(frame, textvariable=n_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
-                self.detail_widgets["recurrence_settings"]["every_n_n"] = n_var
-                frame = ttk.Frame(settings_frame)
-                frame.pack(fill=tk.X)
-                ttk.Label(frame, text="Unit", width=30).pack(side=tk.LEFT)
-                unit_var = tk.StringVar(value=task.recurrence_settings.get("unit", "days"))
-                ttk.Combobox(frame, textvariable=unit_var, values=["days", "weeks", "months", "years"]).pack(side=tk.LEFT, fill=tk.X, expand=True)
-                self.detail_widgets["recurrence_settings"]["every_n_unit"] = unit_var
-                target_frame = ttk.Frame(settings_frame)
-                target_frame.pack(fill=tk.X)
-                def update_target_field(*args):
-                    for widget in target_frame.winfo_children():
-                        widget.destroy()
-                    unit = unit_var.get()
-                    if unit == "days":
-                        return
-                    elif unit == "weeks":
-                        frame = ttk.Frame(target_frame)
-                        frame.pack(fill=tk.X)
-                        ttk.Label(frame, text="Day of Week", width=20).pack(side=tk.LEFT)
-                        target_var = tk.StringVar(value=task.recurrence_settings.get("target", "Monday"))
-                        ttk.Combobox(frame, textvariable=target_var, values=["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]).pack(side=tk.LEFT, fill=tk.X, expand=True)
-                        self.detail_widgets["recurrence_settings"]["every_n_target"] = target_var
-                    elif unit == "months":
-                        frame = ttk.Frame(target_frame)
-                        frame.pack(fill=tk.X)
-                        ttk.Label(frame, text="Day of Month", width=20).pack(side=tk.LEFT)
-                        target_var = tk.IntVar(value=task.recurrence_settings.get("target", 1))
-                        ttk.Entry(frame, textvariable=target_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
-                        self.detail_widgets["recurrence_settings"]["every_n_target"] = target_var
-                    elif unit == "years":
-                        frame = ttk.Frame(target_frame)
-                        frame.pack(fill=tk.X)
-                        ttk.Label(frame, text="Month", width=20).pack(side=tk.LEFT)
-                        target_var = tk.IntVar(value=task.recurrence_settings.get("target", 1))
-                        ttk.Entry(frame, textvariable=target_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
-                        self.detail_widgets["recurrence_settings"]["every_n_target"] = target_var
-                        frame = ttk.Frame(target_frame)
-                        frame.pack(fill=tk.X)
-                        ttk.Label(frame, text="Day", width=20).pack(side=tk.LEFT)
-                        day_var = tk.IntVar(value=task.recurrence_settings.get("day", 1))
-                        ttk.Entry(frame, textvariable=day_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
-                        self.detail_widgets["recurrence_settings"]["every_n_day"] = day_var
-                unit_var.trace("w", update_target_field)
-                update_target_field()
+            for name, recurrence_form in recurrence_forms.items():
+                if name == r_type and not recurrence_form.winfo_manager():
+                    recurrence_form.pack(fill=tk.X)
+                elif name != r_type and recurrence_form.winfo_manager():
+                    recurrence_form.pack_forget()
 
+        unit_var.trace("w", update_target_field)
         recurrence_type_var.trace("w", update_recurrence_settings)
-        update_recurrence_settings()
 
         # copied this here so I can use it as a model...
         #due_date_var = tk.StringVar(value=task.due_date.strftime("%Y-%m-%d"))
@@ -979,57 +1181,155 @@ class TaskManager:
         #ttk.Entry(frame, textvariable=due_date_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
         #self.detail_widgets["due_date"] = due_date_var
 
-        # Add completion date field below recurrence settings
-        if not new_task:
-            completion_date_var = tk.StringVar(value=datetime.now().strftime("%Y-%m-%d"))
-            frame = ttk.Frame(self.detail_frame)
-            frame.pack(fill=tk.X, padx=5, pady=2)
-            ttk.Label(frame, text="Completion Date (YYYY-MM-DD)", width=30).pack(side=tk.LEFT)
-            cd_entry = ttk.Entry(frame, style="cdstyle.TEntry", textvariable=completion_date_var)
-            cd_entry.bind("<KeyRelease>", lambda event, f=cd_entry, s="cdstyle.TEntry": self.validate_date_field(f,s))
-            cd_entry.bind("<FocusOut>", lambda event, f=cd_entry, s="cdstyle.TEntry": self.validate_date_field(f,s))
-            cd_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
-            self.detail_widgets["completion_date"] = completion_date_var
-
-        if not "[remind delegate]" in task.short_desc:
-            #the automatically generated "remind delegate" tasks should only have one contingent: the delegated task
-            #this is necessary for proper functionality of the un-delegate button
-            ttk.Button(self.detail_frame, text="Select Related Tasks", 
-                      command=partial(self.select_related_tasks, task)).pack(pady=5)
-
-        button_frame = ttk.Frame(self.detail_frame)
+        # Completion date field below recurrence settings (existing tasks only). The holder
+        # frames keep these in place in the layout while they're hidden.
+        holder = ttk.Frame(body)
+        holder.pack(fill=tk.X)
+        self.detail_completion_frame = ttk.Frame(holder)
+        completion_date_var = tk.StringVar()
+        ttk.Label(self.detail_completion_frame, text="Completion Date (YYYY-MM-DD)", width=30).pack(side=tk.LEFT)
+        cd_entry = ttk.Entry(self.detail_completion_frame, style="cdstyle.TEntry", textvariable=completion_date_var)
+        cd_entry.bind("<KeyRelease>", lambda event, f=cd_entry, s="cdstyle.TEntry": self.validate_date_field(f,s))
+        cd_entry.bind("<FocusOut>", lambda event, f=cd_entry, s="cdstyle.TEntry": self.validate_date_field(f,s))
+        cd_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.detail_widgets["completion_date"] = completion_date_var
+
+        holder = ttk.Frame(body)
+        holder.pack(fill=tk.X)
+        #the automatically generated "remind delegate" tasks should only have one contingent: the delegated task
+        #this is necessary for proper functionality of the un-delegate button
+        self.detail_related_button = ttk.Button(holder, text="Select Related Tasks",
+                                                command=lambda: self.select_related_tasks(self._detail_task))
+
+        button_frame = ttk.Frame(body)
         button_frame.pack(fill=tk.X, padx=5, pady=5)
-        
-        ttk.Button(button_frame, text="Save", 
-                  command=partial(self.save_task, task, new_task)).pack(side=tk.LEFT, padx=5)
+        def action(method):
+            return lambda: method(self._detail_task, self._detail_new)
+        snooze_frame = ttk.Frame(button_frame)
+        ttk.Button(snooze_frame, text="Snooze", command=action(self.snooze_task)).pack(side=tk.LEFT)
+        self.detail_widgets["snooze_days"] = tk.StringVar(value="1")
+        ttk.Entry(snooze_frame, textvariable=self.detail_widgets["snooze_days"], width=5).pack(side=tk.LEFT)
+        ttk.Label(snooze_frame, text="days").pack(side=tk.LEFT)
+        # name -> (widget, pack options), in the order they're laid out
+        self.detail_buttons = {
+            "save": (ttk.Button(button_frame, text="Save", command=action(self.save_task)), {"padx": 5}),
+            "unsnooze": (ttk.Button(button_frame, text="Un-snooze", command=action(self.unsnooze_task)), {}),
+            "snooze": (snooze_frame, {}),
+            "complete": (ttk.Button(button_frame, text="Complete", command=action(self.complete_task)), {"padx": 5}),
+            "today": (ttk.Button(button_frame, text="Add to Today's List",
+                                 command=lambda: self.add_task_to_today(self._detail_task)), {"padx": 5}),
+            "abandon": (ttk.Button(button_frame, text="Abandon", command=action(self.abandon_task)), {"padx": 5}),
+            "undelegate": (ttk.Button(button_frame, text="Un-delegate",
+                                      command=lambda: self.undelegate_task(self._detail_task)), {"padx": 5}),
+            "revive": (ttk.Button(button_frame, text="Revive", command=action(self.revive_task)), {"padx": 5}),
+        }
+
+    def queue_task_details(self, event=None):
+        #holding an arrow key in the list fires a release per row; only show the row it stops on
+        if self._detail_nav_job is not None:
+            self.root.after_cancel(self._detail_nav_job)
+        self._detail_nav_job = self.root.after(detail_nav_delay_ms, partial(self.show_task_details, event))
+
+    def show_task_details(self, event=None, task_id=None, new_task=False):
+        if self._detail_nav_job is not None:
+            self.root.after_cancel(self._detail_nav_job)
+            self._detail_nav_job = None
+
+        if new_task:
+            self.current_task_id = None
+            task = Task("", "", 50, 0, 50, datetime.now() + timedelta(days=7), impact_is_percentage=True)
+        else:
+            if not task_id:
+                selected = self.tree.selection()
+                if not selected:
+                    self.current_task_id = None
+                    self._detail_task = None
+                    self.detail_body.pack_forget()
+                    return
+                task_id = self.tree.item(selected[0], "tags")[0]
+            task = self.find_task(task_id)
+            if not task:
+                self.current_task_id = None
+                self._detail_task = None
+                self.detail_body.pack_forget()
+                return
+            self.current_task_id = task_id
+
+        #clicking (or arrowing) back onto the task already shown keeps any unsaved edits;
+        #calls after a save/complete/etc. (no event) load it fresh
+        if task is not self._detail_task or event is None:
+            self._bind_task_details(task, new_task)
+        self._detail_task = task
+        self._detail_new = new_task
+        self._show_detail_buttons(task, new_task)
+        if not self.detail_body.winfo_manager():
+            self.detail_body.pack(fill=tk.BOTH, expand=True)
+
+    def _bind_task_details(self, task, new_task):
+        widgets = self.detail_widgets
+        self.detail_title.configure(text="Create New Task" if new_task else "Task Details")
+        for attr in ("short_desc", "area", "entity", "maintenance_plan", "procedure_doc", "requestor",
+                     "project", "safety", "hype", "impact", "impact_is_percentage", "is_win"):
+            widgets[attr].set(getattr(task, attr))
+        widgets["long_desc"].delete("1.0", tk.END)
+        widgets["long_desc"].insert("1.0", task.long_desc)
+        widgets["due_date"].set(task.due_date.strftime("%Y-%m-%d"))
+        widgets["delegate_combo"]["values"] = [""] + sorted([p.name for p in self.people])
+        widgets["delegate"].set(task.delegate.name if task.delegate else "")
+        widgets["delegate_reminder_days"].set(task.delegate_reminder_days)
+        widgets["first_active_date"].set(task.first_active_date.strftime("%Y-%m-%d") if task.first_active_date else datetime.now().strftime("%Y-%m-%d"))
+
+        recurrence = task.recurrence_settings
+        settings = widgets["recurrence_settings"]
+        current_days = recurrence.get("days", [])
+        for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]:
+            settings[f"weekly_{day}"].set(day in current_days)
+        settings["monthly_day"].set(recurrence.get("day", 1))
+        settings["annually_month"].set(recurrence.get("month", 1))
+        settings["annually_day"].set(recurrence.get("day", 1))
+        settings["every_n_n"].set(recurrence.get("n", 1))
+        target = recurrence.get("target")
+        self._every_n_targets["weeks"].set(target if isinstance(target, str) else "Monday")
+        self._every_n_targets["months"].set(target if isinstance(target, int) else 1)
+        self._every_n_targets["years"].set(target if isinstance(target, int) else 1)
+        settings["every_n_day"].set(recurrence.get("day", 1))
+        settings["every_n_unit"].set(recurrence.get("unit", "days"))
+        widgets["recurrence_type"].set(task.recurrence_type) #shows the matching sub-form
+
+        widgets["completion_date"].set(datetime.now().strftime("%Y-%m-%d"))
+        if new_task:
+            self.detail_completion_frame.pack_forget()
+        elif not self.detail_completion_frame.winfo_manager():
+            self.detail_completion_frame.pack(fill=tk.X, padx=5, pady=2)
+        if "[remind delegate]" in task.short_desc:
+            self.detail_related_button.pack_forget()
+        elif not self.detail_related_button.winfo_manager():
+            self.detail_related_button.pack(pady=5)
+        widgets["snooze_days"].set("1")
+
+    def _show_detail_buttons(self, task, new_task):
+        #which buttons this task gets; the row is only re-laid out when that changes
+        shown = ["save"]
         if not new_task:
-            if task.is_snoozed():
-                ttk.Button(button_frame, text="Un-snooze", 
-                          command=partial(self.unsnooze_task, task, new_task)).pack(side=tk.LEFT)
-            else:
-                snooze_frame = ttk.Frame(button_frame)
-                snooze_frame.pack(side=tk.LEFT)
-                ttk.Button(snooze_frame, text="Snooze", 
-                          command=partial(self.snooze_task, task, new_task)).pack(side=tk.LEFT)
-                snooze_days_var = tk.StringVar(value="1")
-                ttk.Entry(snooze_frame, textvariable=snooze_days_var, width=5).pack(side=tk.LEFT)
-                ttk.Label(snooze_frame, text="days").pack(side=tk.LEFT)
-                self.detail_widgets["snooze_days"] = snooze_days_var
+            shown.append("unsnooze" if task.is_snoozed() else "snooze")
             if task.status != "completed":
-                ttk.Button(button_frame, text="Complete", 
-                          command=partial(self.complete_task, task, new_task)).pack(side=tk.LEFT, padx=5)
+                shown.append("complete")
             if task.status == "active":
-                ttk.Button(button_frame, text="Add to Today's List",
-                          command=partial(self.add_task_to_today, task)).pack(side=tk.LEFT, padx=5)
+                shown.append("today")
             if task.status != "abandoned":
-                ttk.Button(button_frame, text="Abandon", 
-                          command=partial(self.abandon_task, task, new_task)).pack(side=tk.LEFT, padx=5)
+                shown.append("abandon")
             if task.contingents and "[remind delegate]" in task.short_desc and task.status == "active":
-                ttk.Button(button_frame, text="Un-delegate", 
-                          command=partial(self.undelegate_task, task)).pack(side=tk.LEFT, padx=5)
+                shown.append("undelegate")
             if task.status != "active":
-                ttk.Button(button_frame, text="Revive", 
-                          command=partial(self.revive_task, task, new_task)).pack(side=tk.LEFT, padx=5)
+                shown.append("revive")
+        if shown == self._detail_buttons_shown:
+            return
+        for widget, _ in self.detail_buttons.values():
+            widget.pack_forget()
+        for name in shown:
+            widget, options = self.detail_buttons[name]
+            widget.pack(side=tk.LEFT, **options)
+        self._detail_buttons_shown = shown
 
     def undelegate_task(self, task):
         # Un-delegate a task by abandoning its reminder task, clearing the delegate, and selecting the parent task.
@@ -1038,7 +1338,7 @@ class TaskManager:
         #only do this if the task is an active remind delegate task.
         if task and task.contingents and "[remind delegate]" in task.short_desc and task.status == "active" and not task.is_snoozed():
             #remind delegate tasks automatically have only one contingent
-            delegated_task =  next((t for t in self.tasks if t.id == task.contingents[0]),None)
+            delegated_task = self.task_index().get(task.contingents[0])
             if delegated_task:
                 #prep abandonment of the remind-delegate task
                 completion_date_str = self.detail_widgets["completion_date"].get()
@@ -1053,6 +1353,7 @@ class TaskManager:
                 #un-delegate the delegated task
                 delegated_task.delegate = None
                 delegated_task.delegate_reminder_days = 1
+                self.mark_task_changed(task, delegated_task)
                 
                 # Save changes and update UI
                 self.save_data()
@@ -1076,18 +1377,6 @@ class TaskManager:
         window_height = 400  # Increase this to make the popup taller
         window.geometry(f"{window_width}x{window_height}")
 
-        # Font metrics
-        canvas_font = Font(family="TkDefaultFont", size=9)
-        text_line_height = canvas_font.metrics("linespace")
-        text_line_gap = 5
-        row_height = text_line_height + text_line_gap * 2
-        x_offset = 5
-        right_x_offset = 20  # For scrollbar
-        col_widths = [200, 100, 60, 60]  # Short Desc, Due Date, Prereq, Cont
-        col_positions = [x_offset]
-        for w in col_widths[:-1]:
-            col_positions.append(col_positions[-1] + w)
-
         # Search bar
         search_var = tk.StringVar()
         ttk.Label(window, text="Search").pack()
@@ -1099,154 +1388,30 @@ class TaskManager:
         canvas_frame.pack(fill=tk.BOTH, expand=True)
         canvas = tk.Canvas(canvas_frame, highlightthickness=0)
         scrollbar = ttk.Scrollbar(canvas_frame, orient="vertical", command=canvas.yview)
-        canvas.configure(yscrollcommand=scrollbar.set)
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-        # Selections storage
-        selections = {"prerequisites": {}, "contingents": {}}
-        for t in self.tasks:
-            if t.status not in ["completed", "abandoned"] and t.id != task.id:
-                selections["prerequisites"][t.id] = tk.BooleanVar(value=t.id in task.prerequisites)
-                selections["contingents"][t.id] = tk.BooleanVar(value=t.id in task.contingents)
-
-        # Track selected task
-        selected_task_id = None
-
-        # Tooltip storage
-        tooltip_data = {}  # Dictionary to store tooltip info per text item
-
-        def truncate_text(text, max_width, font):
-            if font.measure(text) <= max_width:
-                return text
-            truncated = ""
-            for word in text.split(" "):
-                test_line = truncated + " " + word if truncated else word
-                test_line_with_ellipsis = test_line + "..."
-                if font.measure(test_line_with_ellipsis) <= max_width:
-                    truncated = test_line
-                else:
-                    # If adding the word exceeds width, stop and add ellipsis
-                    return truncated + "..." if truncated else ""
-            return truncated + "..." if truncated else ""
-
-        def update_related_task_list(*args):
-            nonlocal selected_task_id
-            canvas.delete("all")
-            tooltip_data.clear()  # Clear previous tooltip data
-            search = search_var.get().lower()
-            visible_tasks = []
-            for t in self.tasks:
-                if t.status not in ["completed", "abandoned"] and t.id != task.id:
-                    if search and not any(search in str(v).lower() for v in [
-                        t.short_desc, t.long_desc, str(t.safety), str(t.impact), str(t.hype),
-                        t.area, t.entity, t.maintenance_plan, t.procedure_doc, t.requestor, t.project,
-                        str(t.is_win), t.due_date.strftime("%Y-%m-%d")
-                    ]):
-                        continue
-                    visible_tasks.append(t)
-
-            # Calculate canvas size
-            canvas_height = max(200, len(visible_tasks) * row_height + 40)  # 40 for header
-            canvas.config(scrollregion=(0, 0, sum(col_widths) + x_offset, canvas_height))
-
-            # Draw headers
-            headers = ["Description", "Due Date", "Prereq", "Cont"]
-            y_offset = 10
-            for i, header in enumerate(headers):
-                canvas.create_text(col_positions[i], y_offset, text=header, anchor=tk.NW, font=canvas_font)
-
-            # Draw task rows
-            y_offset = 40
-            for t in visible_tasks:
-                # Clickable rectangle
-                rect = canvas.create_rectangle(
-                    x_offset, y_offset, sum(col_widths) + x_offset, y_offset + row_height,
-                    fill="white" if t.id != selected_task_id else "lightblue",
-                    tags=("row", f"task_{t.id}")
-                )
-                
+        #the picker's text comes from the main search index where it has it
+        open_tasks = [t for t in self.tasks if t.status not in ["completed", "abandoned"] and t.id != task.id]
+        indexed = self.search_index.docs
+        docs = {t.id: indexed.get(t.id) or SearchIndex.document(t) for t in open_tasks}
+        picker = RelatedTaskPicker(canvas, open_tasks, docs, set(task.prerequisites), set(task.contingents),
+                                   Font(family="TkDefaultFont", size=9))
 
-                # Task data with tooltips
-                short_desc = truncate_text(t.short_desc, col_widths[0]-3, canvas_font)
-                due_date = t.due_date.strftime("%Y-%m-%d")
-                desc_text = canvas.create_text(col_positions[0]+3, y_offset + text_line_gap, text=short_desc, anchor=tk.NW, font=canvas_font, tags=("text", f"desc_{t.id}", f"task_{t.id}"))
-                date_text = canvas.create_text(col_positions[1], y_offset + text_line_gap, text=due_date, anchor=tk.NW, font=canvas_font, tags=("text", f"date_{t.id}"))
-                canvas.tag_bind(f"desc_{t.id}", "<Button-1>", lambda e, tid=t.id: select_row(tid))
-
-                # Initialize tooltip data
-                tooltip_data[f"task_{t.id}"] = {
-                    "text": t.short_desc,
-                    "wait_id": None,
-                    "tw": None,
-                    "wait_time": 500,
-                    "wrap_length": 200,
-                    "x_offset": col_positions[0],
-                    "y_offset": y_offset + text_line_gap
-                }
-                
-
-                # Bind tooltip events
-                canvas.tag_bind(f"desc_{t.id}", "<Enter>", lambda e, tid=f"task_{t.id}": enter_tooltip(e, tid))
-                canvas.tag_bind(f"desc_{t.id}", "<Leave>", lambda e, tid=f"task_{t.id}": leave_tooltip(e, tid))
-
-                # Checkboxes
-                prereq_check = ttk.Checkbutton(canvas, variable=selections["prerequisites"][t.id])
-                cont_check = ttk.Checkbutton(canvas, variable=selections["contingents"][t.id])
-                canvas.create_window(col_positions[2] + col_widths[2]//2, y_offset + row_height//2, window=prereq_check)
-                canvas.create_window(col_positions[3] + col_widths[3]//2, y_offset + row_height//2, window=cont_check)
-
-                y_offset += row_height
-        
-        def enter_tooltip(event, tag_id):
-            schedule_tooltip(tag_id)
-
-        def leave_tooltip(event, tag_id):
-            unschedule_tooltip(tag_id)
-            hide_tooltip(tag_id)
-
-        def schedule_tooltip(tag_id):
-            unschedule_tooltip(tag_id)
-            tooltip_data[tag_id]["wait_id"] = canvas.after(tooltip_data[tag_id]["wait_time"], lambda: show_tooltip(tag_id))
-
-        def unschedule_tooltip(tag_id):
-            wait_id = tooltip_data[tag_id]["wait_id"]
-            if wait_id:
-                canvas.after_cancel(wait_id)
-                tooltip_data[tag_id]["wait_id"] = None
-
-        def show_tooltip(tag_id):
-            data = tooltip_data[tag_id]
-            x = canvas.winfo_rootx() + data["x_offset"] + 10
-            y = canvas.winfo_rooty() + data["y_offset"] - 10
-            data["tw"] = tk.Toplevel(canvas)
-            data["tw"].wm_overrideredirect(True)
-            data["tw"].wm_geometry(f"+{x}+{y}")
-            label = tk.Label(data["tw"], text=data["text"], justify='left',
-                            background="#ffffff", relief='solid', borderwidth=1,
-                            wraplength=data["wrap_length"])
-            label.pack(ipadx=1)
-
-        def hide_tooltip(tag_id):
-            tw = tooltip_data[tag_id]["tw"]
-            tooltip_data[tag_id]["tw"] = None
-            if tw:
-                tw.destroy()
-
-        def select_row(task_id):
-            nonlocal selected_task_id
-            if selected_task_id:
-                canvas.itemconfig(f"task_{selected_task_id}", fill="white")
-            selected_task_id = task_id
-            canvas.itemconfig(f"task_{task_id}", fill="lightblue")
+        def on_view_changed(first, last):
+            #any scroll (scrollbar, wheel, new scrollregion) moves the slot pool to the new rows
+            scrollbar.set(first, last)
+            picker.draw()
 
         def save_selections():
-            new_prerequisites = [tid for tid, var in selections["prerequisites"].items() if var.get()]
-            new_contingents = [tid for tid, var in selections["contingents"].items() if var.get()]
+            new_prerequisites = [t.id for t in open_tasks if t.id in picker.prerequisites]
+            new_contingents = [t.id for t in open_tasks if t.id in picker.contingents]
             task.prerequisites = new_prerequisites
             task.contingents = new_contingents
+            self.mark_task_changed(task)
             for t in self.tasks:
                 if t.id != task.id and t.status not in ["completed", "abandoned"]:
+                    links = (len(t.prerequisites), len(t.contingents))
                     if t.id in new_contingents and task.id not in t.prerequisites:
                         t.prerequisites.append(task.id)
                     elif t.id not in new_contingents and task.id in t.prerequisites:
@@ -1255,20 +1420,31 @@ class TaskManager:
                         t.contingents.append(task.id)
                     elif t.id not in new_prerequisites and task.id in t.contingents:
                         t.contingents.remove(task.id)
+                    if links != (len(t.prerequisites), len(t.contingents)):
+                        self.mark_task_changed(t)
+            self.refresh_priorities()
+            loops = [c for c in self.priority_cache.graph.cycles() if task.id in c]
+            if loops:
+                task_names = {t.id: t.short_desc for t in self.tasks}
+                loop_list = "\n".join(f"- {task_names.get(tid, tid)}" for tid in loops[0])
+                messagebox.showwarning("Circular Dependency",
+                                       f"These tasks are now contingent on each other in a loop:\n{loop_list}\n\n"
+                                       "They will share the highest priority in the loop until it's broken.")
             self.save_data()
             self.update_task_list()
             window.destroy()
 
         # Bind events
-        search_var.trace("w", update_related_task_list)
-        canvas.bind("<Configure>", update_related_task_list)
+        canvas.configure(yscrollcommand=on_view_changed)
+        search_var.trace("w", lambda *args: picker.search(search_var.get()))
+        canvas.bind("<Configure>", picker.draw)
         canvas.bind("<MouseWheel>", lambda e: canvas.yview_scroll(int(-e.delta/120), "units"))
 
         # Confirm button
         ttk.Button(window, text="Confirm", command=save_selections).pack()
 
         # Initial update
-        update_related_task_list()
+        picker.draw()
 #######End Contingent Task Popup
 
 #######Task purgation popup
@@ -1316,38 +1492,12 @@ class TaskManager:
 
     def purge_old_tasks(self, n_months, window):
         try:
-            n = int(n_months)
-            if n < 0:
-                raise ValueError("Number of months must be non-negative")
-            cutoff_date = datetime.now() - timedelta(days=n * 30)
-            tasks_to_archive = [t for t in self.tasks if t.status in ["completed", "abandoned"] and t.completion_date and t.completion_date < cutoff_date]
-            
-            if not tasks_to_archive:
+            archived, archive_filename = self.archive_old_tasks(n_months)
+            if not archived:
                 messagebox.showinfo("No Tasks", "No tasks meet the criteria for archiving.")
                 return
-
-            # Determine archive filename
-            latest_date = max(t.completion_date for t in tasks_to_archive)
-            archive_filename = f"_archive/{latest_date.strftime('%Y-%m-%d')}_and_prior.json"
-            os.makedirs("_archive", exist_ok=True)
-
-            # Prepare archive data
-            tasks_data = []
-            for t in tasks_to_archive:
-                task_dict = vars(t).copy()
-                if task_dict["delegate"]:
-                    task_dict["delegate"] = task_dict["delegate"].id
-                tasks_data.append(task_dict)
-
-            # Save to archive JSON
-            with open(archive_filename, "w") as f:
-                json.dump({"tasks": tasks_data}, f, default=str)
-
-            # Remove archived tasks from main list
-            self.tasks = [t for t in self.tasks if t not in tasks_to_archive]
-            self.save_data()
             self.update_task_list()
-            messagebox.showinfo("Success", f"{len(tasks_to_archive)} tasks archived to {archive_filename}")
+            messagebox.showinfo("Success", f"{archived} tasks archived to {archive_filename}")
             window.destroy()
         except ValueError as e:
             messagebox.showerror("Error", f"Invalid input: {str(e)}")
@@ -1386,11 +1536,12 @@ class TaskManager:
 
             # Populate Treeview
             task_map = {}  # Map item IDs to tasks for tooltip lookup
+            priorities = PriorityEngine().compute(tasks)
             for task in tasks:
-                priority = f"{task.calculate_priority(tasks):.2f}" if task.calculate_priority(tasks) >= 0 else "N/A"
+                priority = f"{priorities[task.id]:.2f}" if priorities[task.id] >= 0 else "N/A"
                 completed_date = task.completion_date.strftime("%Y-%m-%d") if task.completion_date else "N/A"
                 recurring = "Yes" if task.recurrence_type != "none" else "No"
-                state = task.get_state(tasks)
+                state = task.get_state(tasks, priorities)
                 long_desc = (task.long_desc[:47] + "...") if len(task.long_desc) > 50 else task.long_desc
                 item = tree.insert("", "end", values=(task.short_desc, long_desc, priority, completed_date, recurring, state))
                 task_map[item] = task
@@ -1437,196 +1588,19 @@ class TaskManager:
 #######End Task purgation popup
 
 #######Weekly Schedule Pane
-    # Data model: self.daily_schedule is a dict keyed by "YYYY-MM-DD". Each value is a
-    # list of item dicts:
-    #   {"id": <uuid>, "kind": "task", "task_id": <task id>, "checked": bool, "registered": bool}
-    #   {"id": <uuid>, "kind": "quickadd", "desc": <text>, "checked": bool, "registered": bool}
-    # It is persisted to daily_schedule.json so items (and their checked state)
-    # survive a restart during the same day. At startup, process_daily_schedule_registrations
-    # looks for any dates prior to today and, for each item not yet "registered", registers
-    # whatever was checked against the main task list (self.tasks / task_data.json) and
-    # marks it registered so it's never processed twice - even if that task was *also*
-    # completed/abandoned directly from the Task Details pane the same day (in which case
-    # we just skip it, since it's already been handled and recurrence already continued).
-    # Past days are kept around (not deleted) so they can still be displayed, read-only and
-    # grayed out, rather than vanishing; entries older than the currently-displayed week are
-    # pruned so the file doesn't grow forever.
-
-    def load_daily_schedule(self):
-        try:
-            with open("daily_schedule.json", "r") as f:
-                self.daily_schedule = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.daily_schedule = {}
-
-    def save_daily_schedule(self):
-        with open("daily_schedule.json", "w") as f:
-            json.dump(self.daily_schedule, f)
-
-    def get_week_dates(self):
-        """Monday-Friday of the current work week, as date objects."""
-        today = datetime.now().date()
-        monday = today - timedelta(days=today.weekday())
-        return [monday + timedelta(days=i) for i in range(5)]
-
-    def get_schedule_display_dates(self):
-        """Mon-Fri of the current work week, plus next Monday for early planning."""
-        week_dates = self.get_week_dates()
-        return week_dates + [week_dates[0] + timedelta(days=7)]
-
-    def _is_daily_task(self, task):
-        """'Daily' tasks are represented as every_n recurrence with unit=days, n=1."""
-        return (task.recurrence_type == "every_n"
-                and task.recurrence_settings.get("unit") == "days"
-                and task.recurrence_settings.get("n", 1) == 1)
-
-    def process_daily_schedule_registrations(self):
-        """Find daily-schedule items from days prior to today that haven't been registered
-        yet. Anything left checked gets registered as completed (at 11:59p that day) in the
-        main task list; for quick-add items this means creating a new low-priority completed
-        task. If a linked task was already resolved some other way (completed/abandoned from
-        the Task Details pane, or deleted) we skip it entirely so it isn't closed/recurred a
-        second time. Every item processed this way (checked or not) is marked "registered" so
-        a later startup won't touch it again; days older than the currently-displayed week are
-        then pruned to keep the file small."""
-        today = datetime.now().date()
-        changed_tasks = False
-        changed_schedule = False
-
-        for date_str, items in self.daily_schedule.items():
-            try:
-                item_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            except ValueError:
-                continue
-            if item_date >= today:
-                continue  # this day hasn't ended yet; leave it pending
-
-            registration_time = datetime(item_date.year, item_date.month, item_date.day, 23, 59, 0)
-            item_day_midnight = datetime(item_date.year, item_date.month, item_date.day)
-
-            for item in items:
-                if item.get("registered", False):
-                    continue  # already handled on a previous startup
-
-                if not item.get("checked", False):
-                    item["registered"] = True
-                    changed_schedule = True
-                    continue
-
-                if item.get("kind") == "task":
-                    task = next((t for t in self.tasks if t.id == item.get("task_id")), None)
-                    if task is not None and task.status == "active":
-                        task.status = "completed"
-                        task.completion_date = registration_time
-                        changed_tasks = True
-                        if task.recurrence_type != "none":
-                            self.create_next_recurrance(task, reference_time=item_day_midnight)
-                        try:
-                            self.adventure_manager.queue_adventure(
-                                task.calculate_priority(self.tasks, for_adventure=True),
-                                task.completion_date, task.id, task.short_desc, task.is_win)
-                        except Exception as e:
-                            print("a_manager error:", e)
-                    # else: task was already completed/abandoned elsewhere (or deleted) -
-                    # nothing more to do here, which avoids closing/recurring it twice.
-                elif item.get("kind") == "quickadd":
-                    registered_task = Task(
-                        short_desc=item.get("desc", "Quick-added task"),
-                        long_desc="Added via daily quick-add list.",
-                        safety=0, impact=0, hype=0,
-                        due_date=registration_time,
-                        impact_is_percentage=True,
-                        status="completed",
-                        completion_date=registration_time,
-                        recurrence_type="none",
-                        first_active_date=registration_time,
-                    )
-                    self.tasks.append(registered_task)
-                    changed_tasks = True
-                    try:
-                        self.adventure_manager.queue_adventure(
-                            registered_task.calculate_priority(self.tasks, for_adventure=True),
-                            registered_task.completion_date, registered_task.id,
-                            registered_task.short_desc, registered_task.is_win)
-                    except Exception as e:
-                        print("a_manager error:", e)
-
-                item["registered"] = True
-                changed_schedule = True
-
-        # Prune anything older than the currently-displayed week - it's already registered
-        # (the loop above guarantees that) and will never be shown again.
-        this_monday = today - timedelta(days=today.weekday())
-        for date_str in list(self.daily_schedule.keys()):
-            try:
-                d = datetime.strptime(date_str, "%Y-%m-%d").date()
-            except ValueError:
-                del self.daily_schedule[date_str]
-                changed_schedule = True
-                continue
-            if d < this_monday:
-                del self.daily_schedule[date_str]
-                changed_schedule = True
-
-        if changed_tasks:
-            self.save_data()
-        if changed_schedule:
-            self.save_daily_schedule()
-
-    def _refresh_date_entries(self, day_date):
-        """For today or a future day: prune stale/resolved task-linked items and
-        auto-populate weekly- and daily-recurring tasks. For a past day, the entries
-        are a frozen historical record, so they're returned as-is with no changes."""
-        date_str = day_date.strftime("%Y-%m-%d")
-        today = datetime.now().date()
-        items = self.daily_schedule.get(date_str, [])
-        if day_date < today:
-            return items
-
-        weekday_name = day_date.strftime("%A")
-        changed = False
-
-        kept_items = []
-        existing_task_ids = set()
-        for item in items:
-            if item.get("kind") == "task":
-                task = next((t for t in self.tasks if t.id == item.get("task_id")), None)
-                if task is None and not item.get("checked", False):
-                    changed = True
-                    continue
-                if task is not None and (task.status != "active" or task.is_snoozed()) and not item.get("checked", False):
-                    changed = True
-                    continue
-                if task is not None:
-                    existing_task_ids.add(task.id)
-            kept_items.append(item)
-        items = kept_items
-
-        for t in self.tasks:
-            if t.status != "active" or t.is_snoozed() or t.id in existing_task_ids:
-                continue
-            is_weekly_match = (t.recurrence_type == "weekly"
-                                and weekday_name in t.recurrence_settings.get("days", []))
-            if is_weekly_match or self._is_daily_task(t):
-                items.append({
-                    "id": str(uuid.uuid4()),
-                    "kind": "task",
-                    "task_id": t.id,
-                    "checked": False
-                })
-                existing_task_ids.add(t.id)
-                changed = True
-
-        if items:
-            self.daily_schedule[date_str] = items
-        elif date_str in self.daily_schedule:
-            del self.daily_schedule[date_str]
-            changed = True
-
-        if changed:
-            self.save_daily_schedule()
-
-        return items
+    def schedule_midnight_rollover(self):
+        tomorrow = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+        self.set_wakeup("midnight", tomorrow, self._on_midnight)
+
+    def _on_midnight(self):
+        #the app is usually left open overnight, so the day's checked items get registered
+        #and the schedule pane moves on a day here too, not just at startup. set_wakeup
+        #may fire this early (it re-checks hourly); then there's simply nothing to do.
+        if self.process_daily_schedule_registrations():
+            self.update_task_list() #redraws the schedule pane as well
+        else:
+            self.refresh_schedule_pane()
+        self.schedule_midnight_rollover()
 
     def add_task_to_today(self, task):
         today_str = datetime.now().strftime("%Y-%m-%d")
@@ -1661,6 +1635,9 @@ class TaskManager:
     def setup_schedule_pane(self, parent):
         self.default_day_bg = self.root.cget("bg")
         self._expanded_past_days = set()
+        self._schedule_day_views = [] # one ScheduleDayView per display date, reused every refresh
+        self.schedule_fonts = {"normal": Font(family="Segoe UI", size=9),
+                               "strike": Font(family="Segoe UI", size=9, overstrike=1)}
 
         header_frame = ttk.Frame(parent)
         header_frame.pack(fill=tk.X, side=tk.TOP)
@@ -1682,129 +1659,29 @@ class TaskManager:
         self.refresh_schedule_pane()
 
     def refresh_schedule_pane(self):
-        global today_schedule_color, past_schedule_color, past_schedule_text_color
+        """Bring the schedule pane up to date. The day boxes are built once and rebound
+        each time; a day whose items didn't change isn't touched at all, and one that did
+        only updates the rows that differ."""
         if not hasattr(self, "schedule_inner"):
             return
-        for widget in self.schedule_inner.winfo_children():
-            widget.destroy()
-
         today = datetime.now().date()
+        display_dates = self.get_schedule_display_dates()
         current_week_dates = self.get_week_dates()
-        for day_date in self.get_schedule_display_dates():
-            date_str = day_date.strftime("%Y-%m-%d")
-            is_today = (day_date == today)
-            is_past = (day_date < today)
-            is_next_week = (day_date not in current_week_dates)
-            items = self._refresh_date_entries(day_date)
-
-            if is_today:
-                bg_color = today_schedule_color
-                text_color = "black"
-            elif is_past:
-                bg_color = past_schedule_color
-                text_color = past_schedule_text_color
-            else:
-                bg_color = self.default_day_bg
-                text_color = "black"
-
-            day_frame = tk.Frame(self.schedule_inner, bg=bg_color, highlightbackground="#CCCCCC", highlightthickness=1)
-            day_frame.pack(fill=tk.X, padx=4, pady=4)
-
-            header_text = day_date.strftime("%A, %b %d")
-            if is_next_week:
-                header_text += "  (Next Week)"
-
-            if is_past:
-                done_count = sum(1 for i in items if i.get("checked", False))
-                summary = f"  \u2014 {done_count}/{len(items)} done" if items else "  \u2014 nothing recorded"
-                is_expanded = date_str in self._expanded_past_days
-                arrow = "\u25be" if is_expanded else "\u25b8"
-                header_row = tk.Frame(day_frame, bg=bg_color, cursor="hand2")
-                header_row.pack(fill=tk.X, padx=6, pady=4)
-                header_label = tk.Label(header_row, text=f"{arrow} {header_text}{summary}", bg=bg_color,
-                                         fg=text_color, font=("Segoe UI", 9), anchor="w")
-                header_label.pack(fill=tk.X)
-
-                def on_toggle_expand(d=date_str):
-                    if d in self._expanded_past_days:
-                        self._expanded_past_days.discard(d)
-                    else:
-                        self._expanded_past_days.add(d)
-                    self.refresh_schedule_pane()
-
-                header_row.bind("<Button-1>", lambda e, f=on_toggle_expand: f())
-                header_label.bind("<Button-1>", lambda e, f=on_toggle_expand: f())
-
-                if is_expanded and items:
-                    for item in items:
-                        self._render_schedule_item(day_frame, bg_color, date_str, item,
-                                                    interactive=False, text_color=text_color)
-                    tk.Frame(day_frame, bg=bg_color, height=4).pack(fill=tk.X)
-                continue
-
-            tk.Label(day_frame, text=header_text, bg=bg_color, fg=text_color, font=("Segoe UI", 10, "bold"),
-                     anchor="w").pack(fill=tk.X, padx=6, pady=(6, 2))
-
-            if not items:
-                tk.Label(day_frame, text="No items yet",
-                         bg=bg_color, fg="#999999",
-                         font=("Segoe UI", 9, "italic")).pack(anchor="w", padx=12, pady=(0, 4))
-            else:
-                for item in items:
-                    self._render_schedule_item(day_frame, bg_color, date_str, item,
-                                                interactive=True, text_color=text_color)
-
-            quickadd_frame = tk.Frame(day_frame, bg=bg_color)
-            quickadd_frame.pack(fill=tk.X, padx=6, pady=(2, 6))
-            quickadd_var = tk.StringVar()
-            quickadd_entry = ttk.Entry(quickadd_frame, textvariable=quickadd_var)
-            quickadd_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
-            quickadd_entry.bind("<Return>", lambda e, d=date_str, v=quickadd_var: self.add_quickadd_item(d, v))
-            ttk.Button(quickadd_frame, text="+", width=3,
-                       command=partial(self.add_quickadd_item, date_str, quickadd_var)).pack(side=tk.LEFT, padx=(4, 0))
-
-    def _render_schedule_item(self, parent, bg_color, date_str, item, interactive=True, text_color="black"):
-        if item.get("kind") == "task":
-            task = next((t for t in self.tasks if t.id == item.get("task_id")), None)
-            label_text = task.short_desc if task else "(deleted task)"
-        else:
-            label_text = item.get("desc", "")
-
-        row = tk.Frame(parent, bg=bg_color)
-        row.pack(fill=tk.X, padx=8, pady=1)
-
-        var = tk.BooleanVar(value=item.get("checked", False))
-        normal_font = Font(family="Segoe UI", size=9)
-        strike_font = Font(family="Segoe UI", size=9, overstrike=1)
-
-        cb = tk.Checkbutton(row, text=label_text, variable=var, bg=bg_color,
-                             anchor="w", justify="left", wraplength=260,
-                             activebackground=bg_color, fg=text_color,
-                             disabledforeground=text_color)
-        cb.configure(font=strike_font if var.get() else normal_font)
-
-        if interactive:
-            def on_toggle():
-                item["checked"] = var.get()
-                self.save_daily_schedule()
-                cb.configure(font=strike_font if var.get() else normal_font)
-            cb.configure(command=on_toggle)
-        else:
-            cb.configure(state=tk.DISABLED)
-        cb.pack(side=tk.LEFT, fill=tk.X, expand=True)
-
-        if interactive:
-            def on_delete():
-                day_items = self.daily_schedule.get(date_str, [])
-                self.daily_schedule[date_str] = [i for i in day_items if i["id"] != item["id"]]
-                if not self.daily_schedule[date_str]:
-                    del self.daily_schedule[date_str]
-                self.save_daily_schedule()
-                self.refresh_schedule_pane()
-
-            del_btn = tk.Label(row, text="\u2715", bg=bg_color, fg="#AA3333", cursor="hand2", font=("Segoe UI", 8))
-            del_btn.pack(side=tk.RIGHT, padx=(4, 0))
-            del_btn.bind("<Button-1>", lambda e: on_delete())
+        task_index = self.task_index()
+        while len(self._schedule_day_views) < len(display_dates):
+            self._schedule_day_views.append(ScheduleDayView(self, self.schedule_inner, self.schedule_fonts))
+        for view, day_date in zip(self._schedule_day_views, display_dates):
+            items = self._refresh_date_entries(day_date, task_index)
+            expanded = day_date.strftime("%Y-%m-%d") in self._expanded_past_days
+            view.show(day_date, today, day_date not in current_week_dates, items, task_index, expanded)
+
+    def remove_schedule_item(self, date_str, item_id):
+        day_items = self.daily_schedule.get(date_str, [])
+        self.daily_schedule[date_str] = [i for i in day_items if i["id"] != item_id]
+        if not self.daily_schedule[date_str]:
+            del self.daily_schedule[date_str]
+        self.save_daily_schedule()
+        self.refresh_schedule_pane()
 #######End Weekly Schedule Pane
 
     def validate_date_field(self, field, s=None):
@@ -1911,6 +1788,7 @@ class TaskManager:
             if new_task:
                 self.tasks.append(task)
                 self.current_task_id = task.id
+            self.mark_task_changed(task)
             self.save_data()
             self.update_task_list()
             if new_task:
@@ -1923,64 +1801,20 @@ class TaskManager:
         self.save_task(task, new_task)
         try:
             days = int(self.detail_widgets["snooze_days"].get())
-            if days <= 0:
-                raise ValueError("Snooze days must be positive")
-            target_date = (datetime.now() + timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
-            task.snooze_until = target_date
             #self.detail_widgets["snooze_days"].configure(background=valid_input_color)
         except (ValueError, KeyError):
             #self.detail_widgets["snooze_days"].configure(background=invalid_input_color)
-            task.snooze_until = (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        self.save_data()
+            days = 1
+        self.snooze(task, days)
         self.show_task_details(task_id=task.id, new_task=False) #show again because buttons change
         self.update_task_list()
 
     def unsnooze_task(self, task, new_task):
         self.save_task(task, new_task)
-        task.snooze_until = None
-        self.save_data()
+        self.unsnooze(task)
         self.show_task_details(task_id=task.id, new_task=False) #show again because buttons change
         self.update_task_list()
         
-    def create_next_recurrance(self, task, reference_time=None):
-        if task.recurrence_type != "none":
-            if reference_time is None:
-                # Default (used by the interactive "Complete" button, which always runs in
-                # real time): use today's date as the reference point.
-                reference_time = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            # Calculate the next revival time starting from the reference point
-            next_revival = task.get_next_revival_time(reference_time=reference_time)
-            #old way...
-            #next_revival = task.get_next_revival_time()
-            if next_revival:
-                time_diff = task.due_date - task.first_active_date if task.first_active_date else timedelta(days=0)
-                new_task = Task(
-                    short_desc=task.short_desc,
-                    long_desc=task.long_desc,
-                    safety=task.safety,
-                    impact=task.impact,
-                    hype=task.hype,
-                    due_date=next_revival + time_diff,
-                    area=task.area,
-                    entity=task.entity,
-                    maintenance_plan=task.maintenance_plan,
-                    procedure_doc=task.procedure_doc,
-                    requestor=task.requestor,
-                    project=task.project,
-                    is_win=task.is_win,
-                    prerequisites=task.prerequisites.copy(),
-                    contingents=task.contingents.copy(),
-                    delegate=task.delegate,
-                    status="active",
-                    impact_is_percentage=task.impact_is_percentage,
-                    recurrence_type=task.recurrence_type,
-                    recurrence_settings=task.recurrence_settings.copy(),
-                    first_active_date=next_revival,
-                    snooze_until=next_revival,
-                    delegate_reminder_days=task.delegate_reminder_days
-                )
-                self.tasks.append(new_task)
-
     def complete_task(self, task, new_task):
         global invalid_input_color, valid_input_color
         #check and confirm completion date
@@ -1993,16 +1827,7 @@ class TaskManager:
 
         #saving the task also validates the other date entry fields
         self.save_task(task, new_task)
-        task.status = "completed"
-        task.completion_date = completion_date
-        self.save_task(task, new_task)
-        if task.recurrence_type != "none":
-            self.create_next_recurrance(task)
-        self.save_data()
-        try:
-            self.adventure_manager.queue_adventure(task.calculate_priority(self.tasks, for_adventure = True), task.completion_date, task.id, task.short_desc, task.is_win)
-        except Exception as e:
-            print("a_manager error:",e)
+        self.complete(task, completion_date) #queues the adventure too
         self.show_task_details(task_id=task.id, new_task=False) #show again because buttons change
         self.update_task_list()
 
@@ -2018,22 +1843,16 @@ class TaskManager:
 
         #saving the task also validates the other date entry fields
         self.save_task(task, new_task)
-        task.status = "abandoned"
-        task.completion_date = completion_date
+        recur = True
         if task.recurrence_type != "none":
-            answer = messagebox.askyesno("Abandon instance of recurring task?", "You are abandoning a task which is set up as recurring. \n\n- Press 'Yes' to continue recurring in the future. \n- Press 'No' to terminate all future recurrances.")
-            if answer:
-                self.create_next_recurrance(task)
-        self.save_data()
+            recur = messagebox.askyesno("Abandon instance of recurring task?", "You are abandoning a task which is set up as recurring. \n\n- Press 'Yes' to continue recurring in the future. \n- Press 'No' to terminate all future recurrances.")
+        self.abandon(task, completion_date, recur=recur)
         self.show_task_details(task_id=task.id, new_task=False) #show again because buttons change
         self.update_task_list()
 
     def revive_task(self, task, new_task):
         self.save_task(task, new_task)
-        task.status = "active"
-        task.completion_date = None
-        task.snooze_until = None
-        self.save_data()
+        self.revive(task)
         self.show_task_details(task_id=task.id, new_task=False) #show again because buttons change
         self.update_task_list()
 
@@ -2213,6 +2032,7 @@ class TaskManager:
             for task in dependent_tasks:
                 task.delegate = None
                 task.delegate_reminder_days = 1
+                self.mark_task_changed(task)
 
         for person_id in person_ids:
             self.people = [p for p in self.people if p.id != person_id]
@@ -2223,6 +2043,11 @@ class TaskManager:
         window.destroy()
         self.manage_people()  # Refresh the people manager
 
+    def on_close(self):
+        #write out anything still pending before the window (and the writer thread) go away
+        self.close()
+        self.root.destroy()
+
     def run(self):
         self.root.mainloop()
 
@@ -7,6 +7,7 @@ from tkinter.font import Font
 import uuid
 import math
 import textwrap
+from task_storage import write_text_atomic
 
 Adventure_Feature_Enabled = True
 MAX_ADVENTURES = 5 #adventures to keep in the log
@@ -316,8 +317,17 @@ class AdventureManager:
             return adventurer
 
     def save_adventurer(self):
-        with open(ADVENTURER_FILE_PATH, "w") as f:
-            json.dump(vars(self.adventurer), f, default=str)
+        text = json.dumps(vars(self.adventurer), default=str)
+        self.persist(ADVENTURER_FILE_PATH, lambda: write_text_atomic(ADVENTURER_FILE_PATH, text))
+
+    def persist(self, key, write):
+        #hand the write to the task manager's background writer (coalesced per file);
+        #the data must already be snapshotted, since write runs on another thread later
+        persistence = getattr(self.task_manager, "persistence", None)
+        if persistence is None:
+            write()
+        else:
+            persistence.mark_dirty(key, lambda: write)
 
     def load_leaderboard(self):
         try:
@@ -331,14 +341,16 @@ class AdventureManager:
             return leaderboard
 
     def save_leaderboard(self):
-        try:
-            with open(LEADERBOARD_FILE_PATH, "r") as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            data = {}
-        data["leaderboard"] = self.leaderboard
-        with open(LEADERBOARD_FILE_PATH, "w") as f:
-            json.dump(data, f, default=str)
+        leaderboard = json.loads(json.dumps(self.leaderboard, default=str))
+        def write():
+            try:
+                with open(LEADERBOARD_FILE_PATH, "r") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = {}
+            data["leaderboard"] = leaderboard
+            write_text_atomic(LEADERBOARD_FILE_PATH, json.dumps(data, default=str))
+        self.persist(LEADERBOARD_FILE_PATH, write)
 
     def load_content(self):
         wb = openpyxl.load_workbook(CONTENT_FILE_PATH)
@@ -469,8 +481,9 @@ class AdventureManager:
                 for entry in self.adventure_queue
             ]
         }
-        with open(self.tracker_file, "w") as f:
-            json.dump(data, f, default=str)
+        text = json.dumps(data, default=str)
+        tracker_file = self.tracker_file
+        self.persist(tracker_file, lambda: write_text_atomic(tracker_file, text))
 
     def initialize_adventures(self):
         #checks adventure tracker for adventures that were unfinished last time the app closed
@@ -530,8 +543,21 @@ class AdventureManager:
         self.start_next_adventure()
 
     def queue_adventure(self, task_priority, completion_date, task_id, short_desc, is_win):
-        if not Adventure_Feature_Enabled:
+        self.queue_adventures([(task_priority, completion_date, task_id, short_desc, is_win)])
+
+    def queue_adventures(self, completions):
+        #completions is a list of (task_priority, completion_date, task_id, short_desc, is_win);
+        #the tracker is saved and the next adventure started once for the whole batch
+        if not Adventure_Feature_Enabled or not completions:
             return
+        queued = False
+        for completion in completions:
+            queued = self._queue_one(*completion) or queued
+        if queued:
+            self.save_tracker()
+            self.start_next_adventure()
+
+    def _queue_one(self, task_priority, completion_date, task_id, short_desc, is_win):
         now = datetime.datetime.now()
         today_midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
         
@@ -539,7 +565,7 @@ class AdventureManager:
             entry["task_id"] == task_id and entry["date"] >= today_midnight
             for entry in self.completed_task_ids
         ):
-            return
+            return False
         
         self.completed_task_ids.append({
             "task_id": task_id,
@@ -576,9 +602,7 @@ class AdventureManager:
             "short_desc": short_desc
         }
         self.adventure_queue.append(adventure)
-        
-        self.save_tracker()
-        self.start_next_adventure()
+        return True
         
     def start_next_adventure(self):
         if not self.adventure_queue: 
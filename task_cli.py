@@ -0,0 +1,262 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import task_core
+from task_core import Task, TaskStore
+from task_storage import open_storage, task_record
+from task_sync import SyncClient, SyncState
+
+#Command line for the task store, for scripts and bulk jobs:
+#
+#  python task_cli.py list --top 10
+#  python task_cli.py add "Replace pump seal" --due 2026-11-02 --safety 80 --area "Unit 3"
+#  python task_cli.py complete 3f2a9c1e
+#  python task_cli.py snooze 3f2a9c1e --days 3
+#  python task_cli.py import plan_export.csv        (or .json, or - for JSON on stdin)
+#  python task_cli.py export tasks.json             (or no file for stdout)
+#  python task_cli.py purge --months 6
+#  python task_cli.py search "pump seal"
+#  python task_cli.py sync http://127.0.0.1:8765    (then just sync; see task_sync.py)
+#
+#Tasks can be named by id or by any unique start of one (list and search print the
+#first 8 characters). Nothing here loads Tk or the adventure workbook, and results are
+#printed as they're found rather than collected first.
+
+CSV_INT_FIELDS = ("safety", "hype", "delegate_reminder_days")
+CSV_FLOAT_FIELDS = ("impact",)
+CSV_BOOL_FIELDS = ("is_win", "impact_is_percentage")
+CSV_LIST_FIELDS = ("prerequisites", "contingents") # ";"-separated task ids
+
+
+def parse_date(text):
+    try:
+        return datetime.strptime(text, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{text!r} is not a YYYY-MM-DD date")
+
+
+def find_task(store, task_id):
+    """The only hot task whose id starts with task_id, or else the task in history with
+    exactly this id (so history is only loaded when no hot task matches)."""
+    matches = [t for t in store.tasks if t.id.startswith(task_id)]
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        exact = [t for t in matches if t.id == task_id]
+        if exact:
+            return exact[0]
+        raise LookupError(f"{task_id!r} matches {len(matches)} tasks; give more of the id")
+    task = store.find_task(task_id)
+    if task is None:
+        raise LookupError(f"No task with id {task_id!r}")
+    return task
+
+
+def task_line(task, priority=None):
+    score = f"{priority:6.1f}" if priority is not None else "     -"
+    return f"{score}  {task.due_date:%Y-%m-%d}  {task.id[:8]}  {task.status:<9}  {task.short_desc}"
+
+
+def csv_record(row):
+    #a CSV cell is always text; turn the typed columns back into what Task expects
+    record = {}
+    for key, value in row.items():
+        if key is None or value is None or value == "":
+            continue
+        key = key.strip()
+        value = value.strip()
+        if key in CSV_INT_FIELDS:
+            value = int(value)
+        elif key in CSV_FLOAT_FIELDS:
+            value = float(value.replace("$", "").replace(",", ""))
+        elif key in CSV_BOOL_FIELDS:
+            value = value.lower() in ("1", "true", "yes", "y")
+        elif key in CSV_LIST_FIELDS:
+            value = [part.strip() for part in value.split(";") if part.strip()]
+        elif key == "recurrence_settings":
+            value = json.loads(value)
+        record[key] = value
+    return record
+
+
+def read_records(path):
+    if path == "-":
+        data = json.load(sys.stdin)
+    elif path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return [csv_record(row) for row in csv.DictReader(f)]
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    return data["tasks"] if isinstance(data, dict) else data
+
+
+def cmd_list(store, args):
+    for task in store.top_actionable(args.top):
+        print(task_line(task, store.priorities.get(task.id)))
+
+
+def cmd_add(store, args):
+    #same default due date as a new task saved from the details pane
+    due = args.due if args.due is not None else (datetime.now() + timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0)
+    task = Task(args.short_desc, args.long_desc, args.safety, args.impact, args.hype, due,
+                area=args.area, entity=args.entity, maintenance_plan=args.plan,
+                requestor=args.requestor, project=args.project,
+                impact_is_percentage=not args.dollars)
+    if args.delegate:
+        task.delegate = next((p for p in store.people if p.name == args.delegate), None)
+        if task.delegate is None:
+            raise LookupError(f"No person named {args.delegate!r}")
+    store.add_tasks(task)
+    print(task.id)
+
+
+def cmd_complete(store, args):
+    task = find_task(store, args.task_id)
+    store.complete(task, args.date)
+    print(task_line(task))
+
+
+def cmd_snooze(store, args):
+    task = find_task(store, args.task_id)
+    store.snooze(task, args.days)
+    print(f"{task.id[:8]}  snoozed until {task.snooze_until:%Y-%m-%d}")
+
+
+def cmd_import(store, args):
+    added, updated = store.import_records(read_records(args.file))
+    print(f"{len(added)} added, {len(updated)} updated")
+
+
+def cmd_export(store, args):
+    out = open(args.file, "w", encoding="utf-8") if args.file else sys.stdout
+    try:
+        #written a record at a time, so a big history never sits in memory as one string
+        out.write('{"people": ')
+        json.dump([vars(p) for p in store.people], out, default=str)
+        out.write(', "tasks": [')
+        for i, task in enumerate(store.tasks if args.open_only else store.all_tasks()):
+            out.write(",\n" if i else "\n")
+            json.dump(task_record(task), out, default=str)
+        out.write("\n]}\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def cmd_purge(store, args):
+    archived, archive_filename = store.archive_old_tasks(args.months)
+    if archived:
+        print(f"{archived} tasks archived to {archive_filename}")
+    else:
+        print("No tasks meet the criteria for archiving.")
+
+
+def cmd_search(store, args):
+    priorities = store.refresh_priorities()
+    for i, task in enumerate(store.iter_search(args.query)):
+        if args.limit is not None and i >= args.limit:
+            break
+        print(task_line(task, priorities.get(task.id)))
+
+
+def cmd_sync(store, args):
+    url = args.server or store.sync_state.server
+    if not url:
+        raise ValueError("No server given, and this task list hasn't synced with one before")
+    client = SyncClient(store, url)
+    try:
+        pushed, pulled = client.sync()
+    finally:
+        client.close()
+    print(f"{pushed} records pushed, {pulled} pulled")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="task_cli", description="Scripted access to the task list.")
+    parser.add_argument("--backend", default=task_core.storage_backend, choices=["sqlite", "journal", "json"])
+    parser.add_argument("--db", default=task_core.database_file, help="SQLite database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("list", help="highest-priority actionable tasks")
+    p.add_argument("--top", type=int, default=None, metavar="N")
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser("add", help="add a task and print its id")
+    p.add_argument("short_desc")
+    p.add_argument("--long-desc", default="")
+    p.add_argument("--due", type=parse_date, help="YYYY-MM-DD (default: a week from today)")
+    p.add_argument("--safety", type=int, default=50)
+    p.add_argument("--hype", type=int, default=50)
+    p.add_argument("--impact", type=float, default=0)
+    p.add_argument("--dollars", action="store_true", help="impact is dollars, not a percentage")
+    p.add_argument("--area", default="")
+    p.add_argument("--entity", default="")
+    p.add_argument("--plan", default="", help="maintenance plan or work order")
+    p.add_argument("--requestor", default="")
+    p.add_argument("--project", default="")
+    p.add_argument("--delegate", help="name of a person in the people list")
+    p.set_defaults(func=cmd_add)
+
+    p = commands.add_parser("complete", help="mark a task completed")
+    p.add_argument("task_id")
+    p.add_argument("--date", type=parse_date, help="backdate the completion (YYYY-MM-DD)")
+    p.set_defaults(func=cmd_complete)
+
+    p = commands.add_parser("snooze", help="snooze a task until midnight N days from now")
+    p.add_argument("task_id")
+    p.add_argument("--days", type=int, default=1)
+    p.set_defaults(func=cmd_snooze)
+
+    p = commands.add_parser("import", help="add or update tasks from a JSON or CSV file")
+    p.add_argument("file", help='.json ({"tasks": [...]} or a list), .csv with task field columns, or - for stdin')
+    p.set_defaults(func=cmd_import)
+
+    p = commands.add_parser("export", help="write people and tasks as JSON")
+    p.add_argument("file", nargs="?", help="output file (default: stdout)")
+    p.add_argument("--open-only", action="store_true", help="leave out the closed history")
+    p.set_defaults(func=cmd_export)
+
+    p = commands.add_parser("purge", help="archive tasks closed more than N months ago")
+    p.add_argument("--months", type=int, required=True, metavar="N")
+    p.set_defaults(func=cmd_purge)
+
+    p = commands.add_parser("search", help="tasks with the text in any field")
+    p.add_argument("query")
+    p.add_argument("--limit", type=int, default=None, metavar="N")
+    p.set_defaults(func=cmd_search)
+
+    p = commands.add_parser("sync", help="push changes to a task_server and pull everyone else's")
+    p.add_argument("server", nargs="?", help="e.g. http://127.0.0.1:8765 (default: the last one synced with)")
+    p.set_defaults(func=cmd_sync)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    #the sync state belongs with the data it describes
+    sync_state = SyncState(os.path.join(os.path.dirname(args.db), task_core.sync_state_file))
+    store = TaskStore(open_storage(args.backend, args.db), sync_state)
+    #one run scores the list once, and importing numpy would cost more than it saves
+    store.priority_cache.engine.vectorized = False
+    try:
+        store.load()
+        args.func(store, args)
+    except BrokenPipeError:
+        #e.g. piped into head; the rest of the output just isn't wanted
+        sys.stderr.close()
+        return 0
+    except (LookupError, ValueError, OSError) as e:
+        print(f"task_cli: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
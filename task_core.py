@@ -0,0 +1,2193 @@
+import json
+import os
+import sys
+import uuid
+import calendar
+import math
+import heapq
+from datetime import datetime, timedelta
+from functools import partial
+
+from task_storage import (open_storage, task_record, person_record, PersistenceScheduler,
+                          TASK_FIELDS, PERSON_FIELDS, EDGE_KINDS, SYNC_FIELDS)
+from task_sync import SyncState, merge_record
+
+#The task list without the GUI: the Task/Person model, the priority engine, search,
+#recurrence, delegate reminders, snoozes and the weekly schedule, plus TaskStore, which
+#loads and saves them and does the everyday operations (add, complete, snooze, purge...).
+#Nothing here imports tkinter or the adventure workbook, so it can be scripted, profiled
+#and benchmarked without a display. "To Do List.py" is the Tk client on top of it.
+
+impact_high_dollars = 100000
+vectorize_min_tasks = 2000 #score with numpy arrays (if installed) once there are this many tasks
+storage_backend = "sqlite" #"sqlite", "journal" or "json"; the first sqlite run imports task_data.json
+database_file = "task_data.db"
+sync_state_file = "sync_state.json" #this replica's clock and unsynced changes (see task_sync.py)
+archive_dir = "_archive" #where purged tasks are written
+
+np = None #numpy, once load_numpy() has found it; it's optional and slow to import
+_numpy_checked = False
+
+
+def load_numpy():
+    """Imports numpy the first time a task list is big enough to vectorize, so scripts
+    and the CLI don't pay for it on small lists. False if it isn't installed."""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            pass
+    return np is not None
+
+
+class Task:
+    def __init__(self, short_desc, long_desc, safety, impact, hype, due_date, 
+                 area="", entity="", maintenance_plan="", procedure_doc="", 
+                 requestor="", project="", is_win=False, id=None, prerequisites=None,
+                 contingents=None, delegate=None, status=None, completion_date=None,
+                 snooze_until=None, impact_is_percentage=False,
+                 recurrence_type="none", recurrence_settings=None, first_active_date=None,
+                 delegate_reminder_days=1, version=0, field_versions=None):
+        if id is None:
+            self.id = str(uuid.uuid4())
+        else:
+            self.id = id
+        self.short_desc = short_desc
+        self.long_desc = long_desc
+        self.safety = safety
+        self.impact = impact
+        self.hype = hype
+        self.due_date = due_date
+        self.area = area
+        self.entity = entity
+        self.maintenance_plan = maintenance_plan
+        self.procedure_doc = procedure_doc
+        self.requestor = requestor
+        self.project = project
+        self.is_win = is_win
+        if prerequisites is None:
+            self.prerequisites = []
+        else:
+            self.prerequisites = prerequisites
+        if contingents is None:
+            self.contingents = []
+        else:
+            self.contingents = contingents
+        self.delegate = delegate
+        if status is None:
+            self.status = "active"
+        else:
+            self.status = status
+        self.completion_date = completion_date
+        self.snooze_until = snooze_until
+        self.impact_is_percentage = impact_is_percentage
+        self.recurrence_type = recurrence_type
+        if recurrence_settings is None:
+            self.recurrence_settings = {}
+        else:
+            self.recurrence_settings = recurrence_settings
+        self.first_active_date = first_active_date
+        self.delegate_reminder_days = delegate_reminder_days
+        #sync stamps, kept by SyncState.stamp: the Lamport time of the last change and
+        #field -> [clock, replica, digest of the value] (JSON text until first needed; see
+        #task_storage.field_versions_of)
+        self.version = version
+        self.field_versions = field_versions if field_versions is not None else {}
+
+    def calculate_priority(self, tasks, for_adventure = False):
+        #Scores the whole list to get this one task's priority. Fine for one-off lookups,
+        #but anything that needs more than one score should call PriorityEngine.compute
+        #once and read from the map it returns.
+        engine = PriorityEngine()
+        engine.compute(tasks)
+        return engine.priority_of(self, for_adventure=for_adventure)
+
+    def raw_base(self, now):
+        """Un-normalized safety/hype/impact/urgency score for this task at time `now`."""
+        urgency = math.ceil((self.due_date - now).total_seconds()/(24*60*60))
+        impact_value = self.impact
+        if not self.impact_is_percentage:
+            impact_value = impact_value * 100/impact_high_dollars
+        safety_term = 0.3 * self.safety / 100
+        hype_term = 0.2 * self.hype / 100
+        impact_term = 0.1 * impact_value / 100
+        raw_urgency_contrib = max(0, 0.4 * ((urgency / (0-60)) +1 ))
+        return safety_term + hype_term + impact_term + raw_urgency_contrib
+
+    def _get_reminder_timing(self, last_reminder_date=None):
+        """
+        Helper method to calculate delegate reminder timing.
+        Returns a tuple: (is_due: bool, days_to_next: int).
+        is_due is True if a reminder is due today.
+        days_to_next is the number of days until the next reminder (0 if due today).
+        
+        last_reminder_date: date of the most recent completed reminder, or None if none exists.
+        """
+        if not self.delegate or self.delegate_reminder_days == 0:
+            return False, None
+        current_time = datetime.now()
+        reference = (self.first_active_date or self.due_date)
+        days_since_start = (current_time - reference).days
+        if days_since_start < 0:  # Handle future start dates
+            return False, -days_since_start
+        if last_reminder_date is None: # no reminder ever sent
+            days_since_last = days_since_start
+        else:
+            days_since_last = (current_time.date() - last_reminder_date).days
+        is_due = days_since_last >= self.delegate_reminder_days
+        days_to_next = max(0, self.delegate_reminder_days - days_since_last)
+        #print(f"is due: {is_due}, days: {days_to_next}")
+        return is_due, days_to_next
+
+    def get_time_to_delegate_reminder(self):
+        #print(f"time to reminder: {self.delegate_reminder_days}")
+        if self.delegate and self.delegate_reminder_days != 0 and self.status == "active" and not self.is_snoozed():
+            _, days_to_next = self._get_reminder_timing()  # no last_reminder_date; conservative display estimate
+            if days_to_next is not None:
+                return f"{days_to_next} days"
+        return "N/A"
+
+    def needs_reminder(self, tasks, last_reminder_date=None, priorities=None):
+        #print(f"needs reminder: {self.delegate}, {self.status}, {self.is_snoozed()}")
+        if self.delegate and self.status == "active" and not self.is_snoozed():
+            if priorities is not None:
+                priority = priorities.get(self.id, -1)
+            else:
+                priority = self.calculate_priority(tasks)
+            if priority < 0:
+                return False
+            is_due, _ = self._get_reminder_timing(last_reminder_date=last_reminder_date)
+            return is_due
+        return False
+
+    def is_snoozed(self, now=None):
+        return self.snooze_until and self.snooze_until > (now if now is not None else datetime.now())
+
+    def get_state(self, tasks, priorities=None):
+        if self.status == "completed":
+            return "Complete"
+        if self.status == "abandoned":
+            return "Abandoned"
+        if self.is_snoozed():
+            return "Snoozed"
+        priority = priorities.get(self.id, -1) if priorities is not None else self.calculate_priority(tasks)
+        if priority < 0 and self.status == "active":
+            return "Contingent"
+        return "Actionable"
+
+    def get_snooze_duration(self):
+        if self.is_snoozed():
+            delta = self.snooze_until - datetime.now()
+            return f"{delta.days + 1} days"
+        return "N/A"
+
+    def get_next_revival_time(self, reference_time=None):
+        if self.recurrence_type == "none":
+            return None
+        if reference_time is None:
+            reference_time = self.first_active_date if self.first_active_date else self.due_date
+        if not reference_time:
+            return None
+
+        if self.recurrence_type == "weekly":
+            days_of_week = self.recurrence_settings.get("days", [])
+            if not days_of_week:
+                return None
+            day_map = {"Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6}
+            target_days = [day_map[day] for day in days_of_week]
+            current_weekday = reference_time.weekday()
+            days_ahead = []
+            for target in target_days:
+                delta = (target - current_weekday) % 7
+                if delta == 0:
+                    delta = 7
+                days_ahead.append(delta)
+                
+            min_days = min(days_ahead)
+            #print("days ahead map:",days_ahead)
+            #print("next recurrence mapped to...", reference_time + timedelta(days=min_days))
+            return reference_time + timedelta(days=min_days)
+
+        elif self.recurrence_type == "monthly":
+            target_day = self.recurrence_settings.get("day", 1)
+            next_month = reference_time.replace(day=1) + timedelta(days=32)
+            next_month = next_month.replace(day=1)
+            last_day_of_month = calendar.monthrange(next_month.year, next_month.month)[1]
+            actual_day = min(target_day, last_day_of_month)
+            return next_month.replace(day=actual_day)
+
+        elif self.recurrence_type == "annually":
+            target_month = self.recurrence_settings.get("month", 1)
+            target_day = self.recurrence_settings.get("day", 1)
+            next_year = reference_time.replace(year=reference_time.year + 1)
+            last_day_of_month = calendar.monthrange(next_year.year, target_month)[1]
+            actual_day = min(target_day, last_day_of_month)
+            return next_year.replace(month=target_month, day=actual_day)
+
+        elif self.recurrence_type == "every_n":
+            n = self.recurrence_settings.get("n", 1)
+            unit = self.recurrence_settings.get("unit", "days")
+            target = self.recurrence_settings.get("target")
+            if unit == "days":
+                return reference_time + timedelta(days=n)
+            elif unit == "weeks":
+                day_map = {"Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6}
+                target_day = day_map[target]
+                next_date = reference_time + timedelta(weeks=n)
+                days_ahead = (target_day - next_date.weekday()) % 7
+                if days_ahead == 0:
+                    days_ahead = 7
+                return next_date + timedelta(days=days_ahead)
+            elif unit == "months":
+                next_date = reference_time + timedelta(days=32 * n)
+                next_date = next_date.replace(day=1)
+                last_day_of_month = calendar.monthrange(next_date.year, next_date.month)[1]
+                actual_day = min(target, last_day_of_month)
+                return next_date.replace(day=actual_day)
+            elif unit == "years":
+                next_date = reference_time.replace(year=reference_time.year + n)
+                last_day_of_month = calendar.monthrange(next_date.year, target)[1]
+                actual_day = min(self.recurrence_settings.get("day", 1), last_day_of_month)
+                return next_date.replace(month=target, day=actual_day)
+        return None
+
+class Person:
+    def __init__(self, name, job_title, department, area="", is_contractor=False, id=None,
+                 version=0, field_versions=None):
+        if id is None:
+            self.id = str(uuid.uuid4())
+        else:
+            self.id = id
+        self.name = name
+        self.job_title = job_title
+        self.department = department
+        self.area = area
+        self.is_contractor = is_contractor
+        self.version = version
+        self.field_versions = field_versions if field_versions is not None else {}
+
+class DependencyGraph:
+    """Prerequisite/contingent edges between tasks, indexed in both directions.
+
+    task.prerequisites are the tasks that have to be completed first; task.contingents are
+    the tasks waiting on this one. The popup keeps the two lists mirrored, but reminder tasks
+    only list their parent as a contingent, so both edge sets are kept as-is rather than
+    deriving one from the other."""
+
+    def __init__(self, tasks=None):
+        self.prerequisites = {}    # task id -> prerequisite ids listed on that task
+        self.contingents = {}      # task id -> contingent ids listed on that task
+        self.prerequisite_of = {}  # task id -> ids of tasks that list it as a prerequisite
+        self.contingent_of = {}    # task id -> ids of tasks that list it as a contingent
+        if tasks is not None:
+            self.build(tasks)
+
+    def build(self, tasks):
+        self.prerequisites.clear()
+        self.contingents.clear()
+        self.prerequisite_of.clear()
+        self.contingent_of.clear()
+        for t in tasks:
+            self.prerequisites[t.id] = list(t.prerequisites)
+            self.contingents[t.id] = list(t.contingents)
+            for prereq_id in t.prerequisites:
+                self.prerequisite_of.setdefault(prereq_id, set()).add(t.id)
+            for cont_id in t.contingents:
+                self.contingent_of.setdefault(cont_id, set()).add(t.id)
+
+    def add_task(self, task):
+        self.remove_task(task.id)
+        self.prerequisites[task.id] = list(task.prerequisites)
+        self.contingents[task.id] = list(task.contingents)
+        for prereq_id in task.prerequisites:
+            self.prerequisite_of.setdefault(prereq_id, set()).add(task.id)
+        for cont_id in task.contingents:
+            self.contingent_of.setdefault(cont_id, set()).add(task.id)
+
+    def remove_task(self, task_id):
+        for prereq_id in self.prerequisites.pop(task_id, []):
+            self.prerequisite_of.get(prereq_id, set()).discard(task_id)
+        for cont_id in self.contingents.pop(task_id, []):
+            self.contingent_of.get(cont_id, set()).discard(task_id)
+
+    def neighbours(self, task_id):
+        """Every task id directly linked to task_id, in either direction."""
+        linked = set(self.prerequisites.get(task_id, []))
+        linked.update(self.contingents.get(task_id, []))
+        linked.update(self.prerequisite_of.get(task_id, ()))
+        linked.update(self.contingent_of.get(task_id, ()))
+        linked.discard(task_id)
+        return linked
+
+    def cycles(self):
+        """Groups of task ids that are contingent on each other in a loop."""
+        found = []
+        for component in self.strongly_connected(self.contingents, lambda tid: self.contingents.get(tid, [])):
+            if len(component) > 1 or component[0] in self.contingents.get(component[0], []):
+                found.append(component)
+        return found
+
+    def propagate(self, base, open_ids, active_ids, result=None):
+        """One sweep of "a task takes the highest priority among its active contingents".
+
+        base maps task id -> own priority. Only tasks in open_ids inherit (inactive or blocked
+        tasks stay at their base), and only contingents in active_ids are looked at. Components
+        come out of strongly_connected() sinks-first, so every contingent is final before
+        anything that inherits from it; tasks in a loop all end up with the loop's best score.
+
+        Pass a previous result to only redo open_ids; every other task keeps its value there."""
+        if result is None:
+            result = dict(base)
+
+        def successors(task_id):
+            return [c for c in self.contingents.get(task_id, []) if c in active_ids and c in result]
+
+        # tasks with no contingents have nothing to inherit, so they just keep their base
+        inheriting = {tid for tid in open_ids if self.contingents.get(tid)}
+        for component in self.strongly_connected(inheriting, successors):
+            members = set(component)
+            best = max(base[tid] for tid in component)
+            for tid in component:
+                for cont_id in successors(tid):
+                    if cont_id not in members and result[cont_id] > best:
+                        best = result[cont_id]
+            for tid in component:
+                result[tid] = best
+        return result
+
+    def upstream(self, task_ids, through=None):
+        """task_ids plus every task that inherits priority from one of them (lists it as a
+        contingent, directly or down a chain). With `through`, the walk only continues
+        through tasks in it."""
+        found = set(task_ids)
+        stack = list(found)
+        while stack:
+            task_id = stack.pop()
+            for parent_id in self.contingent_of.get(task_id, ()):
+                if parent_id not in found and (through is None or parent_id in through):
+                    found.add(parent_id)
+                    stack.append(parent_id)
+        return found
+
+    @staticmethod
+    def strongly_connected(nodes, successors):
+        """Iterative Tarjan. Yields each strongly connected component (as a list) only after
+        every component reachable from it, i.e. in reverse topological order. Successors that
+        aren't in `nodes` are treated as already-finished leaves."""
+        index_of = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        counter = 0
+        for root in nodes:
+            if root in index_of:
+                continue
+            work = [(root, iter(successors(root)))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in nodes:
+                        continue
+                    if child not in index_of:
+                        index_of[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(successors(child))))
+                        advanced = True
+                        break
+                    if child in on_stack and index_of[child] < lowlink[node]:
+                        lowlink[node] = index_of[child]
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    yield component
+
+class VectorScorer:
+    """Keeps every task's scoring fields in NumPy arrays, one row per task, so the priority
+    formula, prerequisite blocking, eligibility and normalization run as array operations.
+    Rows are updated in place as tasks change instead of being rebuilt from the Task objects.
+
+    The arithmetic is done in the same order as Task.raw_base/PriorityEngine._finish, so
+    scores match the scalar path exactly. Contingent inheritance is still done by
+    DependencyGraph.propagate, which only has to visit tasks that have contingents."""
+
+    EPOCH = datetime(1970, 1, 1)
+    MICROSECOND = timedelta(microseconds=1)
+    FIELDS = ("safety", "hype", "impact", "impact_is_percentage", "due_date", "snooze_until",
+              "status", "delegated", "is_win", "has_contingents", "live")
+
+    def __init__(self):
+        self.tasks = []   # row -> Task (None once removed)
+        self.row_of = {}  # task id -> row
+        self.size = 0
+        self.dead = 0
+        self.next_change = np.zeros(0, dtype="datetime64[us]")
+        self.generation = 0   # bumped whenever rows get renumbered
+        self._prerequisites = []
+        self._edges_stale = True
+        self._allocate(0)
+
+    def load(self, tasks):
+        self.tasks = list(tasks)
+        self.row_of = {t.id: row for row, t in enumerate(self.tasks)}
+        self.size = len(self.tasks)
+        self.dead = 0
+        self.generation += 1
+        self._prerequisites = [tuple(t.prerequisites) for t in self.tasks]
+        capacity = max(16, self.size)
+        self._allocate(capacity)
+        # build each column in one go; setting rows one at a time is much slower
+        columns = {
+            "safety": [t.safety for t in self.tasks],
+            "hype": [t.hype for t in self.tasks],
+            "impact": [t.impact for t in self.tasks],
+            "impact_is_percentage": [bool(t.impact_is_percentage) for t in self.tasks],
+            "due_date": [self._microseconds(t.due_date) for t in self.tasks],
+            "snooze_until": [self._microseconds(t.snooze_until) for t in self.tasks],
+            "status": [{"active": 0, "completed": 1}.get(t.status, 2) for t in self.tasks],
+            "delegated": [bool(t.delegate) for t in self.tasks],
+            "is_win": [bool(t.is_win) for t in self.tasks],
+            "has_contingents": [bool(t.contingents) for t in self.tasks],
+        }
+        for name, values in columns.items():
+            column = getattr(self, name)
+            if name in ("due_date", "snooze_until"):
+                column[:self.size] = np.array(values, dtype=np.int64).view("datetime64[us]")
+            else:
+                column[:self.size] = np.array(values, dtype=column.dtype)
+        self.live[:self.size] = True
+        self._edges_stale = True
+
+    def update(self, tasks):
+        for t in tasks:
+            row = self.row_of.get(t.id)
+            if row is None:
+                self._add_row(t)
+                self._edges_stale = True  # something may already list it as a prerequisite
+            else:
+                self.tasks[row] = t
+                self._set_row(row, t)
+
+    def remove(self, task_ids):
+        for task_id in task_ids:
+            row = self.row_of.pop(task_id, None)
+            if row is None:
+                continue
+            self.tasks[row] = None
+            self._prerequisites[row] = ()
+            self.live[row] = False
+            self.status[row] = 2
+            self.dead += 1
+            self._edges_stale = True
+        if self.dead > 64 and self.dead > self.size // 2:
+            self.load([t for t in self.tasks[:self.size] if t is not None])
+
+    def score(self, now):
+        """Returns (base, open_mask, active_mask, max_raw_base, valid_until) for rows [0, size).
+        base is the priority before contingent inheritance (-1 for inactive/blocked rows)."""
+        n = self.size
+        if self._edges_stale:
+            self._rebuild_edges()
+        now64 = np.datetime64(now, "us")
+        live = self.live[:n]
+        status = self.status[:n]
+        due_date = self.due_date[:n]
+
+        seconds = (due_date - now64).astype(np.int64) / 10**6
+        urgency = np.ceil(seconds/(24*60*60))
+        impact_value = np.where(self.impact_is_percentage[:n], self.impact[:n],
+                                self.impact[:n] * 100/impact_high_dollars)
+        safety_term = 0.3 * self.safety[:n] / 100
+        hype_term = 0.2 * self.hype[:n] / 100
+        impact_term = 0.1 * impact_value / 100
+        raw_urgency_contrib = np.maximum(0, 0.4 * ((urgency / (0-60)) +1 ))
+        raw = safety_term + hype_term + impact_term + raw_urgency_contrib
+
+        blocked = np.zeros(n, dtype=bool)
+        if len(self._edge_rows):
+            unmet = self.status[self._edge_prerequisite_rows] != 1
+            blocked[self._edge_rows[unmet]] = True
+        active = live & (status == 0)
+        open_mask = active & ~blocked
+        snoozed = self.snooze_until[:n] > now64
+        eligible = open_mask & ~snoozed & ~self.delegated[:n] & ~self.is_win[:n]
+
+        max_raw_base = 0
+        if eligible.any():
+            max_raw_base = max(0, float(raw[eligible].max()))
+        if max_raw_base > 0:
+            normalized = raw / max_raw_base * 100
+        else:
+            normalized = np.zeros(n)
+        priority = np.where(eligible, normalized, raw * 100)
+        priority = np.where(priority > 100, 100, priority)
+        priority = np.where(self.is_win[:n], priority + 101, priority)
+        base = np.where(open_mask, priority, -1)
+
+        # same rule as PriorityEngine.next_change, for every active row at once
+        valid_until = None
+        days_back = np.where(urgency > 60, 59, urgency - 1).astype(np.int64)
+        change = due_date - (days_back * 86400 * 10**6).astype("timedelta64[us]")
+        snooze_first = (self.snooze_until[:n] > now64) & (self.snooze_until[:n] < change)
+        change = np.where(snooze_first, self.snooze_until[:n], change)
+        self.next_change = np.where(active, change, np.datetime64("NaT"))
+        if active.any():
+            valid_until = change[active].min().item()
+        return base, open_mask, active, max_raw_base, valid_until
+
+    def due_tasks(self, now):
+        """Tasks whose score changed on its own by `now`, going by the last score()."""
+        rows = np.flatnonzero(self.next_change <= np.datetime64(now, "us"))
+        return [self.tasks[row] for row in rows if row < self.size and self.live[row]]
+
+    def to_dict(self, values):
+        """{task_id: value} for every live row."""
+        if not self.dead:
+            return dict(zip((t.id for t in self.tasks[:self.size]), values[:self.size].tolist()))
+        rows = np.flatnonzero(self.live[:self.size])
+        return dict(zip((self.tasks[row].id for row in rows), values[rows].tolist()))
+
+    def ids_where(self, mask):
+        return {self.tasks[row].id for row in np.flatnonzero(mask & self.live[:self.size])}
+
+    def rows_where(self, mask):
+        """A set-like view (supports `in`) of the task ids whose row is set in mask."""
+        return _RowMask(self.row_of, mask)
+
+    @staticmethod
+    def _microseconds(when):
+        #datetime -> microseconds since 1970 (NaT for None); much faster than letting
+        #numpy convert a list of datetimes itself
+        if not when:
+            return -2**63 #NaT
+        return (when - VectorScorer.EPOCH) // VectorScorer.MICROSECOND
+
+    def _allocate(self, capacity):
+        self.safety = np.zeros(capacity)
+        self.hype = np.zeros(capacity)
+        self.impact = np.zeros(capacity)
+        self.impact_is_percentage = np.zeros(capacity, dtype=bool)
+        self.due_date = np.zeros(capacity, dtype="datetime64[us]")
+        self.snooze_until = np.full(capacity, np.datetime64("NaT"), dtype="datetime64[us]")
+        self.status = np.full(capacity, 2, dtype=np.int8)
+        self.delegated = np.zeros(capacity, dtype=bool)
+        self.is_win = np.zeros(capacity, dtype=bool)
+        self.has_contingents = np.zeros(capacity, dtype=bool)
+        self.live = np.zeros(capacity, dtype=bool)
+        self._edge_rows = np.zeros(0, dtype=np.intp)
+        self._edge_prerequisite_rows = np.zeros(0, dtype=np.intp)
+
+    def _add_row(self, task):
+        if self.size == len(self.live):
+            capacity = max(16, self.size * 2)
+            for name in self.FIELDS:
+                old = getattr(self, name)
+                grown = np.zeros(capacity, dtype=old.dtype)
+                if name == "snooze_until":
+                    grown[:] = np.datetime64("NaT")
+                grown[:self.size] = old[:self.size]
+                setattr(self, name, grown)
+        row = self.size
+        self.size += 1
+        self.tasks.append(task)
+        self._prerequisites.append(())
+        self.row_of[task.id] = row
+        self._set_row(row, task)
+
+    def _set_row(self, row, task):
+        self.safety[row] = task.safety
+        self.hype[row] = task.hype
+        self.impact[row] = task.impact
+        self.impact_is_percentage[row] = bool(task.impact_is_percentage)
+        self.due_date[row] = np.datetime64(task.due_date, "us")
+        self.snooze_until[row] = np.datetime64(task.snooze_until, "us") if task.snooze_until else np.datetime64("NaT")
+        self.status[row] = {"active": 0, "completed": 1}.get(task.status, 2)
+        self.delegated[row] = bool(task.delegate)
+        self.is_win[row] = bool(task.is_win)
+        self.has_contingents[row] = bool(task.contingents)
+        self.live[row] = True
+        prerequisites = tuple(task.prerequisites)
+        if prerequisites != self._prerequisites[row]:
+            self._prerequisites[row] = prerequisites
+            self._edges_stale = True
+
+    def _rebuild_edges(self):
+        rows = []
+        prerequisite_rows = []
+        for row, prerequisite_ids in enumerate(self._prerequisites):
+            for prereq_id in prerequisite_ids:
+                prereq_row = self.row_of.get(prereq_id)
+                if prereq_row is not None:
+                    rows.append(row)
+                    prerequisite_rows.append(prereq_row)
+        self._edge_rows = np.array(rows, dtype=np.intp)
+        self._edge_prerequisite_rows = np.array(prerequisite_rows, dtype=np.intp)
+        self._edges_stale = False
+
+class _RowMask:
+    def __init__(self, row_of, mask):
+        self.row_of = row_of
+        self.mask = mask
+
+    def __contains__(self, task_id):
+        row = self.row_of.get(task_id)
+        return row is not None and row < len(self.mask) and bool(self.mask[row])
+
+class PriorityEngine:
+    """Scores every task in one pass.
+
+    Priority rules (same as the old per-task Task.calculate_priority):
+    - Tasks that aren't active, or that have an existing prerequisite that isn't completed,
+      score -1.
+    - Everything else gets a raw base from safety/hype/impact/urgency. Tasks that are
+      "eligible" (not snoozed, not delegated, not W.I.N.) are normalized against the
+      highest eligible raw base; the rest just use raw base * 100.
+    - Scores are capped at 100, W.I.N. tasks get +101 on top, and a task inherits the
+      priority of any active contingent task that scores higher than it does.
+
+    compute() returns a {task_id: priority} map and keeps the id->Task index, the dependency
+    graph and the normalization max around so priority_of() can answer follow-up questions
+    (e.g. the for_adventure score of a task that was just completed) without rescanning.
+
+    vectorized: None picks the NumPy VectorScorer automatically once there are
+    vectorize_min_tasks tasks (if numpy is installed); True/False forces it on/off."""
+
+    def __init__(self, vectorized=None):
+        self.vectorized = vectorized
+        self.scorer = None
+        self._vector_previous = None
+        self.task_index = {}
+        self.graph = DependencyGraph()
+        self.max_raw_base = 0
+        self.priorities = {}
+        self.now = None
+        self.valid_until = None  # VectorScorer mode: earliest instant some score changes on its own
+        self._next_change = {}   # task id -> when its score next changes on its own
+        self._wakeups = []       # heap of (instant, task id); stale entries are skipped
+        self._raw = {}           # open (active, unblocked) task id -> raw base
+        self._eligible = set()   # open ids that count towards the normalization max
+        self._active = set()
+        self._base = {}          # task id -> priority before contingent inheritance
+
+    def has_unmet_prerequisites(self, task):
+        for prereq_id in task.prerequisites:
+            prereq = self.task_index.get(prereq_id)
+            if prereq and prereq.status != "completed":
+                return True
+        return False
+
+    def compute(self, tasks, now=None, graph=None):
+        """graph: a DependencyGraph already built from `tasks`; one is built if not given."""
+        self.now = now if now is not None else datetime.now()
+        self.task_index = {t.id: t for t in tasks}
+        self.graph = graph if graph is not None else DependencyGraph(tasks)
+        self._raw = {}
+        self._eligible = set()
+        self._active = set()
+        if self._use_vector_scorer(len(tasks)):
+            self.scorer = VectorScorer()
+            self.scorer.load(tasks)
+            self._vector_previous = None
+            self._vector_pass()
+            return self.priorities
+        self.scorer = None
+
+        # First pass: raw base for every open task, and the max among eligible ones.
+        self._next_change = {}
+        self._wakeups = None
+        for t in tasks:
+            self._score_components(t)
+        self.max_raw_base = self._eligible_max()
+        self._wakeups = [(when, task_id) for task_id, when in self._next_change.items()]
+        heapq.heapify(self._wakeups)
+
+        # Second pass: normalize, cap, W.I.N. bonus. Inactive/blocked tasks stay at -1.
+        self._base = {t.id: self._base_of(t.id) for t in tasks}
+
+        # Third pass: inherit priority from active contingents, one topological sweep.
+        self.priorities = self.graph.propagate(self._base, self._raw.keys(), self._active)
+        return self.priorities
+
+    def rescore(self, changed, removed=(), now=None):
+        """Incremental compute(). changed: Task objects that were added or edited, plus any
+        task whose score could depend on them (see PriorityCache.mark_dirty). removed: ids of
+        tasks that are gone. Only those tasks, the normalization max, and the tasks that
+        inherit from them are recomputed. Returns the set of ids whose priority was recomputed."""
+        self.now = now if now is not None else datetime.now()
+        if self.scorer is not None:
+            for task_id in removed:
+                self.task_index.pop(task_id, None)
+                self.graph.remove_task(task_id)
+            for t in changed:
+                self.task_index[t.id] = t
+                self.graph.add_task(t)
+            inherited = set()
+            for task_id in removed:
+                inherited.update(self.graph.contingent_of.get(task_id, ()))
+                self._base.pop(task_id, None)
+                self.priorities.pop(task_id, None)
+            self.scorer.remove(removed)
+            self.scorer.update(changed)
+            return self._vector_pass(touched=inherited.union(t.id for t in changed))
+        old_max = self.max_raw_base
+        rescan_max = False
+        touched = set()
+
+        for task_id in removed:
+            if task_id in self._eligible and self._raw[task_id] >= old_max:
+                rescan_max = True
+            self._next_change.pop(task_id, None)
+            self.task_index.pop(task_id, None)
+            self.graph.remove_task(task_id)
+            self._raw.pop(task_id, None)
+            self._eligible.discard(task_id)
+            self._active.discard(task_id)
+            self._base.pop(task_id, None)
+            self.priorities.pop(task_id, None)
+            # whatever inherited from it has to be looked at again
+            touched.update(self.graph.contingent_of.get(task_id, ()))
+
+        for t in changed:
+            self.task_index[t.id] = t
+            self.graph.add_task(t)
+        for t in changed:
+            was_max = t.id in self._eligible and self._raw[t.id] >= old_max
+            self._score_components(t)
+            if was_max and (t.id not in self._eligible or self._raw[t.id] < old_max):
+                rescan_max = True
+            touched.add(t.id)
+
+        if rescan_max:
+            self.max_raw_base = self._eligible_max()
+        else:
+            for t in changed:
+                if t.id in self._eligible and self._raw[t.id] > self.max_raw_base:
+                    self.max_raw_base = self._raw[t.id]
+        if self.max_raw_base != old_max:
+            touched.update(self._eligible)  # every normalized score moves with the max
+
+        touched = {tid for tid in touched if tid in self.task_index}
+        for task_id in touched:
+            self._base[task_id] = self._base_of(task_id)
+        affected = self.graph.upstream(touched, through=self._raw)
+        for task_id in affected:
+            self.priorities[task_id] = self._base[task_id]
+        self.graph.propagate(self._base, affected.intersection(self._raw), self._active, result=self.priorities)
+        return affected
+
+    def next_wakeup(self):
+        """Earliest instant at which some task's score changes without anything being edited."""
+        if self.scorer is not None:
+            return self.valid_until
+        while self._wakeups and self._next_change.get(self._wakeups[0][1]) != self._wakeups[0][0]:
+            heapq.heappop(self._wakeups)
+        return self._wakeups[0][0] if self._wakeups else None
+
+    def pop_due(self, now):
+        """Tasks whose score has changed on its own by `now` (urgency ticked over a day
+        boundary, or a snooze ran out). Hand these to rescore()."""
+        if self.scorer is not None:
+            if self.valid_until is None or now < self.valid_until:
+                return []
+            return self.scorer.due_tasks(now)
+        due = {}
+        while self._wakeups and self._wakeups[0][0] <= now:
+            when, task_id = heapq.heappop(self._wakeups)
+            if self._next_change.get(task_id) == when and task_id in self.task_index:
+                due[task_id] = self.task_index[task_id]
+        if len(self._wakeups) > 2 * len(self._next_change) + 64:
+            self._wakeups = [(when, task_id) for task_id, when in self._next_change.items()]
+            heapq.heapify(self._wakeups)
+        return list(due.values())
+
+    def next_change(self, task, now):
+        """When this task's own score next changes with nothing being edited: its urgency
+        ticks over (days-until-due is rounded up, and stops mattering beyond 60 days out) or
+        its snooze runs out. None if it never does on its own."""
+        if task.status != "active":
+            return None
+        days_left = math.ceil((task.due_date - now).total_seconds()/(24*60*60))
+        if days_left > 60:
+            change = task.due_date - timedelta(days=59)
+        else:
+            change = task.due_date - timedelta(days=days_left - 1)
+        if task.snooze_until and now < task.snooze_until < change:
+            change = task.snooze_until
+        return change
+
+    def _use_vector_scorer(self, count):
+        if self.vectorized is False or not (self.vectorized or count >= vectorize_min_tasks):
+            return False
+        return load_numpy()
+
+    def _vector_pass(self, touched=None):
+        """Score every row with the VectorScorer. With `touched` (ids of tasks that changed),
+        rows whose base score didn't move keep their previous priority and only the changed
+        ones, plus whatever inherits from them, go through contingent propagation again.
+        Returns the ids that were recomputed."""
+        base, open_mask, active_mask, self.max_raw_base, self.valid_until = self.scorer.score(self.now)
+        scorer = self.scorer
+        previous = self._vector_previous
+        self._vector_previous = (scorer.generation, base, active_mask)
+        if touched is None or previous is None or previous[0] != scorer.generation:
+            self._base = scorer.to_dict(base)
+            inheriting = scorer.ids_where(open_mask & scorer.has_contingents[:scorer.size])
+            self.priorities = self.graph.propagate(self._base, inheriting, scorer.rows_where(active_mask))
+            return set(self.priorities)
+
+        old_size = len(previous[1])
+        moved = np.flatnonzero((base[:old_size] != previous[1]) | (active_mask[:old_size] != previous[2]))
+        rows = set(moved.tolist())
+        rows.update(range(old_size, scorer.size))
+        touched = set(touched)
+        for row in rows:
+            if scorer.live[row]:
+                task_id = scorer.tasks[row].id
+                self._base[task_id] = float(base[row])
+                touched.add(task_id)
+        open_view = scorer.rows_where(open_mask)
+        touched = {tid for tid in touched if tid in scorer.row_of}
+        affected = self.graph.upstream(touched, through=open_view)
+        for task_id in affected:
+            self.priorities[task_id] = self._base[task_id]
+        inheriting = {tid for tid in affected if tid in open_view}
+        self.graph.propagate(self._base, inheriting, scorer.rows_where(active_mask), result=self.priorities)
+        return affected
+
+    def _score_components(self, task):
+        task_id = task.id
+        self._raw.pop(task_id, None)
+        self._eligible.discard(task_id)
+        self._active.discard(task_id)
+        if task.status != "active":
+            return
+        self._active.add(task_id)
+        change = self.next_change(task, self.now)
+        if change is None:
+            self._next_change.pop(task_id, None)
+        elif self._next_change.get(task_id) != change:
+            self._next_change[task_id] = change
+            if self._wakeups is not None: # None while compute() is filling _next_change in bulk
+                heapq.heappush(self._wakeups, (change, task_id))
+        if self.has_unmet_prerequisites(task):
+            return
+        self._raw[task_id] = task.raw_base(self.now)
+        if not task.is_snoozed(self.now) and not task.delegate and not task.is_win:
+            self._eligible.add(task_id)
+
+    def _eligible_max(self):
+        max_raw_base = 0
+        for task_id in self._eligible:
+            if self._raw[task_id] > max_raw_base:
+                max_raw_base = self._raw[task_id]
+        return max_raw_base
+
+    def _base_of(self, task_id):
+        if task_id not in self._raw:
+            return -1
+        return self._finish(self.task_index[task_id], self._raw[task_id], task_id in self._eligible)
+
+    def priority_of(self, task, for_adventure=False):
+        """Priority of `task` from the last compute(). With for_adventure, tasks that are no
+        longer active are scored as if they were (un-normalized), like the old code did."""
+        if task.status == "active" or not for_adventure:
+            if task.id in self.priorities and self.task_index.get(task.id) is task:
+                return self.priorities[task.id]
+            if task.status != "active":
+                return -1
+        if self.has_unmet_prerequisites(task):
+            return -1
+        return self._inherit(task, self._finish(task, task.raw_base(self.now or datetime.now()), False))
+
+    def _finish(self, task, raw_base, eligible):
+        if eligible:
+            priority = (raw_base / self.max_raw_base if self.max_raw_base > 0 else 0) * 100
+        else:
+            priority = raw_base * 100
+        if priority > 100:
+            priority = 100
+        if task.is_win:
+            priority += 101
+        return priority
+
+    def _inherit(self, task, priority):
+        for cont_id in task.contingents:
+            cont = self.task_index.get(cont_id)
+            if cont and cont.status == "active":
+                cont_priority = self.priorities.get(cont_id, -1)
+                if cont_priority > priority:
+                    priority = cont_priority
+        return priority
+
+class PriorityCache:
+    """Versioned wrapper around PriorityEngine that only rescores what changed.
+
+    Anything that edits, adds or removes a task calls mark_dirty()/mark_removed(); get()
+    then hands just those tasks (plus their dependency neighbours) to PriorityEngine.rescore.
+    A full compute() only happens the first time, after invalidate(), or when the task list
+    no longer matches what the cache has seen (something was changed without being marked).
+    Tasks whose score changes just because time passed (PriorityEngine.pop_due) are rescored
+    along with the marked ones; next_wakeup() says when that will next happen.
+
+    hits/misses count get() calls that were answered from cache vs. ones that had to
+    rescore something; rescored counts how many tasks the last miss touched."""
+
+    def __init__(self):
+        self.engine = PriorityEngine()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.full_rebuilds = 0
+        self.rescored = 0
+        self._changed = {}
+        self._dirty_ids = set()
+        self._removed = set()
+        self._stale = True
+
+    @property
+    def graph(self):
+        return self.engine.graph
+
+    @property
+    def priorities(self):
+        return self.engine.priorities
+
+    def invalidate(self):
+        self._stale = True
+        self.version += 1
+
+    def mark_dirty(self, task):
+        """task was created or edited. Its neighbours are marked too, since their eligibility
+        (prerequisite status) or inherited score may hinge on it."""
+        self._changed[task.id] = task
+        self._removed.discard(task.id)
+        self._dirty_ids.update(self.engine.graph.neighbours(task.id))
+        self._dirty_ids.update(task.prerequisites)
+        self._dirty_ids.update(task.contingents)
+        self.version += 1
+
+    def mark_removed(self, task_id):
+        self._changed.pop(task_id, None)
+        self.version += 1
+        if task_id not in self.engine.task_index:
+            return #never scored (history, or added and removed between refreshes)
+        self._dirty_ids.update(self.engine.graph.neighbours(task_id))
+        self._removed.add(task_id)
+
+    def get(self, tasks, now=None):
+        now = now if now is not None else datetime.now()
+        expected = len(self.engine.task_index) + sum(1 for tid in self._changed if tid not in self.engine.task_index) - len(self._removed)
+        if self._stale or len(tasks) != expected:
+            self.misses += 1
+            self.full_rebuilds += 1
+            self.engine.compute(tasks, now=now)
+            self.rescored = len(tasks)
+            self._clear_marks()
+            self._stale = False
+            return self.engine.priorities
+        due = self.engine.pop_due(now)
+        if not self._changed and not self._dirty_ids and not self._removed and not due:
+            self.hits += 1
+            return self.engine.priorities
+
+        self.misses += 1
+        changed = {t.id: t for t in due}
+        changed.update(self._changed)
+        for task_id in self._dirty_ids:
+            if task_id not in changed and task_id not in self._removed and task_id in self.engine.task_index:
+                changed[task_id] = self.engine.task_index[task_id]
+        self.rescored = len(self.engine.rescore(list(changed.values()), removed=self._removed, now=now))
+        self._clear_marks()
+        return self.engine.priorities
+
+    def next_wakeup(self):
+        return self.engine.next_wakeup()
+
+    def stats(self):
+        return {"version": self.version, "hits": self.hits, "misses": self.misses,
+                "full_rebuilds": self.full_rebuilds, "last_rescored": self.rescored}
+
+    def _clear_marks(self):
+        self._changed.clear()
+        self._dirty_ids.clear()
+        self._removed.clear()
+
+class SearchIndex:
+    """Trigram inverted index over the text the search box matches against (the FIELDS
+    below, lowercased, as str() shows them). A query of three or more characters only
+    has to check the tasks holding all of its trigrams - the intersection of their
+    posting lists - and each of those is verified with a plain substring test, so the
+    results are exactly what the old scan of every field of every task gave. Shorter
+    queries have too little to index on and just run the substring test over the
+    cached text. Kept current by TaskStore.mark_task_changed / mark_task_removed.
+
+    Indexing is ~100 set inserts per task, too slow to do for a whole history up front,
+    so new tasks wait in `pending` (searched by plain scan meanwhile) until
+    index_pending() works through them in idle-time slices."""
+    FIELDS = ["short_desc", "long_desc", "safety", "impact", "hype",
+              "area", "entity", "maintenance_plan", "procedure_doc",
+              "requestor", "project", "is_win", "due_date"]
+
+    def __init__(self):
+        self.docs = {}      # task id -> searchable text, fields joined by "\0"
+        self.postings = {}  # trigram -> set of task ids
+        self.pending = {}   # task id -> Task not indexed yet
+
+    @classmethod
+    def document(cls, task):
+        #"\0" can't come from the search box, so a match can never straddle two fields
+        return "\0".join(str(value).lower() for value in (getattr(task, field) for field in cls.FIELDS)
+                          if value is not None)
+
+    @staticmethod
+    def trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, *tasks):
+        """Queues new tasks for indexing; re-indexes edited ones right away."""
+        for task in tasks:
+            if task.id in self.docs:
+                self._index(task)
+            else:
+                self.pending[task.id] = task
+
+    def index_pending(self, limit=None):
+        """Indexes up to `limit` queued tasks (all of them if None); returns how many are left."""
+        while self.pending and limit != 0:
+            self._index(self.pending.popitem()[1])
+            if limit is not None:
+                limit -= 1
+        return len(self.pending)
+
+    def _index(self, task):
+        #a no-op if the task's text hasn't changed
+        doc = self.document(task)
+        old = self.docs.get(task.id)
+        if old == doc:
+            return
+        new_grams = self.trigrams(doc)
+        if old is not None:
+            old_grams = self.trigrams(old)
+            for gram in old_grams - new_grams:
+                ids = self.postings[gram]
+                ids.discard(task.id)
+                if not ids:
+                    del self.postings[gram]
+            new_grams -= old_grams
+        postings = self.postings
+        for gram in new_grams:
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = {task.id}
+            else:
+                ids.add(task.id)
+        self.docs[task.id] = doc
+
+    def remove(self, *task_ids):
+        for task_id in task_ids:
+            self.pending.pop(task_id, None)
+            doc = self.docs.pop(task_id, None)
+            if doc is None:
+                continue
+            for gram in self.trigrams(doc):
+                ids = self.postings[gram]
+                ids.discard(task_id)
+                if not ids:
+                    del self.postings[gram]
+
+    def candidates(self, query):
+        """Indexed ids that might contain query, or None when the query is too short to narrow."""
+        grams = self.trigrams(query)
+        if not grams:
+            return None
+        lists = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        result = set(lists[0])
+        for ids in lists[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+    def filter(self, tasks, query):
+        """The tasks (in their given order) with query in one of their search fields."""
+        return list(self.iter_matches(tasks, query))
+
+    def iter_matches(self, tasks, query):
+        """filter() one task at a time, for callers that print matches as they're found."""
+        candidates = self.candidates(query)
+        docs = self.docs
+        for task in tasks:
+            doc = docs.get(task.id)
+            if doc is None: #not indexed yet: check it directly
+                doc = self.document(task)
+            elif candidates is not None and task.id not in candidates:
+                continue
+            if query in doc:
+                yield task
+
+class TaskHistory:
+    """Cold store for closed (completed/abandoned) tasks that nothing open depends on.
+    They're most of the task list after a while, so TaskStore.tasks only holds the hot
+    set and these are turned into Task objects - or, with SQLite, read at all - the first
+    time a view needs them (Completed/Abandoned, All, an archive purge).
+
+    A closed task stays hot when:
+      - it's still snoozed (the Snoozed filter shows those),
+      - it's a prerequisite of an active task (an abandoned prerequisite blocks it),
+      - it's a "[remind delegate]" task for an active task (reminder timing reads them),
+      - it's on the weekly schedule (the schedule pane shows its name).
+    task_storage.HOT_TASK_WHERE is the same rule in SQL."""
+    def __init__(self, loader):
+        self._loader = loader # returns the history as a list of Tasks
+        self._tasks = None
+        self._by_id = {}
+
+    @property
+    def loaded(self):
+        return self._tasks is not None
+
+    @staticmethod
+    def split(records, pinned_ids=(), now=None):
+        """Splits stored task records into (hot, cold). pinned_ids are always hot."""
+        now = now if now is not None else datetime.now()
+        active_ids = {r["id"] for r in records if (r.get("status") or "active") == "active"}
+        keep = set(pinned_ids)
+        for record in records:
+            if record["id"] in active_ids:
+                keep.update(record.get("prerequisites") or [])
+        hot, cold = [], []
+        for record in records:
+            task_id = record["id"]
+            snooze_until = record.get("snooze_until")
+            if isinstance(snooze_until, str):
+                snooze_until = datetime.fromisoformat(snooze_until)
+            contingents = record.get("contingents") or []
+            if (task_id in active_ids or task_id in keep
+                    or (snooze_until and snooze_until > now)
+                    or ("[remind delegate]" in (record.get("short_desc") or "")
+                        and contingents and contingents[0] in active_ids)):
+                hot.append(record)
+            else:
+                cold.append(record)
+        return hot, cold
+
+    def tasks(self):
+        if self._tasks is None:
+            self._tasks = self._loader()
+            self._by_id = {t.id: t for t in self._tasks}
+        return self._tasks
+
+    def get(self, task_id):
+        """The history task with this id (or None), loading if needed."""
+        self.tasks()
+        return self._by_id.get(task_id)
+
+    def take(self, task_id):
+        """Removes and returns the history task with this id (or None), loading if needed."""
+        task = self.get(task_id)
+        if task is not None:
+            self._tasks.remove(task)
+            del self._by_id[task_id]
+        return task
+
+    def remove(self, task_ids):
+        if self._tasks is not None:
+            self._tasks = [t for t in self._tasks if t.id not in task_ids]
+            for task_id in task_ids:
+                self._by_id.pop(task_id, None)
+
+class ReminderScheduler:
+    """Keeps track of when delegated tasks need a "[remind delegate]" task, so making
+    reminders doesn't mean sweeping the whole list on every refresh.
+
+    Reminder tasks are indexed by the task they remind about (their contingents[0]), and
+    every delegated task with reminders turned on has a heap entry for when its next
+    reminder comes due. That's the latest of: delegate_reminder_days after it went active
+    (the _get_reminder_timing rule), the day after delegate_reminder_days have passed
+    since the last reminder was closed, and the end of its snooze. While it has an open,
+    unsnoozed reminder it has no entry at all; closing or snoozing that reminder is an
+    edit, which reschedules it. Keep it current with update()/remove()."""
+    def __init__(self):
+        self.reminders = {}   # parent id -> {reminder id: reminder Task}
+        self.parent_of = {}   # reminder id -> parent id
+        self.delegated = {}   # parent id -> active delegated Task with reminder days set
+        self.due_at = {}      # parent id -> when its live heap entry comes due
+        self.heap = []        # (due, parent id); entries that don't match due_at are stale
+        self.waiting = set()  # parent ids that came due but are contingent right now
+
+    def rebuild(self, tasks):
+        self.__init__()
+        for task in tasks:
+            self._index(task)
+        for parent_id in self.delegated:
+            self.reschedule(parent_id)
+
+    def update(self, task):
+        self._index(task)
+        self.reschedule(task.id)
+        if task.id in self.parent_of:
+            self.reschedule(self.parent_of[task.id])
+
+    def remove(self, task_id):
+        self.delegated.pop(task_id, None)
+        self._unindex_reminder(task_id)
+        self.reschedule(task_id)
+
+    def _index(self, task):
+        parent_id = task.contingents[0] if "[remind delegate]" in task.short_desc and task.contingents else None
+        if self.parent_of.get(task.id) != parent_id:
+            self._unindex_reminder(task.id)
+            if parent_id is not None:
+                self.reminders.setdefault(parent_id, {})[task.id] = task
+                self.parent_of[task.id] = parent_id
+        if task.delegate and task.delegate_reminder_days and task.status == "active":
+            self.delegated[task.id] = task
+        else:
+            self.delegated.pop(task.id, None)
+
+    def _unindex_reminder(self, task_id):
+        parent_id = self.parent_of.pop(task_id, None)
+        if parent_id is not None:
+            self.reminders[parent_id].pop(task_id, None)
+            if not self.reminders[parent_id]:
+                del self.reminders[parent_id]
+            self.reschedule(parent_id)
+
+    def _open_reminder(self, parent_id, now):
+        return any(r.status == "active" and not r.is_snoozed(now)
+                   for r in self.reminders.get(parent_id, {}).values())
+
+    def _last_closed(self, parent_id):
+        closed = [r.completion_date for r in self.reminders.get(parent_id, {}).values()
+                  if r.status in ["completed", "abandoned"] and r.completion_date]
+        return max(closed, default=None)
+
+    def next_due(self, parent, now=None):
+        """When parent's next reminder is due, or None if it doesn't need one."""
+        now = now if now is not None else datetime.now()
+        if parent is None or self._open_reminder(parent.id, now):
+            return None
+        due = (parent.first_active_date or parent.due_date) + timedelta(days=parent.delegate_reminder_days)
+        last_closed = self._last_closed(parent.id)
+        if last_closed:
+            day = last_closed.date() + timedelta(days=parent.delegate_reminder_days + 1)
+            due = max(due, datetime.combine(day, datetime.min.time()))
+        if parent.snooze_until:
+            due = max(due, parent.snooze_until)
+        return due
+
+    def reschedule(self, parent_id, now=None):
+        self.waiting.discard(parent_id)
+        due = self.next_due(self.delegated.get(parent_id), now)
+        if due is None:
+            self.due_at.pop(parent_id, None)
+        elif self.due_at.get(parent_id) != due:
+            self.due_at[parent_id] = due
+            heapq.heappush(self.heap, (due, parent_id))
+
+    def next_wakeup(self):
+        while self.heap and self.due_at.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def is_due(self, parent, priorities, now=None):
+        """The same test the reminder sweep used to run on every delegated task."""
+        now = now if now is not None else datetime.now()
+        if not parent.needs_reminder(None, priorities=priorities):
+            return False
+        if self._open_reminder(parent.id, now):
+            return False
+        last_closed = self._last_closed(parent.id)
+        return last_closed is None or (now.date() - last_closed.date()).days > parent.delegate_reminder_days
+
+    def due(self, priorities, now=None):
+        """The delegated tasks that need a reminder task made now. Ones that are due but
+        contingent wait here until their priority comes back."""
+        now = now if now is not None else datetime.now()
+        while self.heap and self.heap[0][0] <= now:
+            due, parent_id = heapq.heappop(self.heap)
+            if self.due_at.get(parent_id) == due:
+                del self.due_at[parent_id]
+                self.waiting.add(parent_id)
+        ready = []
+        for parent_id in list(self.waiting):
+            parent = self.delegated.get(parent_id)
+            if parent is None:
+                self.waiting.discard(parent_id)
+            elif priorities.get(parent_id, -1) < 0:
+                continue
+            elif self.is_due(parent, priorities, now):
+                ready.append(parent)
+            else:
+                self.reschedule(parent_id, now)
+        return ready
+
+class SnoozeIndex:
+    """The tasks that are still snoozed, in a heap by when they wake up. That covers
+    plain snoozes and the next instance of a recurring task, which is created snoozed
+    until its revival time. TaskManager aims one timer at next_expiry(), and when it
+    fires only the tasks pop_expired() hands back need looking at again."""
+    def __init__(self):
+        self.until = {}  # id -> snooze_until, for tasks still snoozed
+        self.heap = []   # (snooze_until, id); entries that don't match `until` are stale
+
+    def rebuild(self, tasks, now=None):
+        self.__init__()
+        now = now if now is not None else datetime.now()
+        for task in tasks:
+            self.update(task, now)
+
+    def update(self, task, now=None):
+        now = now if now is not None else datetime.now()
+        if task.is_snoozed(now):
+            if self.until.get(task.id) != task.snooze_until:
+                self.until[task.id] = task.snooze_until
+                heapq.heappush(self.heap, (task.snooze_until, task.id))
+        else:
+            self.until.pop(task.id, None)
+
+    def remove(self, task_id):
+        self.until.pop(task_id, None)
+
+    def next_expiry(self):
+        while self.heap and self.until.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def pop_expired(self, now):
+        """Ids of the tasks whose snooze has run out by `now`."""
+        woken = []
+        while self.heap and self.heap[0][0] <= now:
+            until, task_id = heapq.heappop(self.heap)
+            if self.until.get(task_id) == until:
+                del self.until[task_id]
+                woken.append(task_id)
+        return woken
+
+    def snoozed(self, now):
+        #the ids still snoozed at `now` (same answer as Task.is_snoozed); ones that just
+        #ran out are left for the timer to pop
+        return {task_id for task_id, until in self.until.items() if until > now}
+
+class RecurringRegistry:
+    """The active tasks that put themselves on the weekly schedule: weekly recurrences,
+    bucketed by the weekday names in their settings, and "daily" ones (every_n, unit
+    days, n=1), which land on every day. Populating a day then only looks at that day's
+    bucket and the daily one instead of the whole task list. Each task keeps the
+    sequence number it was first seen with, so a day's tasks come out in task-list order
+    like the old scan gave. Kept current by TaskStore.mark_task_changed /
+    mark_task_removed."""
+    def __init__(self):
+        self.weekly = {}  # weekday name -> {id: Task}
+        self.daily = {}   # id -> Task
+        self.days_of = {} # id -> the weekday names (or "daily") it's filed under
+        self.order = {}   # id -> first-seen sequence number
+        self._next_seq = 0
+
+    @staticmethod
+    def is_daily(task):
+        """'Daily' tasks are represented as every_n recurrence with unit=days, n=1."""
+        return (task.recurrence_type == "every_n"
+                and task.recurrence_settings.get("unit") == "days"
+                and task.recurrence_settings.get("n", 1) == 1)
+
+    def rebuild(self, tasks):
+        self.__init__()
+        for task in tasks:
+            self.update(task)
+
+    def update(self, task):
+        if task.id not in self.order:
+            self.order[task.id] = self._next_seq
+            self._next_seq += 1
+        days = ()
+        if task.status == "active":
+            if task.recurrence_type == "weekly":
+                days = tuple(task.recurrence_settings.get("days", []))
+            elif self.is_daily(task):
+                days = ("daily",)
+        if self.days_of.get(task.id, ()) == days:
+            return
+        self._unfile(task.id)
+        for day in days:
+            if day == "daily":
+                self.daily[task.id] = task
+            else:
+                self.weekly.setdefault(day, {})[task.id] = task
+        if days:
+            self.days_of[task.id] = days
+
+    def remove(self, task_id):
+        self._unfile(task_id)
+        self.order.pop(task_id, None)
+
+    def _unfile(self, task_id):
+        for day in self.days_of.pop(task_id, ()):
+            if day == "daily":
+                self.daily.pop(task_id, None)
+            else:
+                self.weekly[day].pop(task_id, None)
+
+    def for_day(self, weekday_name):
+        """The active tasks that recur on weekday_name (e.g. "Monday"), in list order."""
+        tasks = list(self.weekly.get(weekday_name, {}).values()) + list(self.daily.values())
+        tasks.sort(key=lambda t: self.order[t.id])
+        return tasks
+
+
+class TaskStore:
+    """Tasks, people and the weekly schedule, kept in storage, with the caches and queues
+    that keep scoring, search, reminders and snoozes cheap. Anything that edits a task
+    goes through mark_task_changed / mark_task_removed and then save_data.
+
+    Timed work - rescoring when time moves a score, reminders and snoozes coming due,
+    indexing search text in the background - is requested through the schedule_* hooks,
+    which do nothing here: a script just calls what it needs (refresh_priorities,
+    generate_reminders, wake_snoozed) and the Tk app overrides them with root.after
+    timers. queue_adventures is the same kind of hook for the adventure game."""
+    def __init__(self, storage=None, sync_state=None):
+        self.tasks = []
+        self.people = []
+        self.daily_schedule = {}
+        self.leaderboard = None # as last loaded; written back with the tasks
+        self.priority_cache = PriorityCache()
+        self.priorities = {}
+        self.search_index = SearchIndex()
+        self.reminders = ReminderScheduler()
+        self.snoozes = SnoozeIndex()
+        self.recurring = RecurringRegistry()
+        self.storage = storage if storage is not None else open_storage(storage_backend, database_file)
+        self.persistence = PersistenceScheduler() #saves are coalesced and written off the calling thread
+        self.sync_state = sync_state if sync_state is not None else SyncState(sync_state_file)
+        self._unsaved_tasks = {}       # id -> Task edited since the last save_data
+        self._deleted_task_ids = set()
+        self._unstamped_tasks = {}     # id -> Task edited since stamp_changes last ran
+
+    def load(self):
+        self.load_daily_schedule() #before load_data: scheduled tasks stay out of the history
+        self.load_data()
+
+    def close(self):
+        #write out anything still pending, then stop the writer thread
+        self.persistence.close()
+        self.storage.close()
+
+    def load_data(self):
+        #only the hot tasks become Task objects now; closed history waits in self.history
+        data = self.storage.load(history=False)
+        self.people = [Person(**p) for p in data.get("people", [])]
+        self.leaderboard = data.get("leaderboard")
+        person_map = {p.id: p for p in self.people}
+        scheduled_ids = {item.get("task_id") for items in self.daily_schedule.values() for item in items}
+        hot, cold = TaskHistory.split(data.get("tasks", []), scheduled_ids)
+        self.tasks = [self._task_from_record(task_data, person_map) for task_data in hot]
+        self.search_index.add(*self.tasks)
+        self.reminders.rebuild(self.tasks)
+        self.snoozes.rebuild(self.tasks)
+        self.recurring.rebuild(self.tasks)
+        self.history = TaskHistory(partial(self._load_history, cold, data.get("history_omitted", False)))
+
+    def _load_history(self, records, omitted):
+        if omitted:
+            #the store only gave us the hot tasks; read the rest back once pending writes land
+            self.persistence.flush(wait=True)
+            records = self.storage.load_history(exclude_ids={t.id for t in self.tasks})
+        else:
+            #a record may have been replaced by a synced copy in the hot list, or deleted
+            hot_ids = {t.id for t in self.tasks}
+            records = [r for r in records if r["id"] not in hot_ids and r["id"] not in self.sync_state.deleted]
+        person_map = {p.id: p for p in self.people}
+        history = [self._task_from_record(task_data, person_map) for task_data in records]
+        self.search_index.add(*history)
+        self.schedule_search_indexing()
+        return history
+
+    def _task_from_record(self, task_data, person_map):
+        if isinstance(task_data["due_date"], str):
+            task_data["due_date"] = datetime.fromisoformat(task_data["due_date"])
+        if task_data.get("completion_date") and isinstance(task_data["completion_date"], str):
+            task_data["completion_date"] = datetime.fromisoformat(task_data["completion_date"])
+        if task_data.get("snooze_until") and isinstance(task_data["snooze_until"], str):
+            task_data["snooze_until"] = datetime.fromisoformat(task_data["snooze_until"])
+        if task_data.get("first_active_date") and isinstance(task_data["first_active_date"], str):
+            task_data["first_active_date"] = datetime.fromisoformat(task_data["first_active_date"])
+        task_data.pop("last_revival_time", None)
+        task_data["safety"] = task_data.get("safety", 50)
+        task_data["hype"] = task_data.get("hype", 50)
+        task_data["impact"] = task_data.get("impact", 0)
+        task_data["impact_is_percentage"] = task_data.get("impact_is_percentage", True)
+        task_data["delegate_reminder_days"] = task_data.get("delegate_reminder_days", 1)
+        delegate_id = task_data.get("delegate")
+        if delegate_id:
+            task_data["delegate"] = person_map.get(delegate_id)
+        else:
+            task_data["delegate"] = None
+        return Task(**task_data)
+
+    def all_tasks(self):
+        """Hot tasks plus the closed history (loading it if it hasn't been yet)."""
+        return self.tasks + self.history.tasks()
+
+    def find_task(self, task_id):
+        #a history task that gets opened moves back into the hot list, so edits,
+        #revives and rescoring treat it like any other task
+        task = self.task_index().get(task_id)
+        if task is None and task_id:
+            task = self.history.take(task_id)
+            if task is not None:
+                self.tasks.append(task)
+                self.priority_cache.mark_dirty(task)
+                self.reminders.update(task)
+                self.snoozes.update(task)
+                self.recurring.update(task)
+        return task
+
+    def save_data(self):
+        #only marks the tasks dirty; the persistence scheduler writes once things go quiet
+        self.persistence.mark_dirty("tasks", self._prepare_task_save)
+
+    def _prepare_task_save(self):
+        #the sqlite and journal backends only write the tasks marked changed/removed
+        #since the last save; the json backend still rewrites the whole file
+        self.stamp_changes()
+        changed = list(self._unsaved_tasks.values())
+        removed = self._deleted_task_ids
+        self._unsaved_tasks = {}
+        self._deleted_task_ids = set()
+        tasks = self.all_tasks() if self.storage.rewrites_everything else self.tasks
+        save_tasks = self.storage.prepare_save(tasks, self.people, self.leaderboard_entries(),
+                                               changed=changed, removed=removed)
+        save_sync_state = self.sync_state.prepare_save()
+        if save_sync_state is None:
+            return save_tasks
+        def job():
+            #the sync state first: after a crash between the two, a change is pushed twice
+            #rather than not at all
+            save_sync_state()
+            save_tasks()
+        return job
+
+    def stamp_changes(self):
+        """Gives the tasks marked changed since the last call, and any edited people, new
+        sync stamps, and notes them for the next push (see task_sync.py). Every save runs it."""
+        state = self.sync_state
+        tasks, self._unstamped_tasks = self._unstamped_tasks, {}
+        if not state.tracking:
+            return
+        for task in tasks.values():
+            if state.stamp(task, task_record(task)):
+                state.pending_tasks.add(task.id)
+        for person in self.people:
+            if state.stamp(person, person_record(person)):
+                state.pending_people.add(person.id)
+
+    def merge_remote(self, tasks=(), people=(), deleted=None):
+        """Merges task and person records from another replica into this store, field by
+        field (task_sync.merge_record), and applies its deletions, which win over edits.
+        Returns (Tasks, People) for every record given, changed here or not, and the ids
+        newly deleted."""
+        state = self.sync_state
+        person_map = {p.id: p for p in self.people}
+        merged_people = []
+        for record in people:
+            state.observe(record.get("version"))
+            person = person_map.get(record["id"])
+            merged, taken = merge_record(person_record(person) if person is not None else None, record)
+            merged = {key: value for key, value in merged.items() if key in PERSON_FIELDS}
+            if person is None:
+                person = Person(**merged)
+                self.people.append(person)
+                person_map[person.id] = person
+            else:
+                vars(person).update(merged)
+            merged_people.append(person)
+
+        removed = [task_id for task_id, stamp in (deleted or {}).items() if state.note_deleted(task_id, stamp)]
+        if removed:
+            self.history.tasks() #so the deleted ones can't come back with it later
+            removed_ids = set(removed)
+            self.tasks = [t for t in self.tasks if t.id not in removed_ids]
+            self.history.remove(removed_ids)
+            self.mark_task_removed(*removed)
+
+        task_index = self.task_index()
+        fields = set(TASK_FIELDS) | set(EDGE_KINDS)
+        merged_tasks = []
+        for record in tasks:
+            state.observe(record.get("version"))
+            if record["id"] in state.deleted:
+                continue
+            task = task_index.get(record["id"])
+            if task is None and self.history.loaded:
+                task = self.history.take(record["id"])
+                if task is not None:
+                    self.tasks.append(task)
+            #a task still waiting in unloaded history is simply replaced: _load_history
+            #skips records that are already in the hot list
+            local = task_record(task) if task is not None else None
+            merged, taken = merge_record(local, record)
+            if task is None or taken or merged["version"] != task.version:
+                updated = self._task_from_record({key: value for key, value in merged.items() if key in fields}, person_map)
+                if task is None:
+                    task = updated
+                    self.tasks.append(task)
+                else:
+                    vars(task).update(vars(updated))
+            merged_tasks.append(task)
+        if merged_tasks:
+            self.mark_task_changed(*merged_tasks)
+        self.save_data()
+        return merged_tasks, merged_people, removed
+
+    def leaderboard_entries(self):
+        return self.leaderboard
+
+    #hooks for a client with an event loop; see the class docstring
+    def schedule_priority_wakeup(self):
+        pass
+
+    def schedule_reminder_wakeup(self):
+        pass
+
+    def schedule_snooze_wakeup(self):
+        pass
+
+    def schedule_search_indexing(self):
+        pass
+
+    def queue_adventures(self, completions):
+        pass
+
+    def refresh_priorities(self):
+        #everything in the list view reads from this map; the cache only rescores tasks
+        #that were marked changed since the last refresh
+        self.priorities = self.priority_cache.get(self.tasks)
+        self.schedule_priority_wakeup()
+        return self.priorities
+
+    def task_index(self):
+        #id -> Task for the hot list; the priority engine keeps this map anyway
+        self.refresh_priorities()
+        return self.priority_cache.engine.task_index
+
+    def data_version(self):
+        #changes whenever a filter could list different tasks: an edit, a rescoring (which
+        #is also how snooze expiry shows up), or closed history arriving from storage
+        return (self.priority_cache.version, self.priority_cache.misses,
+                self.history.loaded, len(self.tasks))
+
+    def mark_task_changed(self, *tasks):
+        #call after creating or editing a task so its priority (and its neighbours') is redone
+        for task in tasks:
+            self.priority_cache.mark_dirty(task)
+            self.search_index.add(task)
+            self.reminders.update(task)
+            self.snoozes.update(task)
+            self.recurring.update(task)
+            self._unsaved_tasks[task.id] = task
+            if self.sync_state.tracking:
+                self._unstamped_tasks[task.id] = task
+        self.schedule_search_indexing()
+        self.schedule_snooze_wakeup()
+
+    def mark_task_removed(self, *task_ids):
+        for task_id in task_ids:
+            self.priority_cache.mark_removed(task_id)
+            self.search_index.remove(task_id)
+            self.reminders.remove(task_id)
+            self.snoozes.remove(task_id)
+            self.recurring.remove(task_id)
+            self._unsaved_tasks.pop(task_id, None)
+            self._unstamped_tasks.pop(task_id, None)
+            self._deleted_task_ids.add(task_id)
+            if self.sync_state.tracking:
+                self.sync_state.note_deleted(task_id)
+
+    def is_actionable(self, task, priorities=None):
+        priorities = priorities if priorities is not None else self.priorities
+        return (task.status == "active" and priorities.get(task.id, -1) >= 0
+                and not task.is_snoozed() and not task.delegate)
+
+    def top_actionable(self, k=None):
+        """The k highest-priority actionable tasks (active, prerequisites met, not snoozed,
+        not delegated), best first, straight from the cached scores. k=None returns all
+        of them in priority order."""
+        priorities = self.refresh_priorities()
+        task_index = self.priority_cache.engine.task_index
+        actionable = [task_index[task_id] for task_id, priority in priorities.items()
+                      if priority >= 0 and self.is_actionable(task_index[task_id], priorities)]
+        if k is None or k >= len(actionable):
+            return sorted(actionable, key=lambda t: priorities[t.id], reverse=True)
+        return heapq.nlargest(k, actionable, key=lambda t: priorities[t.id])
+
+    def adventure_priority(self, task):
+        #score for a task that was just completed (it's no longer active, so it isn't in the map)
+        self.refresh_priorities()
+        return self.priority_cache.engine.priority_of(task, for_adventure=True)
+
+    def search(self, query):
+        """The tasks (hot ones first, then history) with query in one of their search fields."""
+        return list(self.iter_search(query))
+
+    def iter_search(self, query):
+        def tasks():
+            #the hot tasks are searched before the history is even loaded
+            yield from self.tasks
+            yield from self.history.tasks()
+        return self.search_index.iter_matches(tasks(), query.lower())
+
+    def generate_reminders(self, priorities=None):
+        """Makes the "[remind delegate]" tasks that have come due and returns how many.
+        Only the delegated tasks the reminder queue says are due get looked at."""
+        priorities = priorities if priorities is not None else self.refresh_priorities()
+        current_time = datetime.now()
+        created = 0
+        for task in self.reminders.due(priorities, current_time):
+            reminder_task = self.make_reminder_task(task, current_time)
+            self.tasks.append(reminder_task)
+            self.mark_task_changed(reminder_task)
+            created += 1
+            print("creating reminder task...",reminder_task.short_desc, file=sys.stderr)
+        self.schedule_reminder_wakeup()
+        return created
+
+    def make_reminder_task(self, task, current_time):
+        due_date = (current_time + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return Task(
+            short_desc=f"[remind delegate] {task.short_desc}",
+            long_desc="Delegated to "+task.delegate.name+": "+task.long_desc,
+            safety=task.safety,
+            impact=task.impact,
+            hype=task.hype,
+            due_date=due_date,
+            area=task.area,
+            entity=task.entity,
+            maintenance_plan=task.maintenance_plan,
+            procedure_doc=task.procedure_doc,
+            requestor=task.requestor,
+            project=task.project,
+            is_win=task.is_win,
+            prerequisites=None,
+            contingents=[task.id],
+            delegate=None,
+            status="active",
+            impact_is_percentage=task.impact_is_percentage,
+            recurrence_type="none",
+            first_active_date=current_time,
+            delegate_reminder_days=0  # Reminder tasks don't need their own reminders
+        )
+
+    def wake_snoozed(self, now=None):
+        """Rescores the tasks whose snooze has run out and makes any reminders that are
+        now due. Returns the woken task ids."""
+        woken = set(self.snoozes.pop_expired(now if now is not None else datetime.now()))
+        if woken:
+            task_index = self.task_index()
+            for task_id in woken:
+                task = task_index.get(task_id)
+                if task is not None:
+                    self.priority_cache.mark_dirty(task)
+                    self.reminders.update(task)
+            self.generate_reminders(self.refresh_priorities())
+        return woken
+
+    def import_records(self, records):
+        """Adds tasks from records shaped like the stored ones (task_storage.task_record,
+        with dates as datetimes or ISO strings). A record whose id is already in the store
+        updates just the fields it gives on that task instead. Fields a new task's record
+        leaves out get the defaults a new task in the details pane starts with; unknown keys
+        are ignored, and the delegate may be given by person id or name (LookupError if
+        there's no such person, before anything is changed). Returns (added, updated)
+        task lists."""
+        person_ids = {p.id: p.id for p in self.people}
+        person_ids.update((p.name, p.id) for p in self.people if p.name not in person_ids)
+        person_map = {p.id: p for p in self.people}
+        fields = (set(TASK_FIELDS) | set(EDGE_KINDS)) - set(SYNC_FIELDS)
+        records = [{key: value for key, value in record.items() if key in fields and value is not None}
+                   for record in records]
+        for record in records:
+            if record.get("delegate") and record["delegate"] not in person_ids:
+                raise LookupError(f"No person named {record['delegate']!r}")
+        task_index = {t.id: t for t in self.tasks}
+        if any("id" in record and record["id"] not in task_index for record in records):
+            #updates to closed tasks bring them back into the hot list, as find_task does
+            revived = {record["id"]: self.history.get(record["id"]) for record in records if "id" in record}
+            revived = {task_id: task for task_id, task in revived.items() if task is not None}
+            if revived:
+                self.history.remove(revived)
+                self.tasks.extend(revived.values())
+                task_index.update(revived)
+        added, updated = [], []
+        for record in records:
+            existing = task_index.get(record.get("id"))
+            if existing is not None:
+                #_task_from_record fills in defaults, so take from it only what was given
+                given = set(record) - {"id"}
+                record = {**task_record(existing), **record}
+                if "delegate" in given and record["delegate"]:
+                    record["delegate"] = person_ids[record["delegate"]]
+                task = self._task_from_record(record, person_map)
+                vars(existing).update((key, value) for key, value in vars(task).items() if key in given)
+                updated.append(existing)
+                continue
+            record.setdefault("short_desc", "")
+            record.setdefault("long_desc", "")
+            record.setdefault("due_date", (datetime.now() + timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0))
+            if record.get("delegate"):
+                record["delegate"] = person_ids[record["delegate"]]
+            task = self._task_from_record(record, person_map)
+            self.tasks.append(task)
+            task_index[task.id] = task
+            added.append(task)
+        if added or updated:
+            self.mark_task_changed(*added, *updated)
+            self.save_data()
+        return added, updated
+
+    def add_tasks(self, *tasks):
+        for task in tasks:
+            self.tasks.append(task)
+        self.mark_task_changed(*tasks)
+        self.save_data()
+
+    def complete(self, task, completion_date=None):
+        """Closes task as completed (now, unless backdated), starts its next recurrence
+        and hands it to queue_adventures."""
+        task.status = "completed"
+        task.completion_date = completion_date if completion_date is not None else datetime.now()
+        self.mark_task_changed(task)
+        if task.recurrence_type != "none":
+            self.create_next_recurrance(task)
+        self.save_data()
+        self.queue_adventures([(self.adventure_priority(task), task.completion_date, task.id,
+                                task.short_desc, task.is_win)])
+
+    def abandon(self, task, completion_date=None, recur=True):
+        #recur=False ends a recurring task for good instead of just skipping this instance
+        task.status = "abandoned"
+        task.completion_date = completion_date if completion_date is not None else datetime.now()
+        self.mark_task_changed(task)
+        if recur and task.recurrence_type != "none":
+            self.create_next_recurrance(task)
+        self.save_data()
+
+    def revive(self, task):
+        task.status = "active"
+        task.completion_date = None
+        task.snooze_until = None
+        self.mark_task_changed(task)
+        self.save_data()
+
+    def snooze(self, task, days):
+        #snoozes run out at midnight; anything but a positive number of days means one day
+        if not isinstance(days, int) or days <= 0:
+            days = 1
+        task.snooze_until = (datetime.now() + timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.mark_task_changed(task)
+        self.save_data()
+
+    def unsnooze(self, task):
+        task.snooze_until = None
+        self.mark_task_changed(task)
+        self.save_data()
+
+    def create_next_recurrance(self, task, reference_time=None):
+        if task.recurrence_type != "none":
+            if reference_time is None:
+                # Default (used by the interactive "Complete" button, which always runs in
+                # real time): use today's date as the reference point.
+                reference_time = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            # Calculate the next revival time starting from the reference point
+            next_revival = task.get_next_revival_time(reference_time=reference_time)
+            #old way...
+            #next_revival = task.get_next_revival_time()
+            #the next instance's id follows from this one's, so two replicas closing the same
+            #task make the same next task rather than one each. Closing it again after a
+            #revive doesn't add a second one while the first is still around; once that one
+            #has been archived, a fresh id keeps the new instance clear of its tombstone
+            #while we still hold it (once the server has it we forget it, and an instance
+            #reusing the id goes the way of any edit to a deleted task).
+            #Only what's already in memory is checked - completing shouldn't load history
+            next_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"next-recurrence:{task.id}"))
+            if next_id in self.sync_state.deleted:
+                next_id = str(uuid.uuid4())
+            exists = next_id in self.task_index() or (
+                self.history.loaded and self.history.get(next_id) is not None)
+            if next_revival and not exists:
+                time_diff = task.due_date - task.first_active_date if task.first_active_date else timedelta(days=0)
+                new_task = Task(
+                    short_desc=task.short_desc,
+                    long_desc=task.long_desc,
+                    safety=task.safety,
+                    impact=task.impact,
+                    hype=task.hype,
+                    due_date=next_revival + time_diff,
+                    area=task.area,
+                    entity=task.entity,
+                    maintenance_plan=task.maintenance_plan,
+                    procedure_doc=task.procedure_doc,
+                    requestor=task.requestor,
+                    project=task.project,
+                    is_win=task.is_win,
+                    prerequisites=task.prerequisites.copy(),
+                    contingents=task.contingents.copy(),
+                    delegate=task.delegate,
+                    status="active",
+                    impact_is_percentage=task.impact_is_percentage,
+                    recurrence_type=task.recurrence_type,
+                    recurrence_settings=task.recurrence_settings.copy(),
+                    first_active_date=next_revival,
+                    snooze_until=next_revival,
+                    delegate_reminder_days=task.delegate_reminder_days,
+                    id=next_id
+                )
+                self.tasks.append(new_task)
+                self.mark_task_changed(new_task)
+
+    def archive_old_tasks(self, n_months):
+        """Moves tasks completed/abandoned more than n_months (of 30 days) ago out of the
+        store and into a JSON file under archive_dir. Returns (how many, file name), or
+        (0, None) if nothing is that old."""
+        n = int(n_months)
+        if n < 0:
+            raise ValueError("Number of months must be non-negative")
+        cutoff_date = datetime.now() - timedelta(days=n * 30)
+        tasks_to_archive = [t for t in self.all_tasks() if t.status in ["completed", "abandoned"] and t.completion_date and t.completion_date < cutoff_date]
+        if not tasks_to_archive:
+            return 0, None
+
+        # Determine archive filename
+        latest_date = max(t.completion_date for t in tasks_to_archive)
+        archive_filename = f"{archive_dir}/{latest_date.strftime('%Y-%m-%d')}_and_prior.json"
+        os.makedirs(archive_dir, exist_ok=True)
+
+        # Save to archive JSON
+        tasks_data = [task_record(t) for t in tasks_to_archive]
+        with open(archive_filename, "w") as f:
+            json.dump({"tasks": tasks_data}, f, default=str)
+
+        # Remove archived tasks from main list
+        archived_ids = {t.id for t in tasks_to_archive}
+        self.tasks = [t for t in self.tasks if t.id not in archived_ids]
+        self.history.remove(archived_ids)
+        self.mark_task_removed(*archived_ids)
+        self.save_data()
+        return len(tasks_to_archive), archive_filename
+
+#######Weekly Schedule
+    # Data model: self.daily_schedule is a dict keyed by "YYYY-MM-DD". Each value is a
+    # list of item dicts:
+    #   {"id": <uuid>, "kind": "task", "task_id": <task id>, "checked": bool, "registered": bool}
+    #   {"id": <uuid>, "kind": "quickadd", "desc": <text>, "checked": bool, "registered": bool}
+    # It is persisted through self.storage (daily_schedule.json or the schedule_items table) so items (and their checked state)
+    # survive a restart during the same day. At startup (and at each midnight while the app
+    # is open), process_daily_schedule_registrations looks for any dates prior to today and,
+    # for each item not yet "registered", registers whatever was checked against the main
+    # task list (self.tasks / task_data.json) and marks it registered so it's never
+    # processed twice - even if that task was *also* completed/abandoned directly from the
+    # Task Details pane the same day (in which case we just skip it, since it's already been
+    # handled and recurrence already continued).
+    # Past days are kept around (not deleted) so they can still be displayed, read-only and
+    # grayed out, rather than vanishing; entries older than the currently-displayed week are
+    # pruned so the file doesn't grow forever.
+
+    def load_daily_schedule(self):
+        self.daily_schedule = self.storage.load_daily_schedule()
+
+    def save_daily_schedule(self):
+        self.persistence.mark_dirty("schedule", lambda: self.storage.prepare_save_daily_schedule(self.daily_schedule))
+
+    def get_week_dates(self):
+        """Monday-Friday of the current work week, as date objects."""
+        today = datetime.now().date()
+        monday = today - timedelta(days=today.weekday())
+        return [monday + timedelta(days=i) for i in range(5)]
+
+    def get_schedule_display_dates(self):
+        """Mon-Fri of the current work week, plus next Monday for early planning."""
+        week_dates = self.get_week_dates()
+        return week_dates + [week_dates[0] + timedelta(days=7)]
+
+    def _is_daily_task(self, task):
+        return RecurringRegistry.is_daily(task)
+
+    def process_daily_schedule_registrations(self):
+        """Find daily-schedule items from days prior to today that haven't been registered
+        yet. Anything left checked gets registered as completed (at 11:59p that day) in the
+        main task list; for quick-add items this means creating a new low-priority completed
+        task. If a linked task was already resolved some other way (completed/abandoned from
+        the Task Details pane, or deleted) we skip it entirely so it isn't closed/recurred a
+        second time. Every item processed this way (checked or not) is marked "registered" so
+        a later startup won't touch it again; days older than the currently-displayed week are
+        then pruned to keep the file small."""
+        today = datetime.now().date()
+        changed_tasks = False
+        changed_schedule = False
+        task_index = None
+        adventures = []
+
+        for date_str, items in self.daily_schedule.items():
+            try:
+                item_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            except ValueError:
+                continue
+            if item_date >= today:
+                continue  # this day hasn't ended yet; leave it pending
+
+            registration_time = datetime(item_date.year, item_date.month, item_date.day, 23, 59, 0)
+            item_day_midnight = datetime(item_date.year, item_date.month, item_date.day)
+
+            for item in items:
+                if item.get("registered", False):
+                    continue  # already handled on a previous startup (or rollover)
+
+                if not item.get("checked", False):
+                    item["registered"] = True
+                    changed_schedule = True
+                    continue
+
+                if item.get("kind") == "task":
+                    if task_index is None:
+                        task_index = self.task_index()
+                    task = task_index.get(item.get("task_id"))
+                    if task is not None and task.status == "active":
+                        task.status = "completed"
+                        task.completion_date = registration_time
+                        self.mark_task_changed(task)
+                        changed_tasks = True
+                        if task.recurrence_type != "none":
+                            self.create_next_recurrance(task, reference_time=item_day_midnight)
+                        try:
+                            adventures.append((self.adventure_priority(task),
+                                task.completion_date, task.id, task.short_desc, task.is_win))
+                        except Exception as e:
+                            print("a_manager error:", e, file=sys.stderr)
+                    # else: task was already completed/abandoned elsewhere (or deleted) -
+                    # nothing more to do here, which avoids closing/recurring it twice.
+                elif item.get("kind") == "quickadd":
+                    registered_task = Task(
+                        short_desc=item.get("desc", "Quick-added task"),
+                        long_desc="Added via daily quick-add list.",
+                        safety=0, impact=0, hype=0,
+                        due_date=registration_time,
+                        impact_is_percentage=True,
+                        status="completed",
+                        completion_date=registration_time,
+                        recurrence_type="none",
+                        first_active_date=registration_time,
+                    )
+                    self.tasks.append(registered_task)
+                    self.mark_task_changed(registered_task)
+                    changed_tasks = True
+                    try:
+                        adventures.append((self.adventure_priority(registered_task),
+                            registered_task.completion_date, registered_task.id,
+                            registered_task.short_desc, registered_task.is_win))
+                    except Exception as e:
+                        print("a_manager error:", e, file=sys.stderr)
+
+                item["registered"] = True
+                changed_schedule = True
+
+        # Prune anything older than the currently-displayed week - it's already registered
+        # (the loop above guarantees that) and will never be shown again.
+        this_monday = today - timedelta(days=today.weekday())
+        for date_str in list(self.daily_schedule.keys()):
+            try:
+                d = datetime.strptime(date_str, "%Y-%m-%d").date()
+            except ValueError:
+                del self.daily_schedule[date_str]
+                changed_schedule = True
+                continue
+            if d < this_monday:
+                del self.daily_schedule[date_str]
+                changed_schedule = True
+
+        self.queue_adventures(adventures)
+
+        if changed_tasks:
+            self.save_data()
+        if changed_schedule:
+            self.save_daily_schedule()
+        return changed_tasks
+
+    def _refresh_date_entries(self, day_date, task_index):
+        """For today or a future day: prune stale/resolved task-linked items and
+        auto-populate weekly- and daily-recurring tasks. For a past day, the entries
+        are a frozen historical record, so they're returned as-is with no changes.
+        task_index maps task id -> Task."""
+        date_str = day_date.strftime("%Y-%m-%d")
+        today = datetime.now().date()
+        items = self.daily_schedule.get(date_str, [])
+        if day_date < today:
+            return items
+
+        weekday_name = day_date.strftime("%A")
+        changed = False
+
+        kept_items = []
+        existing_task_ids = set()
+        for item in items:
+            if item.get("kind") == "task":
+                task = task_index.get(item.get("task_id"))
+                if task is None and not item.get("checked", False):
+                    changed = True
+                    continue
+                if task is not None and (task.status != "active" or task.is_snoozed()) and not item.get("checked", False):
+                    changed = True
+                    continue
+                if task is not None:
+                    existing_task_ids.add(task.id)
+            kept_items.append(item)
+        items = kept_items
+
+        for t in self.recurring.for_day(weekday_name):
+            if t.is_snoozed() or t.id in existing_task_ids:
+                continue
+            items.append({
+                "id": str(uuid.uuid4()),
+                "kind": "task",
+                "task_id": t.id,
+                "checked": False
+            })
+            existing_task_ids.add(t.id)
+            changed = True
+
+        if items:
+            self.daily_schedule[date_str] = items
+        elif date_str in self.daily_schedule:
+            del self.daily_schedule[date_str]
+            changed = True
+
+        if changed:
+            self.save_daily_schedule()
+
+        return items
+
+    def schedule_days(self):
+        """(date, items) for each day the weekly schedule shows, with today's and later
+        days brought up to date first (pruned and auto-populated)."""
+        task_index = self.task_index()
+        return [(day_date, self._refresh_date_entries(day_date, task_index))
+                for day_date in self.get_schedule_display_dates()]
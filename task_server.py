@@ -0,0 +1,633 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import signal
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, parse_qs
+
+import task_core
+from task_core import Person, TaskStore
+from task_storage import open_storage, task_record, person_record
+from task_sync import SyncLog, SyncState
+
+#Local HTTP/JSON API over the task store, so several people can work on one task list:
+#
+#  GET  /tasks[?status=active&q=pump&history=1&limit=50]   tasks (with their priority)
+#  GET  /tasks/<id>
+#  POST /tasks                           one task record or a list of them (see
+#                                        TaskStore.import_records); a known id updates
+#  PATCH /tasks/<id>                     fields to change
+#  POST /tasks/<id>/complete|abandon|revive|snooze|unsnooze
+#                                        body: {"completion_date": ...}, {"recur": false},
+#                                        {"days": 3} as they apply
+#  GET  /actionable?k=10                 the k highest-priority actionable tasks
+#  GET  /priorities                      {task id: priority}
+#  GET  /people, POST /people
+#  GET  /schedule                        the weekly schedule's days and items
+#  POST /schedule/<YYYY-MM-DD>           {"task_id": ...} or {"desc": ...} adds an item
+#  POST /schedule/<YYYY-MM-DD>/<item id> {"checked": true}
+#  GET  /sync?since=N                    records and deletions accepted after version N
+#  POST /sync                            {"tasks": [...], "people": [...], "deleted": {...}}
+#                                        a replica's changes, merged field by field
+#                                        (task_sync.py; task_cli.py sync is the client)
+#
+#Connections are kept alive between requests. GETs carry an ETag and answer a matching
+#If-None-Match with 304. Reads are served straight from the store; every change goes
+#through one writer task, which applies whatever is queued as a batch, so readers never
+#see half an update and the store is only ever touched by one writer. The store's
+#saves are coalesced on the event loop the same way the Tk app coalesces them.
+#
+#  python task_server.py [--host 127.0.0.1] [--port 8765]
+#  python task_server.py --bench           throughput against a local client
+
+server_port = 8765
+keepalive_timeout = 30 #seconds an idle connection is kept open
+response_cache_size = 64 #encoded GET responses kept per (path, query) for repeat requests
+max_body_bytes = 10 * 1024 * 1024
+
+REASONS = {200: "OK", 201: "Created", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 411: "Length Required", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or REASONS.get(status, ""))
+        self.status = status
+
+
+class _LoopTimers:
+    """root.after / after_cancel on an asyncio loop, for PersistenceScheduler."""
+    def __init__(self, loop):
+        self.loop = loop
+
+    def after(self, delay_ms, callback):
+        return self.loop.call_later(delay_ms / 1000, callback)
+
+    def after_cancel(self, handle):
+        handle.cancel()
+
+
+def parse_datetime(value):
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"{value!r} is not an ISO date")
+
+
+class TaskServer:
+    def __init__(self, store):
+        self.store = store
+        self.version = 0 # bumped by the writer after each batch of changes
+        self._ops = asyncio.Queue()
+        self._responses = OrderedDict() # (path, query) -> (etag, body)
+        self._server = None
+        self._tasks = []
+        self._connections = {} # handler task -> its writer, so stop() can close them
+        self._today = datetime.now().date()
+        self.sync_log = SyncLog()
+        self.requests = 0
+        self.routes = [
+            ("GET", r"/tasks", self.get_tasks),
+            ("POST", r"/tasks", self.post_tasks),
+            ("GET", r"/tasks/([^/]+)", self.get_task),
+            ("PATCH", r"/tasks/([^/]+)", self.patch_task),
+            ("POST", r"/tasks/([^/]+)/(complete|abandon|revive|snooze|unsnooze)", self.task_action),
+            ("GET", r"/actionable", self.get_actionable),
+            ("GET", r"/priorities", self.get_priorities),
+            ("GET", r"/people", self.get_people),
+            ("POST", r"/people", self.post_people),
+            ("GET", r"/schedule", self.get_schedule),
+            ("POST", r"/schedule/(\d{4}-\d{2}-\d{2})", self.post_schedule_item),
+            ("POST", r"/schedule/(\d{4}-\d{2}-\d{2})/([^/]+)", self.check_schedule_item),
+            ("GET", r"/sync", self.get_sync),
+            ("POST", r"/sync", self.post_sync),
+        ]
+        self.routes = [(method, re.compile(pattern + "$"), handler) for method, pattern, handler in self.routes]
+
+    async def start(self, host="127.0.0.1", port=server_port):
+        loop = asyncio.get_running_loop()
+        #handlers read the history straight from the store, so it's loaded now, once and
+        #off the loop: a first load waits for pending saves and reads all of it back
+        await loop.run_in_executor(None, self.store.history.tasks)
+        self.store.persistence.root = _LoopTimers(loop)
+        self.store.sync_state.serving = True
+        #the same catch-up the Tk app does at startup: yesterday's schedule, reminders due
+        await self.submit(self._catch_up)
+        await self.submit(self._index_for_sync)
+        self._tasks = [asyncio.create_task(self._run_writer()), asyncio.create_task(self._housekeeping())]
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        #closing our end hands each handler an EOF, so it finishes its loop normally
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        for task in self._tasks:
+            task.cancel()
+        #the store is the caller's to close; hand it back with its saves queued and no
+        #timers left on this loop
+        self.store.persistence.flush()
+        self.store.persistence.root = None
+
+#######Writer
+    def submit(self, op):
+        """Queues op (a callable taking no arguments) for the writer; the future gets its result."""
+        future = asyncio.get_running_loop().create_future()
+        if self._tasks:
+            self._ops.put_nowait((op, future))
+        else: #not started yet, so nothing else can be writing
+            self._apply([(op, future)])
+        return future
+
+    async def _run_writer(self):
+        while True:
+            batch = [await self._ops.get()]
+            while not self._ops.empty():
+                batch.append(self._ops.get_nowait())
+            self._apply(batch)
+
+    def _apply(self, batch):
+        for op, future in batch:
+            if future.done():
+                continue
+            try:
+                future.set_result(op())
+            except Exception as e:
+                future.set_exception(e)
+        self.store.schedule_days() #auto-populate the schedule for whatever changed
+        self._log_changes()
+        self.version += 1
+
+    def _catch_up(self):
+        self.store.process_daily_schedule_registrations()
+        self.store.generate_reminders()
+
+    def _index_for_sync(self):
+        #once per start: stamp anything that predates sync, then index every record by
+        #version so pulls only ever walk the newest entries
+        store = self.store
+        tasks = store.all_tasks()
+        store.mark_task_changed(*(t for t in tasks if not t.version))
+        store.stamp_changes()
+        store.save_data()
+        state = store.sync_state
+        state.pending_tasks.clear()
+        state.pending_people.clear()
+        state.pending_deleted.clear()
+        entries = [(t.version, "task", t.id) for t in tasks]
+        entries += [(p.version, "person", p.id) for p in store.people]
+        entries += [(stamp[0], "deleted", task_id) for task_id, stamp in state.deleted.items()]
+        for version, kind, record_id in sorted(entries):
+            self.sync_log.note(kind, record_id, version)
+
+    def _log_changes(self):
+        #changes made here (through the API, or timed work) go in the sync log like
+        #pushed ones; the server doesn't push, so its pending lists are just drained
+        store = self.store
+        state = store.sync_state
+        store.stamp_changes()
+        if not (state.pending_tasks or state.pending_people or state.pending_deleted):
+            return
+        people = {p.id: p for p in store.people}
+        entries = [(t.version, "task", t.id) for t in map(self.lookup, state.pending_tasks) if t is not None]
+        entries += [(people[i].version, "person", i) for i in state.pending_people if i in people]
+        entries += [(state.deleted[i][0], "deleted", i) for i in state.pending_deleted]
+        for version, kind, record_id in sorted(entries):
+            self.sync_log.note(kind, record_id, version)
+        state.pending_tasks.clear()
+        state.pending_people.clear()
+        state.pending_deleted.clear()
+
+    async def _housekeeping(self):
+        #the store's timed work, done by the writer like any other change: snoozes running
+        #out, reminders coming due and the schedule rolling over at midnight
+        while True:
+            store = self.store
+            tomorrow = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+            wakeups = [w for w in (store.snoozes.next_expiry(), store.reminders.next_wakeup()) if w is not None]
+            delay = (min(wakeups + [tomorrow]) - datetime.now()).total_seconds() + 0.05
+            await asyncio.sleep(min(max(0, delay), 3600))
+            await self.submit(self._tick)
+
+    def _tick(self):
+        self.store.wake_snoozed()
+        self.store.generate_reminders()
+        if datetime.now().date() != self._today:
+            self._today = datetime.now().date()
+            self.store.process_daily_schedule_registrations()
+
+#######HTTP
+    async def _serve_connection(self, reader, writer):
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), keepalive_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                keep_alive = await self._serve_request(request_line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._connections[asyncio.current_task()]
+            writer.close()
+
+    async def _serve_request(self, request_line, reader, writer):
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            self._write(writer, 400, {"error": "Bad request line"}, keep_alive=False)
+            return False
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+
+        body = None
+        if "transfer-encoding" in headers:
+            self._write(writer, 411, {"error": "Send a Content-Length"}, keep_alive=False)
+            return False
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._write(writer, 400, {"error": "Bad Content-Length"}, keep_alive=False)
+            return False
+        if length > max_body_bytes:
+            self._write(writer, 413, {"error": "Body too large"}, keep_alive=False)
+            return False
+        if length:
+            body = await reader.readexactly(length)
+
+        self.requests += 1
+        url = urlsplit(target)
+        try:
+            handler, args = self._route(method, url.path)
+            if method == "GET":
+                self._write_get(writer, url, headers, handler, args, keep_alive)
+                return keep_alive
+            data = json.loads(body) if body else {}
+            status, result = await handler(data, *args)
+        except HttpError as e:
+            status, result = e.status, {"error": str(e)}
+        except (LookupError, ValueError, TypeError) as e:
+            status, result = (404 if isinstance(e, LookupError) else 400), {"error": str(e)}
+        except Exception as e:
+            print("task_server error:", repr(e), file=sys.stderr)
+            status, result = 500, {"error": str(e)}
+        self._write(writer, status, result, keep_alive=keep_alive)
+        return keep_alive
+
+    def _route(self, method, path):
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match:
+                if route_method == method:
+                    return handler, match.groups()
+                allowed = True
+        raise HttpError(405 if allowed else 404)
+
+    def etag(self):
+        #refreshing first, so scores that moved because time passed change the tag too
+        self.store.refresh_priorities()
+        return f'"{self.version}-{self.store.priority_cache.misses}"'
+
+    def _write_get(self, writer, url, headers, handler, args, keep_alive):
+        etag = self.etag()
+        if headers.get("if-none-match") == etag:
+            self._write_raw(writer, 304, b"", etag, keep_alive)
+            return
+        key = (url.path, url.query)
+        cached = self._responses.get(key)
+        if cached is not None and cached[0] == etag:
+            self._responses.move_to_end(key)
+            body = cached[1]
+        else:
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            body = json.dumps(handler(query, *args), default=str).encode()
+            self._responses[key] = (etag, body)
+            self._responses.move_to_end(key)
+            while len(self._responses) > response_cache_size:
+                self._responses.popitem(last=False)
+        self._write_raw(writer, 200, body, etag, keep_alive)
+
+    def _write(self, writer, status, result, keep_alive):
+        self._write_raw(writer, status, json.dumps(result, default=str).encode(), None, keep_alive)
+
+    def _write_raw(self, writer, status, body, etag, keep_alive):
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(body)}",
+                "Connection: keep-alive" if keep_alive else "Connection: close"]
+        if etag:
+            head.append(f"ETag: {etag}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+#######Resources
+    def task_json(self, task):
+        record = task_record(task)
+        del record["field_versions"] #only sync needs the stamps
+        record["priority"] = self.store.priorities.get(task.id)
+        return record
+
+    def find(self, task_id):
+        task = self.store.find_task(task_id)
+        if task is None:
+            raise HttpError(404, f"No task with id {task_id!r}")
+        return task
+
+    def get_tasks(self, query):
+        store = self.store
+        if "q" in query:
+            tasks = store.iter_search(query["q"])
+        else:
+            tasks = store.all_tasks() if query.get("history") == "1" else store.tasks
+        status = query.get("status")
+        limit = int(query["limit"]) if "limit" in query else None
+        result = []
+        for task in tasks:
+            if status and task.status != status:
+                continue
+            result.append(self.task_json(task))
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def lookup(self, task_id):
+        #find_task may move a history task into the hot list, which is the writer's job
+        task = self.store.task_index().get(task_id)
+        if task is None:
+            task = self.store.history.get(task_id)
+        return task
+
+    def get_task(self, query, task_id):
+        task = self.lookup(task_id)
+        if task is None:
+            raise HttpError(404, f"No task with id {task_id!r}")
+        return self.task_json(task)
+
+    def get_actionable(self, query):
+        return [self.task_json(task) for task in self.store.top_actionable(int(query.get("k", 10)))]
+
+    def get_priorities(self, query):
+        return self.store.priorities
+
+    def get_people(self, query):
+        return [{key: value for key, value in vars(p).items() if key != "field_versions"} for p in self.store.people]
+
+    def get_schedule(self, query):
+        #read-only: the writer keeps the days populated after every batch of changes
+        task_index = self.store.task_index()
+        days = []
+        for day_date in self.store.get_schedule_display_dates():
+            date_str = day_date.strftime("%Y-%m-%d")
+            items = []
+            for item in self.store.daily_schedule.get(date_str, []):
+                item = dict(item)
+                if item.get("kind") == "task":
+                    task = task_index.get(item.get("task_id"))
+                    item["desc"] = task.short_desc if task is not None else "(task no longer exists)"
+                items.append(item)
+            days.append({"date": date_str, "items": items})
+        return days
+
+    async def post_tasks(self, data):
+        records = data if isinstance(data, list) else [data]
+        added, updated = await self.submit(lambda: self.store.import_records(records))
+        return (201 if added else 200), [self.task_json(t) for t in added + updated]
+
+    async def patch_task(self, data, task_id):
+        def patch():
+            task = self.find(task_id)
+            record = task_record(task)
+            record.update(data)
+            record["id"] = task.id
+            return self.store.import_records([record])[1][0]
+        return 200, self.task_json(await self.submit(patch))
+
+    async def task_action(self, data, task_id, action):
+        store = self.store
+        def act():
+            task = self.find(task_id)
+            if action == "complete":
+                store.complete(task, parse_datetime(data.get("completion_date")))
+            elif action == "abandon":
+                store.abandon(task, parse_datetime(data.get("completion_date")), recur=data.get("recur", True))
+            elif action == "revive":
+                store.revive(task)
+            elif action == "snooze":
+                store.snooze(task, data.get("days", 1))
+            else:
+                store.unsnooze(task)
+            return task
+        return 200, self.task_json(await self.submit(act))
+
+    async def post_people(self, data):
+        def add():
+            person = Person(**data)
+            self.store.people.append(person)
+            self.store.save_data()
+            return person
+        person = await self.submit(add)
+        return 201, {key: value for key, value in vars(person).items() if key != "field_versions"}
+
+    async def post_schedule_item(self, data, date_str):
+        def add():
+            if data.get("task_id"):
+                self.find(data["task_id"])
+                item = {"kind": "task", "task_id": data["task_id"]}
+            elif data.get("desc"):
+                item = {"kind": "quickadd", "desc": str(data["desc"])}
+            else:
+                raise HttpError(400, 'Give a "task_id" or a "desc"')
+            item.update({"id": str(task_core.uuid.uuid4()), "checked": False})
+            self.store.daily_schedule.setdefault(date_str, []).append(item)
+            self.store.save_daily_schedule()
+            return item
+        return 201, await self.submit(add)
+
+    async def check_schedule_item(self, data, date_str, item_id):
+        def check():
+            item = next((i for i in self.store.daily_schedule.get(date_str, []) if i["id"] == item_id), None)
+            if item is None:
+                raise HttpError(404, f"No item {item_id!r} on {date_str}")
+            item["checked"] = bool(data.get("checked", True))
+            self.store.save_daily_schedule()
+            return item
+        return 200, await self.submit(check)
+
+    def get_sync(self, query):
+        store = self.store
+        state = store.sync_state
+        people = {p.id: p for p in store.people}
+        result = {"seq": state.clock, "tasks": [], "people": [], "deleted": {}}
+        for kind, record_id in self.sync_log.since(int(query.get("since", 0))):
+            if kind == "task":
+                task = self.lookup(record_id)
+                if task is not None:
+                    result["tasks"].append(task_record(task))
+            elif kind == "person":
+                if record_id in people:
+                    result["people"].append(person_record(people[record_id]))
+            else:
+                result["deleted"][record_id] = state.deleted[record_id]
+        return result
+
+    async def post_sync(self, data):
+        def merge():
+            store = self.store
+            state = store.sync_state
+            #records of tasks deleted here are dropped; the replica may have forgotten the
+            #tombstone, so it's told again
+            dropped = {r["id"]: state.deleted[r["id"]] for r in data.get("tasks", []) if r["id"] in state.deleted}
+            tasks, people, removed = store.merge_remote(data.get("tasks", []), data.get("people", []),
+                                                        data.get("deleted", {}))
+            #everything pushed gets a version of ours, so the pull that follows (this
+            #replica's and everyone else's) picks up how it merged
+            for task in tasks:
+                task.version = state.tick()
+                self.sync_log.note("task", task.id, task.version)
+            for person in people:
+                person.version = state.tick()
+                self.sync_log.note("person", person.id, person.version)
+            for task_id in removed:
+                state.deleted[task_id] = [state.tick(), state.replica]
+                self.sync_log.note("deleted", task_id, state.deleted[task_id][0])
+            return {"seq": state.clock, "tasks": len(tasks), "people": len(people), "deleted": len(removed),
+                    "dropped": dropped}, store.persistence.flush_event()
+        result, written = await self.submit(merge)
+        #the replica forgets what it pushed once we answer, so it has to be on disk first;
+        #waited for off the loop, so other requests carry on meanwhile
+        await asyncio.get_running_loop().run_in_executor(None, written.wait)
+        return 200, result
+
+
+#######Benchmark
+async def _request(reader, writer, method, path, body=None, headers=()):
+    data = json.dumps(body).encode() if body is not None else b""
+    head = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(data)}", *headers]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+    status = int((await reader.readline()).split()[1])
+    length, etag = 0, None
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+        elif name.lower() == "etag":
+            etag = value.strip()
+    payload = await reader.readexactly(length) if length else b""
+    return status, etag, payload
+
+
+async def benchmark(task_count=2000, clients=8, requests_per_client=500):
+    """Starts a server on a scratch store of task_count generated tasks and times clients
+    that each keep one connection open: plain GETs, conditional GETs, and a mix with
+    writes. Prints requests per second for each."""
+    with tempfile.TemporaryDirectory() as scratch:
+        store = TaskStore(open_storage("sqlite", os.path.join(scratch, "bench.db"),
+                                       os.path.join(scratch, "task_data.json"),
+                                       os.path.join(scratch, "daily_schedule.json")),
+                          SyncState(os.path.join(scratch, "sync_state.json")))
+        store.load()
+        now = datetime.now()
+        store.import_records([{"short_desc": f"Generated task {i}", "safety": i % 100, "hype": (i * 7) % 100,
+                               "impact": (i * 13) % 100, "due_date": now + timedelta(days=i % 90 - 30)}
+                              for i in range(task_count)])
+        server = TaskServer(store)
+        port = await server.start("127.0.0.1", 0)
+        ids = [t.id for t in store.tasks]
+
+        async def client(n, path, conditional, write_every):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            etag = None
+            for i in range(requests_per_client):
+                if write_every and i % write_every == 0:
+                    await _request(reader, writer, "POST", f"/tasks/{ids[(n * requests_per_client + i) % len(ids)]}/snooze", {"days": 1})
+                    continue
+                headers = [f"If-None-Match: {etag}"] if conditional and etag else []
+                status, tag, _ = await _request(reader, writer, "GET", path, headers=headers)
+                etag = tag or etag
+            writer.close()
+
+        for label, path, conditional, write_every in (
+                ("GET /actionable?k=20", "/actionable?k=20", False, 0),
+                ("GET /actionable?k=20, If-None-Match", "/actionable?k=20", True, 0),
+                ("GET /tasks?limit=100", "/tasks?limit=100", False, 0),
+                ("GET /actionable?k=20 with 10% snoozes", "/actionable?k=20", True, 10)):
+            started = time.perf_counter()
+            await asyncio.gather(*(client(n, path, conditional, write_every) for n in range(clients)))
+            elapsed = time.perf_counter() - started
+            total = clients * requests_per_client
+            print(f"{label:45s} {total / elapsed:8.0f} req/s  ({total} requests, {clients} connections)")
+        await server.stop()
+        store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="task_server", description="Local HTTP/JSON API over the task list.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=server_port)
+    parser.add_argument("--backend", default=task_core.storage_backend, choices=["sqlite", "journal", "json"])
+    parser.add_argument("--db", default=task_core.database_file, help="SQLite database file")
+    parser.add_argument("--bench", action="store_true", help="run the throughput benchmark and exit")
+    args = parser.parse_args(argv)
+    if args.bench:
+        asyncio.run(benchmark())
+        return 0
+
+    async def serve():
+        store = TaskStore(open_storage(args.backend, args.db),
+                          SyncState(os.path.join(os.path.dirname(args.db), task_core.sync_state_file)))
+        store.load()
+        server = TaskServer(store)
+        port = await server.start(args.host, args.port)
+        print(f"Serving the task list on http://{args.host}:{port}/", file=sys.stderr)
+        stopping = asyncio.Event()
+        try:
+            #a plain kill stops the server the way Ctrl+C does, with pending saves written
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+        except (NotImplementedError, AttributeError): #no signal handlers on Windows
+            pass
+        try:
+            await stopping.wait()
+        finally:
+            await server.stop()
+            store.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
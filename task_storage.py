@@ -0,0 +1,648 @@
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+#Storage backends for the task list, people, leaderboard and the weekly schedule.
+#Every backend trades in plain dicts shaped like the old task_data.json records
+#(datetimes as strings, delegate as a person id), so TaskStore builds its Task
+#and Person objects the same way no matter where the data came from.
+#
+#  storage.load(history=True)          -> {"tasks": [...], "people": [...], "leaderboard": [...]}
+#       with history=False a backend may leave out closed tasks nothing open depends on
+#       (see HOT_TASK_WHERE) and set "history_omitted"; storage.load_history(exclude_ids)
+#       fetches them later. The file backends have to read everything anyway, so they
+#       ignore the flag.
+#  storage.save(tasks, people, leaderboard, changed=None, removed=())
+#       tasks is the full task list; changed is the tasks edited since the last save
+#       (None = all of them) and removed the ids deleted since then. The JSON backend
+#       ignores both and rewrites the file; the journal appends just those records
+#       and SQLite only touches those rows.
+#  storage.load_daily_schedule() / storage.save_daily_schedule(schedule)
+#  storage.close()
+#
+#Each save also has a prepare_ form (prepare_save, prepare_save_daily_schedule) that takes
+#its snapshot of the data right away and returns a job doing the actual disk work, so the
+#Tk thread can hand the slow part to PersistenceScheduler's writer thread.
+
+JOURNAL_COMPACT_BYTES = 1000000 #fold the journal back into the snapshot once it's this big
+PERSIST_DELAY_MS = 500 #edits within this long of each other are written together
+
+TASK_FIELDS = ["id", "short_desc", "long_desc", "safety", "impact", "hype", "due_date",
+               "area", "entity", "maintenance_plan", "procedure_doc", "requestor", "project",
+               "is_win", "delegate", "status", "completion_date", "snooze_until",
+               "impact_is_percentage", "recurrence_type", "recurrence_settings",
+               "first_active_date", "delegate_reminder_days", "version", "field_versions"]
+TASK_BOOL_FIELDS = ("is_win", "impact_is_percentage")
+EDGE_KINDS = ("prerequisites", "contingents")
+#closed tasks that still matter to the open ones - kept in sync with TaskHistory.split
+HOT_TASK_WHERE = """
+    status = 'active' OR snooze_until > :now
+    OR id IN (SELECT e.other_id FROM task_edges e JOIN tasks a ON a.id = e.task_id
+              WHERE e.kind = 'prerequisites' AND a.status = 'active')
+    OR (instr(short_desc, '[remind delegate]') > 0
+        AND id IN (SELECT e.task_id FROM task_edges e JOIN tasks a ON a.id = e.other_id
+                   WHERE e.kind = 'contingents' AND e.position = 0 AND a.status = 'active'))
+    OR id IN (SELECT task_id FROM schedule_items WHERE task_id IS NOT NULL)
+"""
+PERSON_FIELDS = ["id", "name", "job_title", "department", "area", "is_contractor",
+                 "version", "field_versions"]
+#the sync stamps (see task_sync.py): a Lamport clock for the record and one per field
+SYNC_FIELDS = ("version", "field_versions")
+JSON_COLUMNS = ("recurrence_settings", "field_versions") # dicts kept as JSON text in SQLite
+
+
+def field_versions_of(obj):
+    """obj.field_versions as a dict. SqliteStorage leaves a task's stamps as JSON text,
+    since only sync reads them and decoding them all slows every load down."""
+    if isinstance(obj.field_versions, str):
+        obj.field_versions = json.loads(obj.field_versions)
+    return obj.field_versions
+
+
+SCHEDULE_FIELDS = ["id", "kind", "task_id", "desc", "checked", "registered"]
+SCHEDULE_BOOL_FIELDS = ("checked", "registered")
+
+
+def task_record(task):
+    """The dict we persist for a Task: its attributes, with the delegate as a person id."""
+    record = vars(task).copy()
+    if record.get("delegate"):
+        record["delegate"] = record["delegate"].id
+    #own copies of the containers, since the record may be written from another thread
+    record["prerequisites"] = list(record.get("prerequisites") or [])
+    record["contingents"] = list(record.get("contingents") or [])
+    record["recurrence_settings"] = dict(record.get("recurrence_settings") or {})
+    record["field_versions"] = dict(field_versions_of(task) or {})
+    return record
+
+
+def person_record(person):
+    """The dict we persist for a Person."""
+    record = vars(person).copy()
+    record["field_versions"] = dict(record.get("field_versions") or {})
+    return record
+
+
+def write_text_atomic(path, text):
+    #write to a temp file and rename over the target, so a crash mid-write leaves the
+    #old file intact instead of half a file
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _write_json_atomic(path, data):
+    write_text_atomic(path, json.dumps(data, default=str))
+
+
+def _plain(value):
+    #records as they'd read back from json, so diffs compare like with like
+    return json.loads(json.dumps(value, default=str))
+
+
+def _column_value(value):
+    #same conversion json.dump(default=str) gives us, so both backends load identically
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+class JsonStorage:
+    """The original format: everything in task_data.json, rewritten on every save."""
+    rewrites_everything = True #prepare_save needs the full task list, history included
+
+    def __init__(self, data_path="task_data.json", schedule_path="daily_schedule.json"):
+        self.data_path = data_path
+        self.schedule_path = schedule_path
+
+    def load(self, history=True):
+        try:
+            with open(self.data_path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        return {"tasks": data.get("tasks", []),
+                "people": data.get("people", []),
+                "leaderboard": data.get("leaderboard", [])}
+
+    def save(self, tasks, people, leaderboard, changed=None, removed=()):
+        self.prepare_save(tasks, people, leaderboard, changed, removed)()
+
+    def prepare_save(self, tasks, people, leaderboard, changed=None, removed=()):
+        data = {
+            "tasks": [task_record(t) for t in tasks],
+            "people": [person_record(p) for p in people],
+            "leaderboard": [dict(entry) for entry in leaderboard] if leaderboard is not None else None
+        }
+        return lambda: _write_json_atomic(self.data_path, data)
+
+    def load_daily_schedule(self):
+        try:
+            with open(self.schedule_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_daily_schedule(self, schedule):
+        self.prepare_save_daily_schedule(schedule)()
+
+    def prepare_save_daily_schedule(self, schedule):
+        text = json.dumps(schedule)
+        return lambda: write_text_atomic(self.schedule_path, text)
+
+    def close(self):
+        pass
+
+
+class JournalStorage(JsonStorage):
+    """task_data.json as a snapshot plus task_data.journal.jsonl, an append-only log with
+    one JSON line per mutation:
+        {"op": "create", "task": {...}}            new task
+        {"op": "update", "id": ..., "fields": {...}} only the fields that changed
+                                                     (status, snooze_until, delegate, ...)
+        {"op": "delete", "id": ...}
+        {"op": "people", "people": [...]} / {"op": "leaderboard", "leaderboard": [...]}
+        {"op": "schedule_day", "date": ..., "items": [...] or null}
+    Startup replays the journal over the snapshot. Replay is idempotent, so a crash
+    between writing a new snapshot and truncating the journal loses nothing, and a
+    torn last line from a crash mid-append is skipped. Once the journal passes
+    compact_bytes it's folded into a fresh snapshot."""
+    def __init__(self, data_path="task_data.json", schedule_path="daily_schedule.json",
+                 journal_path=None, compact_bytes=JOURNAL_COMPACT_BYTES):
+        super().__init__(data_path, schedule_path)
+        self.journal_path = journal_path or os.path.splitext(data_path)[0] + ".journal.jsonl"
+        self.compact_bytes = compact_bytes
+        self._records = None   # id -> task record as last persisted, in list order
+        self._people = []
+        self._leaderboard = []
+        self._schedule = {}
+        self._journal = None
+        self._journal_bytes = 0
+
+    rewrites_everything = False
+
+    def load(self, history=True):
+        self._replay()
+        return {"tasks": _plain(list(self._records.values())),
+                "people": _plain(self._people),
+                "leaderboard": _plain(self._leaderboard)}
+
+    def prepare_save(self, tasks, people, leaderboard, changed=None, removed=()):
+        self._replay()
+        if changed is None:
+            changed = tasks
+        entries = []
+        for task_id in removed:
+            if self._records.pop(task_id, None) is not None:
+                entries.append({"op": "delete", "id": task_id})
+        for task in changed:
+            record = _plain(task_record(task))
+            old = self._records.get(record["id"])
+            self._records[record["id"]] = record
+            if old is None:
+                entries.append({"op": "create", "task": record})
+                continue
+            fields = {k: v for k, v in record.items() if old.get(k) != v}
+            if fields:
+                entries.append({"op": "update", "id": record["id"], "fields": fields})
+        people = _plain([person_record(p) for p in people])
+        if people != self._people:
+            self._people = people
+            entries.append({"op": "people", "people": people})
+        leaderboard = _plain(leaderboard)
+        if leaderboard != self._leaderboard:
+            self._leaderboard = leaderboard
+            entries.append({"op": "leaderboard", "leaderboard": leaderboard})
+        return self._prepare_append(entries)
+
+    def load_daily_schedule(self):
+        self._replay()
+        return _plain(self._schedule)
+
+    def prepare_save_daily_schedule(self, schedule):
+        self._replay()
+        schedule = _plain(schedule)
+        entries = [{"op": "schedule_day", "date": date, "items": None}
+                   for date in self._schedule if date not in schedule]
+        entries += [{"op": "schedule_day", "date": date, "items": items}
+                    for date, items in schedule.items() if self._schedule.get(date) != items]
+        self._schedule = schedule
+        return self._prepare_append(entries)
+
+    def compact(self):
+        """Write the current state as a fresh snapshot and start an empty journal."""
+        self._replay()
+        self._journal_bytes = 0
+        self._compact(self._snapshot())
+
+    def _snapshot(self):
+        #records are replaced on edit, never changed in place, so a shallow copy is a
+        #stable snapshot for the writer thread
+        return ({"tasks": list(self._records.values()),
+                 "people": self._people,
+                 "leaderboard": self._leaderboard},
+                dict(self._schedule))
+
+    def _compact(self, snapshot):
+        data, schedule = snapshot
+        _write_json_atomic(self.data_path, data)
+        _write_json_atomic(self.schedule_path, schedule)
+        if self._journal:
+            self._journal.close()
+        self._journal = open(self.journal_path, "w")
+
+    def _prepare_append(self, entries):
+        #the in-memory state is already updated; the job only touches the files
+        text = "".join(json.dumps(entry, default=str) + "\n" for entry in entries)
+        self._journal_bytes += len(text)
+        snapshot = None
+        if self._journal_bytes > self.compact_bytes:
+            snapshot = self._snapshot()
+            self._journal_bytes = 0
+        def job():
+            if text:
+                self._append(text)
+            if snapshot is not None:
+                self._compact(snapshot)
+        return job
+
+    def close(self):
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+    def _replay(self):
+        if self._records is not None:
+            return
+        data = super().load()
+        self._records = {record["id"]: record for record in data["tasks"]}
+        self._people = data["people"]
+        self._leaderboard = data["leaderboard"]
+        self._schedule = super().load_daily_schedule()
+        try:
+            with open(self.journal_path, "r") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+        self._journal_bytes = sum(len(line) for line in lines)
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping unreadable journal entry in {self.journal_path}", file=sys.stderr)
+                continue
+            self._apply(entry)
+
+    def _apply(self, entry):
+        op = entry.get("op")
+        if op == "create":
+            self._records[entry["task"]["id"]] = entry["task"]
+        elif op == "update":
+            if entry["id"] in self._records:
+                self._records[entry["id"]].update(entry["fields"])
+        elif op == "delete":
+            self._records.pop(entry["id"], None)
+        elif op == "people":
+            self._people = entry["people"]
+        elif op == "leaderboard":
+            self._leaderboard = entry["leaderboard"]
+        elif op == "schedule_day":
+            if entry["items"] is None:
+                self._schedule.pop(entry["date"], None)
+            else:
+                self._schedule[entry["date"]] = entry["items"]
+
+    def _append(self, text):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a+")
+            self._journal.seek(0, os.SEEK_END)
+            if self._journal.tell() > 0:
+                #start on a fresh line in case the last append was torn by a crash
+                self._journal.seek(self._journal.tell() - 1)
+                if self._journal.read(1) != "\n":
+                    self._journal.write("\n")
+        self._journal.write(text)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+
+class SqliteStorage:
+    """One row per task, person, dependency edge, schedule item and leaderboard entry.
+    Saving upserts only the tasks that changed, so its cost follows the edit rather than
+    the length of the task history. People, the leaderboard and schedule days are small;
+    they're diffed against what was last written and only differing rows are touched."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY, short_desc TEXT, long_desc TEXT, safety NUMERIC,
+            impact NUMERIC, hype NUMERIC, due_date TEXT, area TEXT, entity TEXT,
+            maintenance_plan TEXT, procedure_doc TEXT, requestor TEXT, project TEXT,
+            is_win INTEGER, delegate TEXT, status TEXT, completion_date TEXT,
+            snooze_until TEXT, impact_is_percentage INTEGER, recurrence_type TEXT,
+            recurrence_settings TEXT, first_active_date TEXT, delegate_reminder_days NUMERIC,
+            version INTEGER, field_versions TEXT);
+        CREATE TABLE IF NOT EXISTS task_edges (
+            task_id TEXT NOT NULL, kind TEXT NOT NULL, position INTEGER NOT NULL,
+            other_id TEXT NOT NULL, PRIMARY KEY (task_id, kind, position));
+        CREATE TABLE IF NOT EXISTS people (
+            id TEXT PRIMARY KEY, name TEXT, job_title TEXT, department TEXT, area TEXT,
+            is_contractor INTEGER, version INTEGER, field_versions TEXT);
+        CREATE TABLE IF NOT EXISTS schedule_items (
+            date TEXT NOT NULL, position INTEGER NOT NULL, id TEXT, kind TEXT, task_id TEXT,
+            desc TEXT, checked INTEGER, registered INTEGER, PRIMARY KEY (date, position));
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            position INTEGER PRIMARY KEY, name TEXT, xp NUMERIC);
+    """
+
+    def __init__(self, db_path="task_data.db", json_data_path="task_data.json",
+                 json_schedule_path="daily_schedule.json"):
+        self.db_path = db_path
+        #saves run on the persistence writer thread; the lock keeps them and loads apart
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self._add_sync_columns()
+        self._people_rows = {}        # id -> row tuple as last written
+        self._leaderboard_rows = []
+        self._schedule_days = {}      # date -> json of that day's items as last written
+        self.migrate_from_json(JsonStorage(json_data_path, json_schedule_path))
+
+    def _add_sync_columns(self):
+        #databases from before sync stamps existed get the columns, empty
+        for table in ("tasks", "people"):
+            columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            with self.conn:
+                if "version" not in columns:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN version INTEGER")
+                if "field_versions" not in columns:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN field_versions TEXT")
+
+    def migrate_from_json(self, json_storage):
+        """One-time import of task_data.json / daily_schedule.json into an empty database.
+        The JSON files are left where they are as a backup."""
+        if self._meta("migrated_from_json") or self.conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone():
+            return False
+        if not (os.path.exists(json_storage.data_path) or os.path.exists(json_storage.schedule_path)):
+            self._set_meta("migrated_from_json", "none")
+            return False
+        data = json_storage.load()
+        with self.conn:
+            for record in data["tasks"]:
+                self._write_task(record)
+            self._write_people(data["people"])
+            self._write_leaderboard(data["leaderboard"])
+            self._write_schedule(json_storage.load_daily_schedule())
+            self._set_meta("migrated_from_json", json_storage.data_path)
+        print(f"Migrated {len(data['tasks'])} tasks from {json_storage.data_path} to {self.db_path}", file=sys.stderr)
+        return True
+
+    rewrites_everything = False
+
+    def load(self, history=True):
+        with self.lock:
+            if history:
+                data = {"tasks": self._load_tasks()}
+            else:
+                data = {"tasks": self._load_tasks(HOT_TASK_WHERE, {"now": str(datetime.now())}),
+                        "history_omitted": True}
+            data.update(self._load_people())
+            return data
+
+    def load_history(self, exclude_ids=()):
+        """Every stored task not in exclude_ids (the ones already in memory)."""
+        exclude_ids = set(exclude_ids)
+        with self.lock:
+            return [record for record in self._load_tasks() if record["id"] not in exclude_ids]
+
+    def _load_tasks(self, where=None, params=()):
+        where = f" WHERE {where}" if where else ""
+        cursor = self.conn.execute(f"SELECT {', '.join(TASK_FIELDS)} FROM tasks{where}", params)
+        tasks = {}
+        for row in cursor:
+            record = dict(zip(TASK_FIELDS, row))
+            for field in TASK_BOOL_FIELDS:
+                record[field] = bool(record[field])
+            settings = record["recurrence_settings"]
+            record["recurrence_settings"] = json.loads(settings) if settings and settings != "{}" else {}
+            record["field_versions"] = record["field_versions"] or {} #decoded when needed
+            record["version"] = record["version"] or 0
+            for kind in EDGE_KINDS:
+                record[kind] = []
+            tasks[record["id"]] = record
+        edge_where = f" WHERE task_id IN (SELECT id FROM tasks{where})" if where else ""
+        for task_id, kind, other_id in self.conn.execute(
+                f"SELECT task_id, kind, other_id FROM task_edges{edge_where} ORDER BY task_id, kind, position", params):
+            if task_id in tasks:
+                tasks[task_id][kind].append(other_id)
+        return list(tasks.values())
+
+    def _load_people(self):
+        people = []
+        for row in self.conn.execute(f"SELECT {', '.join(PERSON_FIELDS)} FROM people"):
+            self._people_rows[row[0]] = row
+            person = dict(zip(PERSON_FIELDS, row))
+            person["is_contractor"] = bool(person["is_contractor"])
+            person["version"] = person["version"] or 0
+            person["field_versions"] = json.loads(person["field_versions"] or "{}")
+            people.append(person)
+        self._leaderboard_rows = self.conn.execute("SELECT name, xp FROM leaderboard ORDER BY position").fetchall()
+        return {"people": people,
+                "leaderboard": [{"name": name, "xp": xp} for name, xp in self._leaderboard_rows]}
+
+    def save(self, tasks, people, leaderboard, changed=None, removed=()):
+        self.prepare_save(tasks, people, leaderboard, changed, removed)()
+
+    def prepare_save(self, tasks, people, leaderboard, changed=None, removed=()):
+        if changed is None:
+            changed = tasks
+        records = [task_record(t) for t in changed]
+        removed = list(removed)
+        people = [person_record(p) for p in people]
+        leaderboard = [dict(entry) for entry in leaderboard or []]
+        def job():
+            with self.lock, self.conn:
+                for task_id in removed:
+                    self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+                    self.conn.execute("DELETE FROM task_edges WHERE task_id = ?", (task_id,))
+                for record in records:
+                    self._write_task(record)
+                self._write_people(people)
+                self._write_leaderboard(leaderboard)
+        return job
+
+    def load_daily_schedule(self):
+        with self.lock:
+            return self._load_daily_schedule()
+
+    def _load_daily_schedule(self):
+        schedule = {}
+        for row in self.conn.execute(
+                f"SELECT date, {', '.join(SCHEDULE_FIELDS)} FROM schedule_items ORDER BY date, position"):
+            item = {field: value for field, value in zip(SCHEDULE_FIELDS, row[1:]) if value is not None}
+            for field in SCHEDULE_BOOL_FIELDS:
+                item[field] = bool(item.get(field))
+            schedule.setdefault(row[0], []).append(item)
+        self._schedule_days = {date: json.dumps(items, sort_keys=True) for date, items in schedule.items()}
+        return schedule
+
+    def save_daily_schedule(self, schedule):
+        self.prepare_save_daily_schedule(schedule)()
+
+    def prepare_save_daily_schedule(self, schedule):
+        schedule = _plain(schedule)
+        def job():
+            with self.lock, self.conn:
+                self._write_schedule(schedule)
+        return job
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _write_task(self, record):
+        row = []
+        for field in TASK_FIELDS:
+            value = record.get(field)
+            if field in JSON_COLUMNS:
+                value = json.dumps(value or {}, default=str)
+            row.append(_column_value(value))
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO tasks ({', '.join(TASK_FIELDS)}) VALUES ({', '.join('?' * len(TASK_FIELDS))})",
+            row)
+        self.conn.execute("DELETE FROM task_edges WHERE task_id = ?", (record["id"],))
+        self.conn.executemany(
+            "INSERT INTO task_edges (task_id, kind, position, other_id) VALUES (?, ?, ?, ?)",
+            [(record["id"], kind, position, other_id)
+             for kind in EDGE_KINDS for position, other_id in enumerate(record.get(kind) or [])])
+
+    def _write_people(self, people):
+        rows = {p["id"]: tuple(json.dumps(p.get(field) or {}) if field in JSON_COLUMNS else _column_value(p.get(field))
+                               for field in PERSON_FIELDS) for p in people}
+        for person_id in set(self._people_rows) - set(rows):
+            self.conn.execute("DELETE FROM people WHERE id = ?", (person_id,))
+        for person_id, row in rows.items():
+            if self._people_rows.get(person_id) != row:
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO people ({', '.join(PERSON_FIELDS)}) VALUES ({', '.join('?' * len(PERSON_FIELDS))})",
+                    row)
+        self._people_rows = rows
+
+    def _write_leaderboard(self, leaderboard):
+        rows = [(_column_value(entry.get("name")), _column_value(entry.get("xp"))) for entry in leaderboard]
+        if rows == self._leaderboard_rows:
+            return
+        self.conn.execute("DELETE FROM leaderboard")
+        self.conn.executemany("INSERT INTO leaderboard (position, name, xp) VALUES (?, ?, ?)",
+                              [(position, name, xp) for position, (name, xp) in enumerate(rows)])
+        self._leaderboard_rows = rows
+
+    def _write_schedule(self, schedule):
+        days = {date: json.dumps(items, sort_keys=True) for date, items in schedule.items()}
+        for date in set(self._schedule_days) - set(days):
+            self.conn.execute("DELETE FROM schedule_items WHERE date = ?", (date,))
+        for date, items in schedule.items():
+            if self._schedule_days.get(date) == days[date]:
+                continue
+            self.conn.execute("DELETE FROM schedule_items WHERE date = ?", (date,))
+            self.conn.executemany(
+                f"INSERT INTO schedule_items (date, position, {', '.join(SCHEDULE_FIELDS)}) VALUES (?, ?, {', '.join('?' * len(SCHEDULE_FIELDS))})",
+                [(date, position) + tuple(_column_value(item.get(field)) for field in SCHEDULE_FIELDS)
+                 for position, item in enumerate(items)])
+        self._schedule_days = days
+
+
+class PersistenceScheduler:
+    """Coalesces saves and does the disk work on one background writer thread.
+    mark_dirty(key, prepare) keeps the latest prepare callback per key. delay_ms after
+    the first mark, flush() runs each pending prepare on the Tk thread - it snapshots
+    what needs writing and returns a job - and queues the jobs for the writer, which
+    runs them one at a time in order. Without a Tk root, marks are flushed straight
+    away (still written in the background). flush(wait=True) blocks until the writer
+    has caught up; close() does that and then stops the writer, so call it on exit."""
+    def __init__(self, root=None, delay_ms=PERSIST_DELAY_MS):
+        self.root = root
+        self.delay_ms = delay_ms
+        self._pending = {}
+        self._timer = None
+        self._jobs = queue.Queue()
+        self._writer = threading.Thread(target=self._run_writer, name="persistence-writer", daemon=True)
+        self._writer.start()
+
+    def mark_dirty(self, key, prepare):
+        self._pending[key] = prepare
+        if self.root is None:
+            self.flush()
+        elif self._timer is None:
+            self._timer = self.root.after(self.delay_ms, self.flush)
+
+    def flush(self, wait=False):
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        for key, prepare in pending.items():
+            try:
+                job = prepare()
+            except Exception as e:
+                print(f"Failed to prepare save of {key}: {e}", file=sys.stderr)
+                continue
+            if job is not None:
+                self._jobs.put((key, job))
+        if wait:
+            self._jobs.join()
+
+    def flush_event(self):
+        """flush(), returning a threading.Event that's set once the writer has written
+        everything queued so far, for callers that mustn't block on flush(wait=True)."""
+        self.flush()
+        written = threading.Event()
+        self._jobs.put(("flush event", written.set))
+        return written
+
+    def close(self):
+        self.flush(wait=True)
+        if self._writer.is_alive():
+            self._jobs.put(None)
+            self._writer.join()
+
+    def _run_writer(self):
+        while True:
+            item = self._jobs.get()
+            if item is None: #close()'s stop sentinel
+                self._jobs.task_done()
+                return
+            key, job = item
+            try:
+                job()
+            except Exception as e:
+                print(f"Failed to save {key}: {e}", file=sys.stderr)
+            finally:
+                self._jobs.task_done()
+
+
+def open_storage(backend="sqlite", db_path="task_data.db", json_data_path="task_data.json",
+                 json_schedule_path="daily_schedule.json"):
+    if backend == "sqlite":
+        return SqliteStorage(db_path, json_data_path, json_schedule_path)
+    if backend == "json":
+        return JsonStorage(json_data_path, json_schedule_path)
+    if backend == "journal":
+        return JournalStorage(json_data_path, json_schedule_path)
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,282 @@
+import json
+import uuid
+import zlib
+from urllib.parse import urlsplit
+
+from task_storage import task_record, person_record, write_text_atomic, field_versions_of, SYNC_FIELDS
+
+#Delta sync of tasks and people between replicas (each user's own store) through a
+#server (task_server.py, itself a store). Nothing is exchanged whole-file:
+#
+#  - Every field of a Task or Person carries a stamp [clock, replica, digest]: the Lamport
+#    time and replica of its last change and a digest of its value. TaskStore stamps the
+#    tasks marked changed when it saves, by comparing digests, so an edit costs a digest
+#    per field of the edited tasks and nothing else. record.version is the latest clock.
+#  - A replica keeps the ids it has stamped since its last push and pushes just those
+#    records, with any deletions, in one POST /sync.
+#  - The server gives every record it accepts a fresh clock of its own as its version,
+#    and GET /sync?since=N returns the records (and tombstones) with a version above N,
+#    out of an index kept in version order, so a pull costs what changed since N.
+#  - merge_record settles each field on its own and the same way everywhere:
+#      the later stamp wins (clock, then replica id to break ties);
+#      completion wins over edits: status stamps also carry a round, which goes up when
+#      a replica moves a task to a less-closed status than the one it had (a deliberate
+#      revive). The later round wins, then the more-closed status (completed, then
+#      abandoned), then the later stamp. That's a single order, so any number of
+#      replicas settle on the same status whatever order their merges run in, and
+#      completion_date goes with whichever status won;
+#      a deletion (archiving) wins over any edit to the task.
+#
+#The schedule and the leaderboard stay local to each replica.
+
+STATUS_RANK = {"completed": 2, "abandoned": 1} # anything else (active) is 0
+_digest_encoder = json.JSONEncoder(sort_keys=True, default=str)
+
+
+def field_digest(value):
+    #whole floats as ints, since SQLite may hand back 50 for a stored 50.0
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return format(zlib.crc32(_digest_encoder.encode(value).encode()), "08x")
+
+
+_STATUS_RANK_BY_DIGEST = {field_digest(status): rank for status, rank in STATUS_RANK.items()}
+
+
+def _stamp_key(stamp):
+    return (stamp[0], stamp[1])
+
+
+def _status_key(record, stamp):
+    #status stamps are [clock, replica, digest, round]
+    return (stamp[3] if len(stamp) > 3 else 0, STATUS_RANK.get(record.get("status"), 0)) + _stamp_key(stamp)
+
+
+def _incoming_wins(field, local, incoming, local_stamp, incoming_stamp):
+    if local_stamp is None:
+        return True
+    if field == "status":
+        return _status_key(incoming, incoming_stamp) > _status_key(local, local_stamp)
+    return _stamp_key(incoming_stamp) > _stamp_key(local_stamp)
+
+
+def merge_record(local, incoming):
+    """Field-level merge of two records of the same task or person (plain dicts with
+    their field_versions). Returns (merged record, fields taken from incoming). Gives
+    the same result whichever side runs it."""
+    if local is None:
+        return dict(incoming), [f for f in incoming if f not in SYNC_FIELDS and f != "id"]
+    merged = dict(local)
+    stamps = dict(local.get("field_versions") or {})
+    incoming_stamps = incoming.get("field_versions") or {}
+    taken = []
+    for field, incoming_stamp in incoming_stamps.items():
+        if field == "completion_date" and "status" in incoming_stamps:
+            continue #settled with status below
+        local_stamp = stamps.get(field)
+        if local_stamp == incoming_stamp or not _incoming_wins(field, local, incoming, local_stamp, incoming_stamp):
+            continue
+        merged[field] = incoming.get(field)
+        stamps[field] = incoming_stamp
+        taken.append(field)
+        if field == "status" and "completion_date" in incoming_stamps:
+            merged["completion_date"] = incoming.get("completion_date")
+            stamps["completion_date"] = incoming_stamps["completion_date"]
+            taken.append("completion_date")
+    if "status" in incoming_stamps and stamps.get("status") == incoming_stamps["status"] \
+            and "completion_date" not in taken and "completion_date" in incoming_stamps:
+        #same status on both sides: a backdated completion date merges on its own
+        local_stamp = stamps.get("completion_date")
+        if local_stamp is None or _stamp_key(incoming_stamps["completion_date"]) > _stamp_key(local_stamp):
+            merged["completion_date"] = incoming.get("completion_date")
+            stamps["completion_date"] = incoming_stamps["completion_date"]
+            taken.append("completion_date")
+    merged["field_versions"] = stamps
+    merged["version"] = max(local.get("version") or 0, incoming.get("version") or 0)
+    return merged, taken
+
+
+class SyncState:
+    """This replica's side of sync, kept in sync_state.json next to the data: its id, its
+    Lamport clock, where it syncs to and how far it has pulled, the records stamped since
+    its last push, and the tombstones of deleted tasks. Saved along with the tasks, but
+    only once this store syncs with a server or serves as one (tracking); until then
+    nothing is stamped, queued or written."""
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self.replica = data.get("replica") or uuid.uuid4().hex[:8]
+        self.clock = data.get("clock", 0)
+        self.server = data.get("server")
+        self.server_seq = data.get("server_seq", 0)
+        self.pending_tasks = set(data.get("pending_tasks", []))
+        self.pending_people = set(data.get("pending_people", []))
+        self.pending_deleted = set(data.get("pending_deleted", []))
+        self.deleted = data.get("deleted", {}) # task id -> [clock, replica] of the deletion
+        self.serving = data.get("serving", False)
+        self._saved_text = None
+
+    @property
+    def tracking(self):
+        return bool(self.server) or self.serving
+
+    def tick(self):
+        self.clock += 1
+        return self.clock
+
+    def observe(self, clock):
+        #Lamport receive: our next stamp comes after anything we've seen
+        self.clock = max(self.clock, clock or 0)
+
+    def stamp(self, obj, record):
+        """Stamps the fields of obj (a Task or Person; record is its persisted dict) whose
+        value no longer matches its digest. Returns whether anything changed."""
+        stamps = field_versions_of(obj)
+        changed = []
+        for field, value in record.items():
+            if field in SYNC_FIELDS or field == "id":
+                continue
+            digest = field_digest(value)
+            old = stamps.get(field)
+            if old is None or old[2] != digest:
+                changed.append((field, digest, old))
+        if not changed:
+            return False
+        clock = self.tick()
+        for field, digest, old in changed:
+            stamp = [clock, self.replica, digest]
+            if field == "status":
+                status_round = old[3] if old is not None and len(old) > 3 else 0
+                if old is not None and STATUS_RANK.get(record["status"], 0) < _STATUS_RANK_BY_DIGEST.get(old[2], 0):
+                    status_round += 1 #reopened or downgraded on top of what it had
+                stamp.append(status_round)
+            stamps[field] = stamp
+        obj.version = clock
+        return True
+
+    def note_deleted(self, task_id, stamp=None):
+        if task_id in self.deleted:
+            return False
+        self.deleted[task_id] = stamp or [self.tick(), self.replica]
+        if stamp is None:
+            self.pending_deleted.add(task_id)
+        return True
+
+    def forget_acknowledged(self, task_ids):
+        #a replica keeps its tombstones only until the server has them; the server keeps
+        #all of its own, since any replica may still have to hear about them
+        for task_id in task_ids:
+            self.deleted.pop(task_id, None)
+
+    def prepare_save(self):
+        """A job writing the state out, or None if it's not tracked or hasn't changed."""
+        if not self.tracking:
+            return None
+        text = json.dumps({"replica": self.replica, "clock": self.clock, "server": self.server,
+                           "serving": self.serving, "server_seq": self.server_seq,
+                           "pending_tasks": sorted(self.pending_tasks),
+                           "pending_people": sorted(self.pending_people),
+                           "pending_deleted": sorted(self.pending_deleted),
+                           "deleted": self.deleted})
+        if text == self._saved_text:
+            return None
+        self._saved_text = text
+        return lambda: write_text_atomic(self.path, text)
+
+
+class SyncLog:
+    """The server's index of what changed when: (kind, id) -> version, oldest first, so
+    since(n) walks back from the newest entry and stops at the first one it's seen."""
+    def __init__(self):
+        self.entries = {}
+
+    def note(self, kind, record_id, version):
+        key = (kind, record_id)
+        self.entries.pop(key, None)
+        self.entries[key] = version
+
+    def since(self, version):
+        changed = []
+        for key, entry_version in reversed(self.entries.items()):
+            if entry_version <= version:
+                break
+            changed.append(key)
+        changed.reverse()
+        return changed
+
+
+class SyncClient:
+    """Pushes this store's changes to a task_server and pulls everyone else's:
+
+        SyncClient(store, "http://127.0.0.1:8765").sync()
+
+    The first sync with a server pushes every task and pulls everything it has; after
+    that each sync sends only what was stamped since the last one and receives only
+    what the server accepted since then."""
+    def __init__(self, store, url):
+        import http.client #only a sync needs it, and it's slow to import on every CLI start
+        self.store = store
+        self.url = url.rstrip("/")
+        parts = urlsplit(self.url)
+        self.conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body, default=str).encode() if body is not None else None
+        self.conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+        response = self.conn.getresponse()
+        payload = json.loads(response.read() or b"null")
+        if response.status >= 400:
+            raise ValueError(f"{method} {path}: {response.status} {payload.get('error') if isinstance(payload, dict) else ''}")
+        return payload
+
+    def sync(self):
+        """Returns (records pushed, records pulled)."""
+        store = self.store
+        state = store.sync_state
+        if state.server != self.url:
+            #new server: everything we have is news to it, and we start our pull from scratch
+            state.server, state.server_seq = self.url, 0
+            store.mark_task_changed(*store.all_tasks())
+            state.pending_people.update(p.id for p in store.people)
+        store.stamp_changes()
+        pushed = self.push()
+        pulled = self.pull()
+        store.save_data()
+        return pushed, pulled
+
+    def push(self):
+        store = self.store
+        state = store.sync_state
+        task_index = store.task_index()
+        tasks = [task_index.get(task_id) or store.find_task(task_id) for task_id in state.pending_tasks]
+        people = [p for p in store.people if p.id in state.pending_people]
+        body = {"replica": state.replica,
+                "tasks": [task_record(t) for t in tasks if t is not None],
+                "people": [person_record(p) for p in people],
+                "deleted": {task_id: state.deleted[task_id] for task_id in state.pending_deleted}}
+        if not (body["tasks"] or body["people"] or body["deleted"]):
+            return 0
+        result = self.request("POST", "/sync", body)
+        state.pending_tasks.clear()
+        state.pending_people.clear()
+        state.pending_deleted.clear()
+        if result.get("dropped"):
+            store.merge_remote(deleted=result["dropped"])
+        return len(body["tasks"]) + len(body["people"]) + len(body["deleted"])
+
+    def pull(self):
+        state = self.store.sync_state
+        changes = self.request("GET", f"/sync?since={state.server_seq}")
+        self.store.merge_remote(changes["tasks"], changes["people"], changes["deleted"])
+        #the server has every tombstone we pushed or pulled by now (kept until after the
+        #merge, so our own coming back doesn't look new)
+        state.forget_acknowledged([task_id for task_id in state.deleted if task_id not in state.pending_deleted])
+        state.server_seq = changes["seq"]
+        return len(changes["tasks"]) + len(changes["people"]) + len(changes["deleted"])
+
+    def close(self):
+        self.conn.close()
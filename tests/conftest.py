@@ -0,0 +1,51 @@
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from task_core import TaskStore
+from task_storage import open_storage
+from task_server import TaskServer
+from task_sync import SyncState
+
+
+def open_store(folder, backend="sqlite"):
+    os.makedirs(folder, exist_ok=True)
+    store = TaskStore(open_storage(backend, os.path.join(folder, "task_data.db"),
+                                   os.path.join(folder, "task_data.json"),
+                                   os.path.join(folder, "daily_schedule.json")),
+                      SyncState(os.path.join(folder, "sync_state.json")))
+    store.load()
+    return store
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    """open_store under tmp_path; every store made is closed at the end of the test."""
+    stores = []
+    def make(name="store", backend="sqlite"):
+        store = open_store(str(tmp_path / name), backend)
+        stores.append(store)
+        return store
+    yield make
+    for store in stores:
+        store.close()
+
+
+@pytest.fixture
+def server_url(make_store):
+    """A task_server over its own store, on an event loop in a background thread (the
+    sync client blocks)."""
+    server = TaskServer(make_store("server"))
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    port = asyncio.run_coroutine_threadsafe(server.start(port=0), loop).result(10)
+    yield f"http://127.0.0.1:{port}"
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(10)
@@ -0,0 +1,175 @@
+import importlib.util
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from task_core import Task, PriorityEngine, PriorityCache
+
+needs_numpy = pytest.mark.skipif(importlib.util.find_spec("numpy") is None, reason="numpy isn't installed")
+
+NOW = datetime(2026, 10, 18, 9, 30)
+
+
+def random_task(rng, earlier):
+    """A task with the fields that change its score picked at random, edge cases included:
+    due exactly on a day boundary, long overdue, just inside and beyond the 60 day
+    urgency horizon; snoozed until just now or later; delegated, W.I.N., recurring."""
+    due = NOW + rng.choice([timedelta(days=rng.randint(-400, 400), hours=rng.randint(0, 23)),
+                            timedelta(days=rng.choice([-1, 0, 1, 59, 60, 61])),
+                            timedelta(days=rng.randint(0, 3), seconds=rng.choice([-1, 0, 1]))])
+    task = Task(f"T{len(earlier)}", "", rng.randint(0, 100), rng.choice([0, 5, 50, 100, 2500, 10**6]),
+                rng.randint(0, 100), due, is_win=rng.random() < 0.1,
+                impact_is_percentage=rng.random() < 0.5,
+                delegate=rng.choice([None, None, None, "Pat"]),
+                status=rng.choice(["active"] * 6 + ["completed", "abandoned"]))
+    if rng.random() < 0.2:
+        task.snooze_until = NOW + rng.choice([timedelta(0), timedelta(hours=1), timedelta(days=3), -timedelta(days=1)])
+    if rng.random() < 0.2:
+        task.recurrence_type = "weekly"
+        task.recurrence_settings = {"days": rng.sample(["Monday", "Wednesday", "Friday"], 2)}
+        task.first_active_date = due - timedelta(days=rng.randint(0, 6))
+    #edges only point at earlier tasks, so there are no cycles
+    if earlier and rng.random() < 0.3:
+        prereq = rng.choice(earlier)
+        task.prerequisites.append(prereq.id)
+        prereq.contingents.append(task.id)
+    if earlier and rng.random() < 0.1:
+        rng.choice(earlier).contingents.append(task.id) #a reminder-style one-way edge
+    return task
+
+
+def random_tasks(seed, count):
+    rng = random.Random(seed)
+    tasks = []
+    for _ in range(count):
+        tasks.append(random_task(rng, tasks))
+    return rng, tasks
+
+
+def random_edit(rng, tasks):
+    task = rng.choice(tasks)
+    field = rng.choice(["safety", "hype", "impact", "due_date", "status", "snooze_until", "delegate", "is_win"])
+    if field in ("safety", "hype", "impact"):
+        setattr(task, field, rng.randint(0, 150))
+    elif field == "due_date":
+        task.due_date = NOW + timedelta(days=rng.randint(-30, 90))
+    elif field == "status":
+        task.status = rng.choice(["active", "completed", "abandoned"])
+    elif field == "snooze_until":
+        task.snooze_until = rng.choice([None, NOW + timedelta(days=2)])
+    elif field == "delegate":
+        task.delegate = rng.choice([None, "Pat"])
+    else:
+        task.is_win = not task.is_win
+    return task
+
+
+def dirty(engine, task, removed=()):
+    #what PriorityCache.mark_dirty/mark_removed hand to rescore for an edited or removed task
+    ids = set(engine.graph.neighbours(task.id)) | set(task.prerequisites) | set(task.contingents)
+    neighbours = [engine.task_index[i] for i in ids if i in engine.task_index and i not in removed]
+    return neighbours if task.id in removed else [task] + neighbours
+
+
+def scores(tasks, vectorized, now=NOW):
+    engine = PriorityEngine(vectorized=vectorized)
+    return dict(engine.compute(tasks, now=now))
+
+
+@needs_numpy
+@pytest.mark.parametrize("seed", range(8))
+def test_vectorized_scores_match_scalar(seed):
+    _, tasks = random_tasks(seed, 300)
+    assert scores(tasks, True) == scores(tasks, False)
+
+
+@needs_numpy
+def test_vectorized_scores_match_calculate_priority():
+    _, tasks = random_tasks(99, 120)
+    vector = PriorityEngine(vectorized=True)
+    vector.compute(tasks)
+    assert vector.scorer is not None
+    for task in tasks:
+        assert vector.priorities[task.id] == pytest.approx(task.calculate_priority(tasks), abs=1e-6)
+
+
+@needs_numpy
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_rescore_matches_full_compute(seed):
+    rng, tasks = random_tasks(seed, 250)
+    engines = [PriorityEngine(vectorized=True), PriorityEngine(vectorized=False)]
+    for engine in engines:
+        engine.compute(tasks, now=NOW)
+    for step in range(60):
+        if step % 10 == 9:
+            new = random_task(rng, tasks)
+            tasks.append(new)
+            changed = [new] + [t for t in tasks if new.id in t.contingents]
+            removed = []
+        elif step % 10 == 4:
+            gone = rng.choice(tasks)
+            tasks.remove(gone)
+            changed, removed = [gone], [gone.id]
+        else:
+            changed, removed = [random_edit(rng, tasks)], []
+        for engine in engines:
+            batch = [t for c in changed for t in dirty(engine, c, removed)]
+            engine.rescore(batch, removed, now=NOW)
+        expected = scores(tasks, False)
+        assert engines[0].priorities == expected
+        assert engines[1].priorities == expected
+
+
+@needs_numpy
+def test_time_passing_rescores_the_same_as_a_full_compute():
+    _, tasks = random_tasks(7, 250)
+    engines = [PriorityEngine(vectorized=True), PriorityEngine(vectorized=False)]
+    for engine in engines:
+        engine.compute(tasks, now=NOW)
+    for hours in (1, 14, 15, 40, 24 * 9):
+        now = NOW + timedelta(hours=hours)
+        for engine in engines:
+            engine.rescore(engine.pop_due(now), now=now)
+            assert engine.priorities == scores(tasks, False, now)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_cache_tracks_marked_changes_like_a_full_compute(seed):
+    rng, tasks = random_tasks(seed, 200)
+    cache = PriorityCache()
+    cache.get(tasks, now=NOW)
+    for step in range(80):
+        if step % 10 == 9:
+            new = random_task(rng, tasks)
+            tasks.append(new)
+            cache.mark_dirty(new)
+        elif step % 10 == 4:
+            gone = rng.choice(tasks)
+            tasks.remove(gone)
+            cache.mark_removed(gone.id)
+        else:
+            cache.mark_dirty(random_edit(rng, tasks))
+        assert cache.get(tasks, now=NOW) == scores(tasks, False)
+    assert cache.full_rebuilds == 1 and cache.misses == 81
+    cache.get(tasks, now=NOW)
+    assert cache.hits == 1
+
+
+def test_cache_rescores_what_time_changed():
+    _, tasks = random_tasks(11, 200)
+    cache = PriorityCache()
+    cache.get(tasks, now=NOW)
+    for days in (0.5, 1, 2, 30, 61):
+        now = NOW + timedelta(days=days)
+        assert cache.get(tasks, now=now) == scores(tasks, False, now)
+    assert cache.full_rebuilds == 1
+
+
+def test_cache_recomputes_when_the_list_changes_unmarked():
+    _, tasks = random_tasks(12, 50)
+    cache = PriorityCache()
+    cache.get(tasks, now=NOW)
+    tasks.append(Task("unmarked", "", 90, 0, 90, NOW))
+    assert cache.get(tasks, now=NOW) == scores(tasks, False)
+    assert cache.full_rebuilds == 2
@@ -0,0 +1,76 @@
+import random
+from datetime import datetime
+
+from task_core import Task, SearchIndex
+
+WORDS = ["pump", "valve", "Boiler", "inspect", "replace", "north", "yard", "PPE", "audit", "lift"]
+
+
+def random_task(rng):
+    task = Task(" ".join(rng.sample(WORDS, 2)), rng.choice(["", "see procedure " + rng.choice(WORDS)]),
+                rng.randint(0, 100), rng.randint(0, 5000), rng.randint(0, 100),
+                datetime(2026, rng.randint(1, 12), rng.randint(1, 28)))
+    task.area = rng.choice(["", "Plant", "Yard"])
+    return task
+
+
+def scan(tasks, query):
+    #what the search box did before the index: a substring test on every field
+    return [t for t in tasks if any(query in str(getattr(t, field)).lower()
+                                    for field in SearchIndex.FIELDS if getattr(t, field) is not None)]
+
+
+def queries(rng):
+    yield from ["p", "pu", "pump", "valve inspect", "boiler", "plant", "2026-03", "ppe", "zzz", "pyard"]
+    for _ in range(20):
+        word = rng.choice(WORDS).lower()
+        start = rng.randint(0, len(word) - 1)
+        yield word[start:start + rng.randint(1, 5)]
+
+
+def test_index_matches_a_full_scan_through_edits():
+    rng = random.Random(5)
+    tasks = [random_task(rng) for _ in range(300)]
+    index = SearchIndex()
+    index.add(*tasks)
+    index.index_pending(limit=200) #the rest stay pending, searched by scan
+    for step in range(50):
+        task = rng.choice(tasks)
+        choice = rng.random()
+        if choice < 0.5:
+            task.short_desc = " ".join(rng.sample(WORDS, 2))
+            index.add(task)
+        elif choice < 0.7:
+            tasks.remove(task)
+            index.remove(task.id)
+        else:
+            new = random_task(rng)
+            tasks.append(new)
+            index.add(new)
+        if step % 5:
+            continue
+        for query in queries(rng):
+            assert index.filter(tasks, query) == scan(tasks, query), query
+    assert index.index_pending() == 0
+    for query in queries(rng):
+        assert index.filter(tasks, query) == scan(tasks, query), query
+
+
+def test_a_match_never_spans_two_fields():
+    task = Task("pump", "valve", 1, 0, 1, datetime(2026, 1, 1))
+    index = SearchIndex()
+    index.add(task)
+    index.index_pending()
+    assert index.filter([task], "pump") == [task]
+    assert index.filter([task], "mpva") == [] and index.filter([task], "mp va") == []
+
+
+def test_store_search_covers_history(make_store):
+    store = make_store()
+    old = Task("Replace boiler valve", "", 10, 0, 10, datetime(2026, 10, 1))
+    store.add_tasks(old)
+    store.complete(old)
+    store.close()
+    store = make_store()
+    store.add_tasks(Task("Inspect boiler", "", 10, 0, 10, datetime(2026, 11, 1)))
+    assert [t.short_desc for t in store.search("BOILER")] == ["Inspect boiler", "Replace boiler valve"]
@@ -0,0 +1,62 @@
+import asyncio
+import http.client
+import json
+import threading
+from urllib.parse import urlsplit
+
+from task_server import TaskServer
+
+
+def connect(url):
+    parts = urlsplit(url)
+    return http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+
+
+def call(url, method, path, body=None):
+    conn = connect(url)
+    try:
+        conn.request(method, path, body=json.dumps(body) if body is not None else None)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    finally:
+        conn.close()
+
+
+def test_bad_content_length_is_a_400(server_url):
+    for length in ("-5", "twelve"):
+        conn = connect(server_url)
+        conn.putrequest("POST", "/tasks")
+        conn.putheader("Content-Length", length)
+        conn.endheaders()
+        response = conn.getresponse()
+        assert response.status == 400
+        assert json.loads(response.read())["error"] == "Bad Content-Length"
+        conn.close()
+    assert call(server_url, "GET", "/people")[0] == 200 #still serving
+
+
+def test_closed_tasks_are_found_by_id(server_url):
+    status, (task,) = call(server_url, "POST", "/tasks", {"short_desc": "A", "due_date": "2026-11-01"})
+    assert status == 201
+    assert call(server_url, "POST", f"/tasks/{task['id']}/complete", {})[0] == 200
+    status, found = call(server_url, "GET", f"/tasks/{task['id']}")
+    assert (status, found["status"], found["short_desc"]) == (200, "completed", "A")
+    assert call(server_url, "GET", "/tasks/no-such-task")[0] == 404
+
+
+def test_history_is_loaded_at_start_off_the_event_loop(make_store):
+    store = make_store()
+    (task,), _ = store.import_records([{"short_desc": "A"}])
+    store.complete(task)
+    store.close()
+    store = make_store()
+    loader = store.history._loader
+    loaded_on = []
+    store.history._loader = lambda: loaded_on.append(threading.current_thread()) or loader()
+    server = TaskServer(store)
+    async def start_and_stop():
+        await server.start(port=0)
+        await server.stop()
+    asyncio.run(start_and_stop())
+    assert loaded_on and loaded_on[0] is not threading.main_thread()
+    assert store.history.get(task.id).status == "completed"
@@ -0,0 +1,121 @@
+import json
+from types import SimpleNamespace
+
+from task_storage import JournalStorage, SqliteStorage
+
+TASKS = [{"id": "a", "short_desc": "Fix pump", "long_desc": "", "safety": 80, "impact": 5, "hype": 20,
+          "due_date": "2026-11-01 00:00:00", "status": "active", "delegate": "p1",
+          "prerequisites": ["b"], "contingents": [], "recurrence_type": "weekly",
+          "recurrence_settings": {"days": ["Monday"]}, "is_win": True},
+         {"id": "b", "short_desc": "Order seal", "long_desc": "part 7", "safety": 40, "impact": 0,
+          "hype": 60, "due_date": "2026-10-20 00:00:00", "status": "completed",
+          "completion_date": "2026-10-01 09:00:00", "prerequisites": [], "contingents": ["a"]}]
+PEOPLE = [{"id": "p1", "name": "Pat", "job_title": "Tech", "department": "Ops", "area": "",
+           "is_contractor": False}]
+SCHEDULE = {"2026-10-18": [{"id": "s1", "kind": "task", "task_id": "a", "checked": True, "registered": False},
+                           {"id": "s2", "kind": "quickadd", "desc": "Call Sam", "checked": False,
+                            "registered": False}]}
+
+
+def write_json_files(folder, tasks):
+    with open(folder / "task_data.json", "w") as f:
+        json.dump({"tasks": tasks, "people": PEOPLE, "leaderboard": [{"name": "Pat", "xp": 12}]}, f)
+    with open(folder / "daily_schedule.json", "w") as f:
+        json.dump(SCHEDULE, f)
+
+
+def open_sqlite(folder):
+    return SqliteStorage(str(folder / "task_data.db"), str(folder / "task_data.json"),
+                         str(folder / "daily_schedule.json"))
+
+
+def test_sqlite_migrates_the_json_files_once(tmp_path, capsys):
+    write_json_files(tmp_path, TASKS)
+    storage = open_sqlite(tmp_path)
+    assert "Migrated 2 tasks" in capsys.readouterr().err
+    data = storage.load()
+    records = {record["id"]: record for record in data["tasks"]}
+    for task in TASKS:
+        assert {key: records[task["id"]][key] for key in task} == task
+    assert [{key: person[key] for key in PEOPLE[0]} for person in data["people"]] == PEOPLE
+    assert data["leaderboard"] == [{"name": "Pat", "xp": 12}]
+    assert storage.load_daily_schedule() == SCHEDULE
+    storage.close()
+
+    #the JSON files stay as a backup, and aren't imported again
+    write_json_files(tmp_path, TASKS[:1])
+    storage = open_sqlite(tmp_path)
+    assert "Migrated" not in capsys.readouterr().err
+    assert sorted(record["id"] for record in storage.load()["tasks"]) == ["a", "b"]
+    storage.close()
+
+
+def make_task(n):
+    #storage only reads a task's attributes, so a namespace stands in for a Task
+    return SimpleNamespace(id=f"t{n}", short_desc=f"Task {n}", long_desc="", safety=n % 100, impact=5,
+                           hype=10, due_date="2026-11-01 00:00:00", delegate=None, status="active",
+                           snooze_until=None, prerequisites=[], contingents=[], recurrence_settings={},
+                           field_versions={})
+
+
+def open_journal(folder, compact_bytes=1000000):
+    return JournalStorage(str(folder / "task_data.json"), str(folder / "daily_schedule.json"),
+                          compact_bytes=compact_bytes)
+
+
+def test_journal_replays_across_compactions(tmp_path):
+    storage = open_journal(tmp_path, compact_bytes=20000)
+    tasks = [make_task(n) for n in range(100)]
+    storage.save(tasks, [], [])
+    for n in range(300):
+        task = tasks[n % len(tasks)]
+        if n % 50 == 49:
+            tasks.remove(task)
+            storage.save(tasks, [], [], changed=[], removed=[task.id])
+            continue
+        task.status = "completed" if n % 3 == 0 else "active"
+        task.snooze_until = f"2026-10-{n % 28 + 1:02d} 00:00:00"
+        storage.save(tasks, [], [], changed=[task])
+        if n % 20 == 0:
+            tasks.append(make_task(1000 + n))
+            storage.save(tasks, [], [], changed=tasks[-1:])
+    storage.save_daily_schedule(SCHEDULE)
+    expected = storage.load()
+    storage.close()
+    #the snapshot has been rewritten at least once and the journal kept under the limit
+    with open(tmp_path / "task_data.json") as f:
+        assert json.load(f)["tasks"]
+    assert (tmp_path / "task_data.journal.jsonl").stat().st_size <= 20000
+
+    storage = open_journal(tmp_path)
+    assert storage.load() == expected
+    assert [record["id"] for record in expected["tasks"]] == [task.id for task in tasks]
+    assert storage.load_daily_schedule() == SCHEDULE
+    storage.compact()
+    storage.close()
+    assert (tmp_path / "task_data.journal.jsonl").stat().st_size == 0
+    storage = open_journal(tmp_path)
+    assert storage.load() == expected
+    storage.close()
+
+
+def test_journal_skips_a_torn_last_line(tmp_path, capsys):
+    storage = open_journal(tmp_path)
+    tasks = [make_task(n) for n in range(3)]
+    storage.save(tasks, [], [])
+    storage.close()
+    with open(tmp_path / "task_data.journal.jsonl", "a") as f:
+        f.write('{"op": "update", "id": "t1", "fie')
+
+    storage = open_journal(tmp_path)
+    assert [record["status"] for record in storage.load()["tasks"]] == ["active"] * 3
+    out, err = capsys.readouterr()
+    assert "Skipping unreadable journal entry" in err and not out
+    tasks[2].status = "completed"
+    storage.save(tasks, [], [], changed=[tasks[2]])
+    storage.close()
+
+    #the append after the torn line starts on a line of its own, so it reads back
+    storage = open_journal(tmp_path)
+    assert [record["status"] for record in storage.load()["tasks"]] == ["active", "active", "completed"]
+    storage.close()
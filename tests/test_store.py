@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import pytest
+
+from task_core import Person
+
+
+def test_import_updates_only_the_fields_a_record_gives(make_store):
+    store = make_store()
+    store.people.append(Person("Pat", "Tech", "Ops"))
+    (task,), _ = store.import_records([{"short_desc": "A", "long_desc": "kept", "safety": 70, "hype": 20,
+                                        "delegate": "Pat", "due_date": "2026-12-01"}])
+    added, updated = store.import_records([{"id": task.id, "hype": 90}, {"id": "new", "short_desc": "B"}])
+    assert [t.short_desc for t in added] == ["B"] and updated == [task]
+    assert (task.short_desc, task.long_desc, task.safety, task.hype) == ("A", "kept", 70, 90)
+    assert task.delegate.name == "Pat" and task.due_date == datetime(2026, 12, 1)
+
+
+def test_import_with_an_unknown_delegate_changes_nothing(make_store):
+    store = make_store()
+    (task,), _ = store.import_records([{"short_desc": "A"}])
+    for records in ([{"short_desc": "B", "delegate": "Sam"}],
+                    [{"id": "new", "short_desc": "B"}, {"id": task.id, "hype": 5, "delegate": "Sam"}]):
+        with pytest.raises(LookupError, match="Sam"):
+            store.import_records(records)
+    assert store.tasks == [task] and task.delegate is None and task.hype != 5
+
+
+def test_import_brings_an_updated_history_task_back(make_store):
+    store = make_store()
+    (task,), _ = store.import_records([{"short_desc": "A"}])
+    store.complete(task)
+    store.close()
+    store = make_store()
+    assert task.id not in {t.id for t in store.tasks}
+    _, (updated,) = store.import_records([{"id": task.id, "safety": 5}])
+    assert (updated.status, updated.safety, updated.short_desc) == ("completed", 5, "A")
+    assert updated in store.tasks and store.find_task(task.id) is updated
+
+
+def test_close_writes_pending_saves_and_stops_the_writer(make_store):
+    store = make_store()
+    store.import_records([{"short_desc": "A"}])
+    writer = store.persistence._writer
+    store.close()
+    assert not writer.is_alive()
+    assert [t.short_desc for t in make_store().tasks] == ["A"]
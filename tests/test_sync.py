@@ -0,0 +1,213 @@
+import copy
+import itertools
+import random
+from datetime import datetime
+
+import pytest
+
+import task_core
+from task_core import Task, Person
+from task_storage import task_record
+from task_sync import SyncClient, SyncState, merge_record
+
+
+def sync(store, url):
+    client = SyncClient(store, url)
+    try:
+        return client.sync()
+    finally:
+        client.close()
+
+
+def snapshot(store):
+    return sorted((t.id, t.short_desc, t.long_desc, t.status, t.safety, t.hype, t.completion_date)
+                  for t in store.all_tasks())
+
+
+def edit(store, task_id, **fields):
+    task = store.find_task(task_id)
+    for field, value in fields.items():
+        setattr(task, field, value)
+    store.mark_task_changed(task)
+    store.save_data()
+    return task
+
+
+@pytest.fixture
+def replicas(make_store, server_url):
+    """Two replicas that have both synced the same two tasks (and a person)."""
+    a, b = make_store("a"), make_store("b")
+    a.people.append(Person("Pat", "Tech", "Ops"))
+    a.add_tasks(Task("X", "", 50, 0, 50, datetime(2026, 11, 1)),
+                Task("Y", "", 50, 0, 50, datetime(2026, 11, 2)))
+    sync(a, server_url)
+    sync(b, server_url)
+    assert snapshot(a) == snapshot(b)
+    return a, b
+
+
+def settle(url, a, b):
+    #a second round trip for whoever synced first
+    sync(a, url)
+    sync(b, url)
+    sync(a, url)
+    assert snapshot(a) == snapshot(b)
+
+
+def by_desc(store, desc):
+    return next(t for t in store.all_tasks() if t.short_desc == desc)
+
+
+def test_concurrent_edits_to_different_fields_both_survive(replicas, server_url):
+    a, b = replicas
+    x = by_desc(a, "X").id
+    edit(a, x, safety=90)
+    edit(b, x, hype=10, long_desc="from b")
+    settle(server_url, a, b)
+    task = a.find_task(x)
+    assert (task.safety, task.hype, task.long_desc) == (90, 10, "from b")
+    assert [p.name for p in b.people] == ["Pat"]
+
+
+def test_concurrent_edits_to_the_same_field_converge(replicas, server_url):
+    a, b = replicas
+    x = by_desc(a, "X").id
+    edit(a, x, safety=90)
+    edit(b, x, safety=20)
+    settle(server_url, a, b)
+    assert a.find_task(x).safety in (90, 20)
+
+
+def test_completion_wins_over_a_concurrent_edit(replicas, server_url):
+    a, b = replicas
+    x = by_desc(a, "X").id
+    b.complete(b.find_task(x))
+    edit(a, x, status="active", hype=75) #a later, unrelated edit of the same task
+    settle(server_url, a, b)
+    task = a.find_task(x)
+    assert task.status == "completed" and task.completion_date is not None
+    assert task.hype == 75
+
+
+def test_completion_beats_abandoning_regardless_of_order(replicas, server_url):
+    a, b = replicas
+    y = by_desc(a, "Y").id
+    a.complete(a.find_task(y))
+    b.abandon(b.find_task(y))
+    settle(server_url, b, a)
+    assert a.find_task(y).status == "completed"
+
+
+def test_revive_after_seeing_the_completion_sticks(replicas, server_url):
+    a, b = replicas
+    x = by_desc(a, "X").id
+    b.complete(b.find_task(x))
+    settle(server_url, b, a)
+    a.revive(a.find_task(x))
+    settle(server_url, a, b)
+    assert b.find_task(x).status == "active"
+    assert b.find_task(x).completion_date is None
+
+
+def test_deletion_wins_over_a_concurrent_edit(replicas, server_url, tmp_path, monkeypatch):
+    monkeypatch.setattr(task_core, "archive_dir", str(tmp_path / "archive"))
+    a, b = replicas
+    x = by_desc(a, "X").id
+    b.complete(b.find_task(x), datetime(2025, 1, 1))
+    assert b.archive_old_tasks(6)[0] == 1
+    edit(a, x, safety=99)
+    settle(server_url, b, a)
+    assert a.find_task(x) is None and b.find_task(x) is None
+    #the replicas forget their tombstones once the server has them
+    assert a.sync_state.deleted == {} and b.sync_state.deleted == {}
+
+
+def test_idle_sync_exchanges_nothing(replicas, server_url):
+    a, b = replicas
+    sync(a, server_url)
+    assert sync(a, server_url) == (0, 0)
+    assert sync(b, server_url)[0] == 0
+
+
+def test_store_that_never_syncs_keeps_no_sync_state(make_store, tmp_path):
+    store = make_store("alone")
+    store.add_tasks(Task("Z", "", 1, 0, 1, datetime(2026, 11, 1)))
+    store.complete(store.tasks[0])
+    store.persistence.flush(wait=True)
+    assert not (tmp_path / "alone" / "sync_state.json").exists()
+    assert not store.sync_state.pending_tasks and not store.sync_state.deleted
+
+
+def random_replica_edit(rng, state, task):
+    field = rng.choice(["safety", "hype", "long_desc", "status", "status", "completion_date"])
+    if field == "status":
+        task.status = rng.choice(["active", "completed", "abandoned"])
+        task.completion_date = None if task.status == "active" else datetime(2026, 10, rng.randint(1, 28))
+    elif field == "completion_date":
+        if task.status != "active":
+            task.completion_date = datetime(2026, 9, rng.randint(1, 28))
+    elif field == "long_desc":
+        task.long_desc = rng.choice(["", "a", "b"])
+    else:
+        setattr(task, field, rng.randint(0, 100))
+    state.stamp(task, task_record(task))
+
+
+def adopt(task, record):
+    #take a merged record as the replica's own copy
+    for field, value in record.items():
+        setattr(task, field, value)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_merge_record_is_symmetric_and_idempotent(seed, tmp_path):
+    rng = random.Random(seed)
+    states = [SyncState(str(tmp_path / f"{seed}-{i}.json")) for i in range(3)]
+    for state in states:
+        state.replica = format(rng.getrandbits(32), "08x") #the order replica ids tie-break in varies with the seed
+    base = Task("X", "", 50, 0, 50, datetime(2026, 11, 1), id="x")
+    states[0].stamp(base, task_record(base))
+    copies = [copy.deepcopy(base) for _ in states]
+    for _ in range(12):
+        i = rng.randrange(len(states))
+        if rng.random() < 0.4:
+            #replica i hears from another one first, so its next edit is made on top of that
+            j = rng.choice([k for k in range(len(states)) if k != i])
+            states[i].observe(copies[j].version)
+            adopt(copies[i], merge_record(task_record(copies[i]), task_record(copies[j]))[0])
+        random_replica_edit(rng, states[i], copies[i])
+    records = [task_record(t) for t in copies]
+    for a in records:
+        for b in records:
+            ab = merge_record(a, b)[0]
+            assert ab == merge_record(b, a)[0]
+            assert merge_record(ab, b)[0] == ab and merge_record(ab, a)[0] == ab
+            assert (ab["status"] == "active") == (ab["completion_date"] is None)
+    a, b, c = records
+    assert merge_record(merge_record(a, b)[0], c)[0] == merge_record(a, merge_record(b, c)[0])[0]
+
+
+def test_a_revive_settles_the_same_whichever_merges_run_first(tmp_path):
+    a, b, c = states = [SyncState(str(tmp_path / f"{name}.json")) for name in "abc"]
+    for state, name in zip(states, "abc"):
+        state.replica = name
+    base = Task("X", "", 50, 0, 50, datetime(2026, 11, 1), id="x")
+    a.stamp(base, task_record(base))
+    done, dropped, revived = (copy.deepcopy(base) for _ in states)
+    done.status, done.completion_date = "completed", datetime(2026, 10, 1)
+    a.stamp(done, task_record(done))
+    #b abandons without hearing of the completion, after edits of its own
+    for hype in (60, 70):
+        dropped.hype = hype
+        b.stamp(dropped, task_record(dropped))
+    dropped.status, dropped.completion_date = "abandoned", datetime(2026, 10, 2)
+    b.stamp(dropped, task_record(dropped))
+    #c reopens the completed task, without hearing of the abandon
+    c.observe(done.version)
+    adopt(revived, merge_record(task_record(revived), task_record(done))[0])
+    revived.status, revived.completion_date = "active", None
+    c.stamp(revived, task_record(revived))
+    records = [task_record(t) for t in (done, dropped, revived)]
+    results = [merge_record(merge_record(x, y)[0], z)[0] for x, y, z in itertools.permutations(records)]
+    assert all(result == results[0] for result in results)
+    assert (results[0]["status"], results[0]["completion_date"], results[0]["hype"]) == ("active", None, 70)